@@ -1,7 +1,7 @@
 """Command-line interface for Jarvis"""
 
 from cli.parser import create_parser
-from cli.commands import handle_configure, handle_monitor, handle_scan, handle_query
+from cli.commands import handle_configure, handle_monitor, handle_scan, handle_query, handle_server
 
-__all__ = ['create_parser', 'handle_configure', 'handle_monitor', 'handle_scan', 'handle_query']
+__all__ = ['create_parser', 'handle_configure', 'handle_monitor', 'handle_scan', 'handle_query', 'handle_server']
 
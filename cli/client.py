@@ -0,0 +1,177 @@
+"""
+Thin client for the resident Jarvis server
+Forwards one-shot queries over the Unix socket and streams the output back, starting the server
+in the background on first use. Kept free of core imports so a query costs one interpreter start
+and a socket round trip.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+from utils.config import load_config, get_config_path
+
+
+_project_root = Path(__file__).parent.parent
+
+
+class ServerUnavailable(Exception):
+    """The server could not be reached or started"""
+
+
+def socket_path(config: Dict[str, Any]) -> str:
+    """Socket path from the server_socket config key (default ~/.jarvis/jarvis.sock)"""
+    return os.path.expanduser(config.get('server_socket') or str(get_config_path().parent / 'jarvis.sock'))
+
+
+def session_key() -> str:
+    """Conversation session for this terminal: JARVIS_SESSION, else the parent shell's PID"""
+    return os.environ.get('JARVIS_SESSION') or f"ppid-{os.getppid()}"
+
+
+def _connect(path: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def spawn_server(path: str, timeout: float = 10.0) -> None:
+    """
+    Start the server in the background and wait until it accepts connections
+
+    Args:
+        path: Socket the server should listen on
+        timeout: Seconds to wait for the socket
+
+    Raises:
+        ServerUnavailable: The server did not come up in time
+    """
+    log_path = Path(path).with_suffix('.log')
+    with open(log_path, 'a') as log:
+        subprocess.Popen(
+            [sys.executable, str(_project_root / 'core' / 'server.py'), '--socket', path],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True, cwd=str(_project_root)
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _connect(path).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise ServerUnavailable(f"Jarvis server did not start within {timeout:g}s (see {log_path})")
+
+
+def request(message: Dict[str, Any], config: Optional[Dict[str, Any]] = None, spawn: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Send one request to the server and yield its response messages
+
+    Args:
+        message: Request object (op plus its fields)
+        config: Loaded config (read when omitted)
+        spawn: Start the server if nothing is listening
+
+    Raises:
+        ServerUnavailable: Nothing is listening and the server could not be started
+    """
+    config = config if config is not None else load_config()
+    path = socket_path(config)
+    try:
+        sock = _connect(path)
+    except OSError:
+        if not spawn:
+            raise ServerUnavailable(f"No Jarvis server listening on {path}")
+        spawn_server(path, float(config.get('server_start_timeout', 10)))
+        try:
+            sock = _connect(path)
+        except OSError as e:
+            raise ServerUnavailable(str(e))
+
+    with sock, sock.makefile('rb') as responses:
+        sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+        for line in responses:
+            reply = json.loads(line.decode('utf-8'))
+            yield reply
+            if reply.get('type') in ('done', 'error'):
+                return
+    raise ServerUnavailable("Jarvis server closed the connection mid-response")
+
+
+def run_remote_query(args: Any, config: Dict[str, Any]) -> bool:
+    """
+    Answer a one-shot query through the server, streaming its output
+
+    Args:
+        args: Parsed CLI arguments (query, model, bot_id, image_path, new_session)
+        config: Loaded config
+
+    Returns:
+        True if the server answered, False if the query should run locally instead
+    """
+    image_path = getattr(args, 'image_path', None)
+    message = {
+        'op': 'query',
+        'query': ' '.join(args.query),
+        'model': getattr(args, 'model', None),
+        'bot_id': getattr(args, 'bot_id', None),
+        'image_path': os.path.abspath(os.path.expanduser(image_path)) if image_path else None,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+        'session': session_key(),
+        'new_session': getattr(args, 'new_session', False),
+    }
+    answered = False
+    try:
+        for reply in request(message, config):
+            kind = reply.get('type')
+            if kind in ('stdout', 'stderr'):
+                stream = sys.stdout if kind == 'stdout' else sys.stderr
+                stream.write(reply.get('data', ''))
+                stream.flush()
+                answered = True
+            elif kind == 'error':
+                print(f"❌ Error processing query: {reply.get('message')}")
+                return True
+            elif kind == 'done' and not reply.get('ok', True):
+                sys.exit(1)
+        return True
+    except ServerUnavailable as e:
+        if answered:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+        print(f"⚠️  {e} - answering without it", file=sys.stderr)
+        return False
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
+        sys.exit(130)
+
+
+def handle_server_command(action: str) -> None:
+    """Handle --server status|stop"""
+    config = load_config()
+    try:
+        for reply in request({'op': action}, config, spawn=False):
+            if reply.get('type') == 'error':
+                print(f"❌ {reply.get('message')}")
+                sys.exit(1)
+            if action == 'stop':
+                print("🛑 Jarvis server stopped")
+            else:
+                models = ', '.join(reply.get('models') or []) or 'none yet'
+                print(f"🛰️  Jarvis server {reply.get('pid')} on {socket_path(config)}")
+                print(f"   • Uptime: {reply.get('uptime', 0):.0f}s")
+                print(f"   • Queries answered: {reply.get('queries', 0)}")
+                print(f"   • Warm models: {models}")
+                print(f"   • Conversation sessions: {reply.get('sessions', 0)}")
+    except ServerUnavailable:
+        print("ℹ️  No Jarvis server is running")
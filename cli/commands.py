@@ -2,11 +2,44 @@
 Command handlers for Jarvis CLI
 """
 
+import os
 import sys
-from typing import Any
+import contextlib
+from typing import Any, Dict
 # Imports will be done locally in functions
 
 
+@contextlib.contextmanager
+def timings_session(args: Any):
+    """Collect timing spans around a command when --timings/--trace (or config timings/trace_file) ask for it"""
+    from utils.config import load_config
+    
+    config = load_config()
+    show_timings = getattr(args, 'timings', False) or bool(config.get('timings', False))
+    trace_file = getattr(args, 'trace_file', None) or config.get('trace_file')
+    if not (show_timings or trace_file):
+        yield
+        return
+    
+    from utils.tracing import enable_tracing, disable_tracing
+    enable_tracing(int(config.get('trace_max_events', 100000)))
+    try:
+        yield
+    finally:
+        tracer = disable_tracing()
+        # Keep stdout clean when a scan report is being written there
+        out = sys.stderr if getattr(args, 'report_format', None) and getattr(args, 'report_file', '-') == '-' else sys.stdout
+        with contextlib.redirect_stdout(out):
+            if show_timings:
+                tracer.report()
+            if trace_file:
+                try:
+                    count = tracer.export_chrome(trace_file)
+                    print(f"🧵 Trace with {count} spans written to {trace_file}")
+                except Exception as e:
+                    print(f"⚠️  Could not write trace file: {e}")
+
+
 def handle_configure(args: Any) -> None:
     """Handle the configure command"""
     from utils.config import load_config, save_config
@@ -59,10 +92,14 @@ def handle_monitor(args: Any) -> None:
     
     jarvis = Jarvis(model=model, bot_id=bot_id)
     
-    if monitor_type == 'network':
-        jarvis.monitor_network()
+    metrics_port = getattr(args, 'metrics_port', None)
+    if monitor_type == 'all' or ',' in (monitor_type or ''):
+        names = ['process', 'network'] if monitor_type == 'all' else [name.strip() for name in monitor_type.split(',') if name.strip()]
+        jarvis.monitor_daemon(names, metrics_port=metrics_port)
+    elif monitor_type == 'network':
+        jarvis.monitor_network(metrics_port=metrics_port)
     elif monitor_type in ['process', 'processes']:
-        jarvis.monitor_processes()
+        jarvis.monitor_processes(metrics_port=metrics_port)
     else:
         print(f"❌ Unknown monitor type: {monitor_type}")
         sys.exit(1)
@@ -84,12 +121,54 @@ def handle_scan(args: Any) -> None:
         print("❌ Folder path is required with -scan")
         sys.exit(1)
     
-    jarvis = Jarvis(model=model, bot_id=bot_id)
-    jarvis.scan_folder(folder_path)
+    scanner_options = {
+        'concurrency': getattr(args, 'concurrency', None),
+        'rate_limit': getattr(args, 'rate_limit', None),
+        'ordered': False if getattr(args, 'unordered', False) else None,
+    }
+    report_format = getattr(args, 'report_format', None)
+    if report_format:
+        from core.security.report import create_sink
+        scanner_options['report_sinks'] = [create_sink(report_format, getattr(args, 'report_file', '-'))]
+    
+    # Keep stdout clean for a report written there
+    if report_format and getattr(args, 'report_file', '-') == '-':
+        with contextlib.redirect_stdout(sys.stderr):
+            jarvis = Jarvis(model=model, bot_id=bot_id)
+    else:
+        jarvis = Jarvis(model=model, bot_id=bot_id)
+    jarvis.scan_folder(folder_path, resume=getattr(args, 'resume', False), **scanner_options)
+
+
+def use_server(args: Any, config: Dict[str, Any]) -> bool:
+    """Whether a one-shot query goes to the resident server (config server, default on)"""
+    if getattr(args, 'no_server', False) or not config.get('server', True) or os.name != 'posix':
+        return False
+    if getattr(args, 'voice', False) or not getattr(args, 'query', None):
+        return False
+    # Timing spans would be collected in the server, not here
+    if getattr(args, 'timings', False) or getattr(args, 'trace_file', None):
+        return False
+    return not (config.get('timings') or config.get('trace_file'))
+
+
+def handle_server(args: Any) -> None:
+    """Handle --server status|stop"""
+    from cli.client import handle_server_command
+    
+    handle_server_command(args.server_action)
 
 
 def handle_query(args: Any) -> None:
     """Handle query commands"""
+    from utils.config import load_config
+    
+    config = load_config()
+    if use_server(args, config):
+        from cli.client import run_remote_query
+        if run_remote_query(args, config):
+            return
+    
     from core.jarvis import Jarvis
     
     model = getattr(args, 'model', 'gemini')
@@ -16,11 +16,11 @@ if str(_project_root) not in sys.path:
 # Import the main function from the original jarvis.py
 # This will be gradually replaced with modular imports
 try:
-    # Try to import from the modular structure first
-    from core.jarvis import Jarvis
+    # Try to import from the modular structure first (core itself is imported lazily by the handlers,
+    # so queries answered by the resident server never load it)
     from cli.parser import create_parser
-    from cli.commands import handle_configure, handle_monitor, handle_scan, handle_query
-    MODULAR_IMPORTS = True
+    from cli.commands import handle_configure, handle_monitor, handle_scan, handle_query, handle_server, timings_session
+    MODULAR_IMPORTS = (_project_root / "core" / "jarvis.py").exists()
 except ImportError:
     # Fallback to original jarvis.py
     MODULAR_IMPORTS = False
@@ -91,18 +91,45 @@ def _main_modular():
         parser.add_argument('-v', '--voice', action='store_true', help='Enable voice mode')
         parser.add_argument('-scan', '--scan', action='store_true', help='Scan folder for sensitive files')
         parser.add_argument('-f', '--folder', dest='folder_path', help='Folder path to scan (required with -scan)')
+        parser.add_argument('--concurrency', type=int, help='Parallel AI classification workers for -scan')
+        parser.add_argument('--rate-limit', dest='rate_limit', type=float,
+                           help='Maximum AI calls per minute for -scan (0 for unlimited)')
+        parser.add_argument('--unordered', action='store_true',
+                           help='Print -scan results as they finish instead of in file order')
+        parser.add_argument('--resume', action='store_true',
+                           help='Resume an interrupted -scan from its last checkpoint')
+        parser.add_argument('--report-format', dest='report_format', choices=['jsonl', 'sarif', 'csv'],
+                           help='Stream -scan results as a JSONL, SARIF or CSV report')
+        parser.add_argument('--report-file', dest='report_file', default='-',
+                           help='Report output path for --report-format (default: stdout)')
         parser.add_argument('-monitor', '--monitor', dest='monitor_type', 
-                           help='Monitor system activity (network, process)')
+                           help='Monitor system activity (network, process; "all" or a comma list runs them in one daemon)')
+        parser.add_argument('--metrics-port', dest='metrics_port', type=int,
+                           help='Serve Prometheus metrics on this local port while -monitor runs')
+        parser.add_argument('--timings', action='store_true',
+                           help='Print a per-stage timing breakdown (AI calls, commands, system info, scan stages)')
+        parser.add_argument('--trace', dest='trace_file',
+                           help='Write a Chrome trace-event JSON file of all timed stages')
+        parser.add_argument('--no-server', dest='no_server', action='store_true',
+                           help='Answer in this process instead of the resident Jarvis server')
+        parser.add_argument('--new-session', dest='new_session', action='store_true',
+                           help='Start a new conversation instead of following up on this terminal\'s last queries')
+        parser.add_argument('--server', dest='server_action', choices=['status', 'stop'],
+                           help='Show or stop the resident Jarvis server')
         
         args = parser.parse_args()
     
     # Route to appropriate handler
-    if hasattr(args, 'monitor_type') and args.monitor_type:
-        handle_monitor(args)
-    elif hasattr(args, 'scan') and args.scan:
-        handle_scan(args)
-    else:
-        handle_query(args)
+    if getattr(args, 'server_action', None):
+        handle_server(args)
+        return
+    with timings_session(args):
+        if hasattr(args, 'monitor_type') and args.monitor_type:
+            handle_monitor(args)
+        elif hasattr(args, 'scan') and args.scan:
+            handle_scan(args)
+        else:
+            handle_query(args)
 
 
 if __name__ == "__main__":
@@ -98,10 +98,78 @@ def create_parser() -> argparse.ArgumentParser:
         dest='folder_path',
         help='Folder path to scan (required with -scan)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Parallel AI classification workers for -scan (default: 4)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        dest='rate_limit',
+        type=float,
+        help='Maximum AI calls per minute for -scan, matched to the Drona quota (0 for unlimited)'
+    )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Print -scan results as they finish instead of in file order'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume an interrupted -scan from its last checkpoint'
+    )
+    parser.add_argument(
+        '--report-format',
+        dest='report_format',
+        choices=['jsonl', 'sarif', 'csv'],
+        help='Stream -scan results as a JSONL, SARIF or CSV report (progress moves to stderr on stdout reports)'
+    )
+    parser.add_argument(
+        '--report-file',
+        dest='report_file',
+        default='-',
+        help='Report output path for --report-format (default: stdout)'
+    )
     parser.add_argument(
         '-monitor', '--monitor',
         dest='monitor_type',
-        help='Monitor system activity (network, process, cpu, memory, disk)'
+        help='Monitor system activity (network, process, cpu, memory, disk); '
+             '"all" or a comma list such as process,network runs the monitors in one daemon'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        dest='metrics_port',
+        type=int,
+        help='Serve Prometheus metrics at http://127.0.0.1:<port>/metrics while -monitor runs'
+    )
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Print a per-stage timing breakdown (AI calls, commands, system info, monitor cycles, scan stages)'
+    )
+    parser.add_argument(
+        '--trace',
+        dest='trace_file',
+        help='Write a Chrome trace-event JSON file of all timed stages (open in chrome://tracing or Perfetto)'
+    )
+    parser.add_argument(
+        '--no-server',
+        dest='no_server',
+        action='store_true',
+        help='Answer in this process instead of the resident Jarvis server (started on first use)'
+    )
+    parser.add_argument(
+        '--new-session',
+        dest='new_session',
+        action='store_true',
+        help="Start a new conversation instead of following up on this terminal's last queries"
+    )
+    parser.add_argument(
+        '--server',
+        dest='server_action',
+        choices=['status', 'stop'],
+        help='Show or stop the resident Jarvis server'
     )
     
     return parser
@@ -1,21 +1,33 @@
 """
 Configuration module for Jarvis
-Contains prompts and other configuration constants
+Contains prompts and their template registry, command rewrite rules and other configuration constants
 """
 
 from .prompts import (
     build_query_prompt,
     build_iteration_prompt,
+    query_prompt_sections,
+    iteration_prompt_sections,
     build_network_threat_prompt,
     build_process_threat_prompt,
     build_file_sensitivity_prompt,
 )
+from .rewrite_rules import DEFAULT_REWRITE_RULES
+from .templates import PromptTemplate, PromptText, get_template, list_templates, register_template
 
 __all__ = [
     'build_query_prompt',
     'build_iteration_prompt',
+    'query_prompt_sections',
+    'iteration_prompt_sections',
     'build_network_threat_prompt',
     'build_process_threat_prompt',
     'build_file_sensitivity_prompt',
+    'DEFAULT_REWRITE_RULES',
+    'PromptTemplate',
+    'PromptText',
+    'get_template',
+    'list_templates',
+    'register_template',
 ]
 
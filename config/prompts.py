@@ -1,23 +1,33 @@
 """
 Prompt templates for Jarvis AI Assistant
 All prompts are centralized here for easy maintenance and updates
+
+Every prompt starts with a static prefix registered in config.templates, so the large instruction
+blocks are rendered once and can be served from provider-side prompt caches
 """
 
+from config.templates import PromptTemplate, PromptText, join_sections, register_template
+
+
+def _context_section(context: str) -> str:
+    """Format session history for inclusion in a prompt"""
+    return f"\n{context}\n" if context else ""
 
-def build_query_prompt(query: str, system_info: str) -> str:
-    """Build the main query processing prompt"""
-    return f"""You are Jarvis, an AI assistant for macOS terminal. 
 
-Current System Information:
-{system_info}
+# Section priorities for token-budgeted assembly (0 is never trimmed, higher is trimmed first)
+PRIORITY_REQUIRED = 0
+PRIORITY_OUTPUT = 1
+PRIORITY_SYSTEM_INFO = 2
+PRIORITY_HISTORY = 3
 
-User Request: {query}
+# Command output is clipped to this size before it is dropped
+OUTPUT_MIN_TOKENS = 256
 
-RESPONSE FORMAT:
+QUERY_INSTRUCTIONS = """RESPONSE FORMAT:
 - If user needs a command executed, respond with JSON:
-  {{"command": "command_to_execute", "command_number": "last"}}
+  {"command": "command_to_execute", "command_number": "last"}
   OR
-  {{"command": "command_to_execute", "command_number": "intermediate"}}
+  {"command": "command_to_execute", "command_number": "intermediate"}
   
   CRITICAL DECISION: "intermediate" vs "last"
   
@@ -59,7 +69,8 @@ CRITICAL - NON-INTERACTIVE COMMANDS REQUIRED:
 - Use "ps aux" as alternative to interactive "top"
 - Commands must complete within 30 seconds or they will timeout
 - For monitoring commands, ALWAYS use flags that make them exit automatically
-- If you generate "top" without "-l 1", the system will auto-fix it, but you should get it right
+- Interactive or never-ending commands (top, htop, tail -f, watch, ping without -c, pagers) are auto-converted
+  to bounded forms for the current platform, but you should get it right
 
 AGENTIC BEHAVIOR - CRITICAL:
 - When you use "intermediate", the command output will be sent back to you automatically
@@ -70,19 +81,19 @@ AGENTIC BEHAVIOR - CRITICAL:
 - The system will keep iterating until you provide a final answer (plain text) or use "last"
 - Example flow:
   1. Query: "is my CPU usage normal?"
-  2. You: {{"command": "top -l 1 -o cpu", "command_number": "intermediate"}}
+  2. You: {"command": "top -l 1 -o cpu", "command_number": "intermediate"}
   3. System executes, sends output back to you
   4. You analyze output, then: either run more commands OR provide plain text answer
   5. If you provide plain text, the flow stops (that's your final answer)
 
 Examples (NOTE: All "top" commands MUST include "-l 1"):
-- User: "list files" → {{"command": "ls -la", "command_number": "last"}}
+- User: "list files" → {"command": "ls -la", "command_number": "last"}
   (Simple command, no analysis needed)
 - User: "what is Python?" → Python is a high-level programming language...
   (Information question, no command needed)
-- User: "check disk space" → {{"command": "df -h", "command_number": "intermediate"}}
+- User: "check disk space" → {"command": "df -h", "command_number": "intermediate"}
   (User said "check" - needs analysis, use intermediate)
-- User: "is my CPU usage normal?" → {{"command": "top -l 1 -o cpu", "command_number": "intermediate"}}
+- User: "is my CPU usage normal?" → {"command": "top -l 1 -o cpu", "command_number": "intermediate"}
   (After getting output, analyze CPU usage and provide insights as plain text response)
 
 WRONG (will timeout): "top -o mem", "top -o cpu", "top"
@@ -90,51 +101,34 @@ CORRECT (will work): "top -l 1 -o mem", "top -l 1 -o cpu", "top -l 1"
 
 Analyze the user's query and decide the best approach. Be thorough when analysis is needed, efficient when simple commands suffice. Use agentic iteration when multiple steps are required."""
 
+QUERY_TEMPLATE = register_template(PromptTemplate(
+    'query',
+    "You are Jarvis, an AI assistant for macOS terminal.\n\n" + QUERY_INSTRUCTIONS + "\n\n"
+))
 
-def build_iteration_prompt(initial_query: str, system_info: str, command: str, 
-                          output_text: str, success: bool) -> str:
-    """Build the prompt for command flow iteration"""
-    return f"""You are Jarvis, an AI assistant for macOS terminal.
-
-Current System Information:
-{system_info}
+ITERATION_TEMPLATE = register_template(PromptTemplate(
+    'iteration',
+    """You are Jarvis, an AI assistant for macOS terminal.
 
-ORIGINAL User Request: {initial_query}
-
-Command Just Executed: {command}
-Command Output:
-{output_text}
-Command Success: {success}
-
-Based on the command output above, continue working on the ORIGINAL user request: "{initial_query}"
+You are in the middle of an agentic command flow: a command you chose has just been executed and its output is shown below.
 
 IMPORTANT: You have 3 options:
-1. If more commands needed: respond with JSON {{"command": "next_command", "command_number": "intermediate"}}
+1. If more commands needed: respond with JSON {"command": "next_command", "command_number": "intermediate"}
 2. If done and want to provide final answer: respond with PLAIN TEXT (NO JSON) - this will end the flow
 3. Only use "last" if you need to run one final command that doesn't need analysis
 
 ⚠️ PREFER PLAIN TEXT RESPONSE over "last" when providing your final analysis/answer ⚠️
 
-Continue the agentic flow. Use the command output above to help answer: "{initial_query}"
+""",
+    """Based on the command output above, continue working on the ORIGINAL user request: "{initial_query}"
 Iterate as needed to fully answer the user's original request."""
+))
 
+NETWORK_THREAT_TEMPLATE = register_template(PromptTemplate(
+    'network_threat',
+    """You are a cybersecurity expert analyzing network connections for potential threats.
 
-def build_network_threat_prompt(connection: dict, process_name: str, process_exe: str,
-                                process_cmdline: str, remote_info: dict) -> str:
-    """Build the prompt for network connection threat analysis"""
-    return f"""You are a cybersecurity expert analyzing network connections for potential threats.
-            
-CONNECTION DETAILS:
-- Process Name: {process_name}
-- Process Path: {process_exe}
-- Process PID: {connection['pid']}
-- Command Line: {process_cmdline}
-- Local Address: {connection['local_ip']}:{connection['local_port']}
-- Remote Address: {connection['remote_ip']}:{connection['remote_port']}
-- Remote IP Type: {remote_info.get('type', 'Unknown') if remote_info else 'Unknown'}
-- Remote Hostname: {remote_info.get('hostname', 'N/A') if remote_info else 'N/A'}
-
-TASK: Analyze this outbound network connection and assess if it's suspicious or potentially malicious.
+TASK: Analyze the outbound network connection described below and assess if it's suspicious or potentially malicious.
 
 Consider:
 1. Is this a known legitimate application?
@@ -144,35 +138,32 @@ Consider:
 5. Are there any red flags in the command line arguments?
 
 RESPONSE FORMAT (JSON only):
-{{
+{
     "level": "LOW" or "MEDIUM" or "HIGH" or "CRITICAL",
     "analysis": "Brief analysis explaining the threat level assessment",
     "recommendations": "Specific recommendations for the user (e.g., 'Allow - this is normal Chrome activity', 'Investigate - unusual port for this application', 'Block immediately - known malicious pattern')",
     "is_suspicious": true or false
-}}
+}
 
-Respond ONLY with valid JSON, no additional text."""
-
-
-def build_process_threat_prompt(name: str, pid: int, exe: str, username: str,
-                                cmdline_str: str, cpu_percent: float, mem_percent: float,
-                                reasons_str: str) -> str:
-    """Build the prompt for process threat analysis"""
-    return f"""You are a cybersecurity expert analyzing a potentially suspicious process.
+""",
+    """CONNECTION DETAILS:
+- Process Name: {process_name}
+- Process Path: {process_exe}
+- Process PID: {pid}
+- Command Line: {process_cmdline}
+- Local Address: {local_ip}:{local_port}
+- Remote Address: {remote_ip}:{remote_port}
+- Remote IP Type: {remote_type}
+- Remote Hostname: {remote_hostname}
 
-PROCESS INFORMATION:
-- Process Name: {name}
-- PID: {pid}
-- Executable Path: {exe}
-- User: {username}
-- Command Line: {cmdline_str}
-- CPU Usage: {cpu_percent:.1f}%
-- Memory Usage: {mem_percent:.1f}%
+Respond ONLY with valid JSON, no additional text."""
+))
 
-THREAT INDICATORS DETECTED:
-{reasons_str}
+PROCESS_THREAT_TEMPLATE = register_template(PromptTemplate(
+    'process_threat',
+    """You are a cybersecurity expert analyzing a potentially suspicious process.
 
-TASK: Analyze this process and assess if it's malicious, suspicious, or benign.
+TASK: Analyze the process described below and assess if it's malicious, suspicious, or benign.
 
 Consider:
 1. Is this a known legitimate process or potentially malicious?
@@ -183,31 +174,35 @@ Consider:
 6. Could this be attempting file deletion, corruption, or system compromise?
 
 RESPONSE FORMAT (JSON only):
-{{
+{
     "level": "LOW" or "MEDIUM" or "HIGH" or "CRITICAL",
     "analysis": "Brief analysis explaining the threat assessment",
     "recommendations": "Specific recommendations (Allow, Monitor, Investigate, Terminate, Block)",
     "is_malicious": true or false,
     "threat_type": "none/malware/ransomware/cryptominer/backdoor/keylogger/other"
-}}
-
-Respond ONLY with valid JSON, no additional text."""
+}
 
+""",
+    """PROCESS INFORMATION:
+- Process Name: {name}
+- PID: {pid}
+- Executable Path: {exe}
+- User: {username}
+- Command Line: {cmdline_str}
+- CPU Usage: {cpu_percent:.1f}%
+- Memory Usage: {mem_percent:.1f}%
 
-def build_file_sensitivity_prompt(file_metadata: dict, file_content_markdown: str) -> str:
-    """Build the prompt for file sensitivity analysis"""
-    return f"""You are a security expert analyzing file content to determine if it contains sensitive information.
+THREAT INDICATORS DETECTED:
+{reasons_str}
 
-File Metadata:
-- Path: {file_metadata.get('path', 'unknown')}
-- Size: {file_metadata.get('size', 0)} bytes
-- Extension: {file_metadata.get('extension', 'unknown')}
-- Type: {file_metadata.get('type', 'unknown')}
+Respond ONLY with valid JSON, no additional text."""
+))
 
-File Content (Markdown):
-{file_content_markdown}
+FILE_SENSITIVITY_TEMPLATE = register_template(PromptTemplate(
+    'file_sensitivity',
+    """You are a security expert analyzing file content to determine if it contains sensitive information.
 
-TASK: Analyze this file and determine if it contains sensitive information that should be protected.
+TASK: Analyze the file below and determine if it contains sensitive information that should be protected.
 
 CRITICAL: Only flag as sensitive if ACTUAL sensitive data values are present, NOT just mentions or placeholders.
 
@@ -238,12 +233,110 @@ IMPORTANT DISTINCTIONS:
 Only mark as sensitive if you can see ACTUAL sensitive data values in the file content, not just references to sensitive data types or empty placeholders.
 
 RESPONSE FORMAT (JSON only):
-{{
+{
     "is_sensitive": true or false,
     "reason": "Brief explanation of why this file is or is not sensitive",
     "sensitivity_level": "high" or "medium" or "low" or "none",
     "recommended_protection": "Specific protection recommendations (e.g., 'encrypt', 'restrict access', 'move to secure location', 'remove from repository')"
-}}
+}
+
+""",
+    """File Metadata:
+- Path: {path}
+- Size: {size} bytes
+- Extension: {extension}
+- Type: {type}
+
+File Content (Markdown):
+{content}
 
 Respond ONLY with valid JSON, no additional text."""
+))
+
+
+def _section(name: str, text: str, priority: int = PRIORITY_REQUIRED, min_tokens: int = 0) -> dict:
+    """One prompt section for core.ai.prompt_builder.PromptBuilder"""
+    return {'name': name, 'text': text, 'priority': priority, 'min_tokens': min_tokens}
+
+
+def query_prompt_sections(query: str, system_info: str, context: str = "") -> list:
+    """Sections of the main query prompt, in order (the first is the cacheable static prefix)"""
+    return [
+        QUERY_TEMPLATE.prefix_section(),
+        _section('system_info', f"Current System Information:\n{system_info}\n", PRIORITY_SYSTEM_INFO),
+        _section('history', _context_section(context), PRIORITY_HISTORY),
+        _section('request', f"\nUser Request: {query}\n"),
+    ]
+
 
+def build_query_prompt(query: str, system_info: str, context: str = "") -> PromptText:
+    """Build the main query processing prompt (context: earlier turns from the session)"""
+    return join_sections(query_prompt_sections(query, system_info, context))
+
+
+def iteration_prompt_sections(initial_query: str, system_info: str, command: str,
+                              output_text: str, success: bool, context: str = "",
+                              execution_note: str = "") -> list:
+    """Sections of the command flow iteration prompt, in order (the first is the cacheable static prefix)"""
+    note = f"Execution Note: {execution_note}\n" if execution_note else ""
+    return [
+        ITERATION_TEMPLATE.prefix_section(),
+        _section('system_info', f"Current System Information:\n{system_info}\n", PRIORITY_SYSTEM_INFO),
+        _section('history', _context_section(context), PRIORITY_HISTORY),
+        _section('request', f"\nORIGINAL User Request: {initial_query}\n\nCommand Just Executed: {command}\n"),
+        _section('output', f"Command Output:\n{output_text}\n", PRIORITY_OUTPUT, OUTPUT_MIN_TOKENS),
+        _section('result', f"Command Success: {success}\n{note}\n"),
+        _section('follow_up', ITERATION_TEMPLATE.suffix.format(initial_query=initial_query)),
+    ]
+
+
+def build_iteration_prompt(initial_query: str, system_info: str, command: str, 
+                          output_text: str, success: bool, context: str = "",
+                          execution_note: str = "") -> PromptText:
+    """
+    Build the prompt for command flow iteration
+    
+    context: earlier steps and turns from the session
+    execution_note: how the output was obtained (e.g. reused from the command cache)
+    """
+    return join_sections(iteration_prompt_sections(
+        initial_query, system_info, command, output_text, success, context, execution_note
+    ))
+
+
+def build_network_threat_prompt(connection: dict, process_name: str, process_exe: str,
+                                process_cmdline: str, remote_info: dict) -> PromptText:
+    """Build the prompt for network connection threat analysis"""
+    return NETWORK_THREAT_TEMPLATE.render(
+        process_name=process_name,
+        process_exe=process_exe,
+        pid=connection['pid'],
+        process_cmdline=process_cmdline,
+        local_ip=connection['local_ip'],
+        local_port=connection['local_port'],
+        remote_ip=connection['remote_ip'],
+        remote_port=connection['remote_port'],
+        remote_type=remote_info.get('type', 'Unknown') if remote_info else 'Unknown',
+        remote_hostname=remote_info.get('hostname', 'N/A') if remote_info else 'N/A'
+    )
+
+
+def build_process_threat_prompt(name: str, pid: int, exe: str, username: str,
+                                cmdline_str: str, cpu_percent: float, mem_percent: float,
+                                reasons_str: str) -> PromptText:
+    """Build the prompt for process threat analysis"""
+    return PROCESS_THREAT_TEMPLATE.render(
+        name=name, pid=pid, exe=exe, username=username, cmdline_str=cmdline_str,
+        cpu_percent=cpu_percent, mem_percent=mem_percent, reasons_str=reasons_str
+    )
+
+
+def build_file_sensitivity_prompt(file_metadata: dict, file_content_markdown: str) -> PromptText:
+    """Build the prompt for file sensitivity analysis"""
+    return FILE_SENSITIVITY_TEMPLATE.render(
+        path=file_metadata.get('path', 'unknown'),
+        size=file_metadata.get('size', 0),
+        extension=file_metadata.get('extension', 'unknown'),
+        type=file_metadata.get('type', 'unknown'),
+        content=file_content_markdown
+    )
@@ -0,0 +1,61 @@
+"""
+Command rewrite rules for Jarvis AI Assistant
+Turns interactive or never-ending commands into bounded, non-interactive equivalents before they run
+
+Rules apply in order to every segment of a command line whose program matches. Keys:
+    program         Program name the rule applies to
+    platforms       Limit the rule to these platform.system() values (default: all)
+    replace_program Swap the program (later rules then match the new name)
+    drop_args       With replace_program: discard all of the old program's arguments
+    drop_options    With replace_program: discard the old program's options (keep operands)
+    remove_args     Flags to remove (short flags are also removed from clusters like -fn)
+    rename_options  Options to rename, keeping their value ({"-l": "-n"}: -l 1 -> -n 1, -l1 -> -n1)
+    option_values   Values to translate after an option ({"-o": {"cpu": "%CPU"}}: -o cpu -> -o %CPU)
+    add_args        Arguments inserted right after the program name (later rules insert in front)...
+    unless_args     ...unless one of these flags is already present
+    unwrap          Run the wrapped command once instead (value: options of the wrapper that take a value)
+    description     Human-readable note
+
+User rules from the command_rewrite_rules config key run before these; {"program": "git", "disable": true}
+drops the default rules for a program.
+"""
+
+DEFAULT_REWRITE_RULES = [
+    # Full-screen monitors become one-shot top
+    {"program": "htop", "replace_program": "top", "drop_args": True,
+     "description": "htop is interactive; use a single top snapshot"},
+    {"program": "btop", "replace_program": "top", "drop_args": True,
+     "description": "btop is interactive; use a single top snapshot"},
+    {"program": "top", "platforms": ["Darwin"], "add_args": ["-l", "1"], "unless_args": ["-l"],
+     "description": "sample once and exit"},
+    # macOS-style top (what the prompt asks for) translated to procps top: -l N samples -> -n N
+    # iterations, and sort keys -> field names
+    {"program": "top", "platforms": ["Linux"], "rename_options": {"-l": "-n"},
+     "option_values": {"-o": {"cpu": "%CPU", "mem": "%MEM", "pid": "PID", "command": "COMMAND",
+                              "time": "TIME+", "user": "USER", "rsize": "RES", "vsize": "VIRT"}},
+     "description": "translate macOS top options"},
+    {"program": "top", "platforms": ["Linux"], "add_args": ["-n", "1"], "unless_args": ["-n"],
+     "description": "one iteration and exit"},
+    {"program": "top", "platforms": ["Linux"], "add_args": ["-b"], "unless_args": ["-b"],
+     "description": "batch mode instead of the full-screen UI"},
+
+    # Followers and repeaters get a bounded form
+    {"program": "tail", "remove_args": ["-f", "-F", "--follow", "--retry"],
+     "description": "print the current tail instead of following"},
+    {"program": "journalctl", "remove_args": ["-f", "--follow"],
+     "description": "print current entries instead of following"},
+    {"program": "journalctl", "add_args": ["--no-pager"], "unless_args": ["--no-pager"]},
+    {"program": "watch", "unwrap": ["-n", "--interval", "-q", "--equexit"],
+     "description": "run the watched command once"},
+    {"program": "ping", "platforms": ["Linux", "Darwin"], "add_args": ["-c", "4"], "unless_args": ["-c"],
+     "description": "send a fixed number of probes"},
+    {"program": "tcpdump", "add_args": ["-c", "100"], "unless_args": ["-c"],
+     "description": "capture a fixed number of packets"},
+
+    # Pagers
+    {"program": "less", "replace_program": "cat", "drop_options": True},
+    {"program": "more", "replace_program": "cat", "drop_options": True},
+    {"program": "man", "add_args": ["-P", "cat"], "unless_args": ["-P"]},
+    {"program": "git", "add_args": ["--no-pager"], "unless_args": ["--no-pager"]},
+    {"program": "systemctl", "add_args": ["--no-pager"], "unless_args": ["--no-pager"]},
+]
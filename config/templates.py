@@ -0,0 +1,83 @@
+"""
+Prompt template registry for Jarvis AI Assistant
+Each template is an immutable static prefix (rendered once, identical on every call) plus a small dynamic suffix,
+so providers can cache the prefix (Gemini cached content, SLM server prompt caches)
+"""
+
+import hashlib
+import string
+from typing import Dict, Any, List, Optional
+
+
+class PromptText(str):
+    """Prompt string that remembers its cacheable static prefix"""
+
+    def __new__(cls, text: str, prefix: str = "", cache_key: Optional[str] = None):
+        prompt = super().__new__(cls, text)
+        prompt.prefix = prefix if text.startswith(prefix) else ""
+        prompt.cache_key = cache_key if prompt.prefix else None
+        return prompt
+
+    @property
+    def suffix(self) -> str:
+        """The part of the prompt after the static prefix"""
+        return str(self)[len(self.prefix):]
+
+
+class PromptTemplate:
+    """A prompt split into a static prefix and a str.format suffix"""
+
+    def __init__(self, name: str, prefix: str, suffix: str = ""):
+        """
+        Initialize template
+
+        Args:
+            name: Registry name
+            prefix: Static instructions (never formatted, so braces need no escaping)
+            suffix: str.format template for the per-call part
+        """
+        self.name = name
+        self.prefix = prefix
+        self.suffix = suffix
+        self.cache_key = hashlib.sha256(f"{name}\0{prefix}".encode('utf-8')).hexdigest()[:16]
+        self.fields = sorted({field.split('[')[0].split('.')[0]
+                              for _, field, _, _ in string.Formatter().parse(suffix) if field})
+
+    def render(self, **fields: Any) -> PromptText:
+        """Render the prompt (the prefix is reused as-is)"""
+        return PromptText(self.prefix + self.suffix.format(**fields), self.prefix, self.cache_key)
+
+    def prefix_section(self, name: str = 'instructions') -> Dict[str, Any]:
+        """The static prefix as a never-trimmed prompt section (see config.prompts)"""
+        return {'name': name, 'text': self.prefix, 'priority': 0, 'min_tokens': 0, 'cache_key': self.cache_key}
+
+
+def join_sections(sections: List[Dict[str, Any]]) -> PromptText:
+    """Join prompt sections; a leading section with a cache_key becomes the cacheable prefix"""
+    text = ''.join(s['text'] for s in sections)
+    if sections and sections[0].get('cache_key'):
+        return PromptText(text, sections[0]['text'], sections[0]['cache_key'])
+    return PromptText(text)
+
+
+_registry: Dict[str, PromptTemplate] = {}
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    """Add a template to the registry"""
+    _registry[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    """Look up a registered template (KeyError if unknown)"""
+    if not _registry:
+        import config.prompts  # noqa: F401 - registers the built-in templates
+    return _registry[name]
+
+
+def list_templates() -> List[str]:
+    """Names of registered templates"""
+    if not _registry:
+        import config.prompts  # noqa: F401
+    return sorted(_registry)
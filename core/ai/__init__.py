@@ -4,5 +4,11 @@ from core.ai.base import AIProvider
 from core.ai.gemini import GeminiProvider
 from core.ai.slm import SLMProvider
 from core.ai.drona import DronaProvider
+from core.ai.router import RouterProvider
+from core.ai.resilience import ResilientProvider, CircuitBreaker, breaker_states
+from core.ai.replay import RecordingProvider, ReplayProvider
+from core.ai.mock_server import MockProvider
 
-__all__ = ['AIProvider', 'GeminiProvider', 'SLMProvider', 'DronaProvider']
+__all__ = ['AIProvider', 'GeminiProvider', 'SLMProvider', 'DronaProvider', 'RouterProvider',
+           'ResilientProvider', 'CircuitBreaker', 'breaker_states', 'RecordingProvider', 'ReplayProvider',
+           'MockProvider']
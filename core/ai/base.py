@@ -10,6 +10,9 @@ from typing import Optional
 class AIProvider(ABC):
     """Base class for AI providers"""
     
+    # Whether query() accepts image_data
+    supports_images = False
+    
     @abstractmethod
     def setup(self) -> bool:
         """Setup the AI connection. Returns True if successful."""
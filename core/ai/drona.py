@@ -3,6 +3,7 @@ Drona API provider
 """
 
 import sys
+import threading
 from typing import Optional
 import sys
 from pathlib import Path
@@ -20,10 +21,18 @@ from core.ai.base import AIProvider
 class DronaProvider(AIProvider):
     """Drona API provider"""
     
+    supports_images = True
+    
     def __init__(self, bot_id: Optional[str] = None):
         self.drona_url = None
         self.bot_id = bot_id
         self.ai_available = False
+        self._local = threading.local()
+    
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """HTTP status of the last query made on the current thread (None on success)"""
+        return getattr(self._local, 'status_code', None)
     
     def setup(self) -> bool:
         """Setup Drona connection"""
@@ -60,6 +69,7 @@ class DronaProvider(AIProvider):
     
     def query(self, message: str, image_data: Optional[str] = None, test: bool = False, **kwargs) -> Optional[str]:
         """Query Drona server with message, machine details, IP address, and optionally image"""
+        self._local.status_code = None
         try:
             import requests
             
@@ -90,6 +100,7 @@ class DronaProvider(AIProvider):
                 result = response.json()
                 return result.get("response", result.get("message", result.get("text", "")))
             else:
+                self._local.status_code = response.status_code
                 if not test:
                     print(f"❌ Drona API server error: HTTP {response.status_code}")
                     try:
@@ -106,6 +117,12 @@ class DronaProvider(AIProvider):
                 print(f"❌ requests module not found. Please install it: pip3 install requests")
             return None
         except Exception as e:
+            # Treat timeouts and dropped connections like their HTTP equivalents
+            error_name = type(e).__name__
+            if 'Timeout' in error_name:
+                self._local.status_code = 408
+            elif 'ConnectionError' in error_name:
+                self._local.status_code = 503
             if not test:
                 print(f"❌ Drona query failed: {e}")
             elif test:
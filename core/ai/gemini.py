@@ -3,8 +3,11 @@ Google Gemini AI provider
 """
 
 import sys
+import threading
+import time
+from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Any
 
 # Add parent directories to path for imports
 _project_root = Path(__file__).parent.parent.parent
@@ -13,14 +16,34 @@ if str(_project_root) not in sys.path:
 
 from utils.config import load_config
 from core.ai.base import AIProvider
+from core.ai.prompt_builder import estimate_tokens
+from core.ai.resilience import status_from_exception
+from utils.metrics import CACHE_REQUESTS
 
 
 class GeminiProvider(AIProvider):
     """Google Gemini AI provider"""
     
+    supports_images = True
+    
     def __init__(self):
         self.ai_model = None
         self.ai_available = False
+        self.model_name = None
+        
+        # Explicit context caches for static prompt prefixes, keyed by template cache key
+        self.context_cache = True
+        self.cache_ttl = 3600
+        self.cache_min_tokens = 1024
+        self._prefix_models: Dict[str, Dict[str, Any]] = {}
+        self._uncacheable = set()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+    
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """HTTP-style status of the last failed query on the current thread (None on success)"""
+        return getattr(self._local, 'status_code', None)
     
     def setup(self) -> bool:
         """Setup Gemini connection"""
@@ -30,6 +53,11 @@ class GeminiProvider(AIProvider):
             config = load_config()
             api_key = config.get('gemini_api_key')
             model_name = config.get('gemini_model_name', 'gemini-2.5-flash')
+            self.model_name = model_name
+            # Explicit caching needs google-generativeai 0.7+; older SDKs quietly send full prompts
+            self.context_cache = bool(config.get('gemini_context_cache', True)) and self._caching_supported()
+            self.cache_ttl = int(config.get('gemini_cache_ttl', 3600))
+            self.cache_min_tokens = int(config.get('gemini_cache_min_tokens', 1024))
             
             if not api_key:
                 print("❌ Gemini API key not configured")
@@ -59,12 +87,66 @@ class GeminiProvider(AIProvider):
                 print("   jarvis configure -m gemini --api-key <your-api-key>")
             return False
     
+    @staticmethod
+    def _caching_supported() -> bool:
+        """Check whether the installed SDK has the context caching API"""
+        try:
+            from google.generativeai import caching
+            return hasattr(caching, 'CachedContent')
+        except ImportError:
+            return False
+    
+    def _prefix_model(self, prompt: str):
+        """Model bound to cached content holding the prompt's static prefix (None if not cacheable)"""
+        key = getattr(prompt, 'cache_key', None)
+        prefix = getattr(prompt, 'prefix', '')
+        if not (self.context_cache and key and prefix) or key in self._uncacheable:
+            return None
+        if estimate_tokens(prefix) < self.cache_min_tokens:
+            # Below the API's minimum cache size; Gemini's implicit prefix caching may still apply
+            self._uncacheable.add(key)
+            return None
+        
+        with self._cache_lock:
+            entry = self._prefix_models.get(key)
+            if entry and entry['expires'] > time.time():
+                CACHE_REQUESTS.inc(cache='gemini_prefix', result='hit')
+                return entry['model']
+            CACHE_REQUESTS.inc(cache='gemini_prefix', result='miss')
+            try:
+                import google.generativeai as genai
+                from google.generativeai import caching
+                
+                cached = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name=f"jarvis-{key}",
+                    system_instruction=prefix,
+                    ttl=timedelta(seconds=self.cache_ttl)
+                )
+                model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+                # Renew a little before the server drops it
+                self._prefix_models[key] = {'model': model, 'expires': time.time() + self.cache_ttl - 60}
+                return model
+            except Exception as e:
+                self._uncacheable.add(key)
+                print(f"⚠️ Gemini context cache unavailable, sending full prompts: {e}")
+                return None
+    
     def query(self, prompt: str, image_data: Optional[str] = None, image_mime_type: Optional[str] = None, **kwargs) -> Optional[str]:
         """Query Gemini with a prompt"""
+        self._local.status_code = None
         try:
             if not self.ai_available or not self.ai_model:
                 return None
             
+            # Static prefix served from cached content: only the dynamic suffix is sent
+            model = self._prefix_model(prompt)
+            if model is not None:
+                content = prompt.suffix
+            else:
+                model = self.ai_model
+                content = str(prompt)
+            
             if image_data and image_mime_type:
                 import PIL.Image
                 import io
@@ -75,14 +157,15 @@ class GeminiProvider(AIProvider):
                 image = PIL.Image.open(io.BytesIO(image_bytes))
                 
                 # Generate with image
-                response = self.ai_model.generate_content([prompt, image])
+                response = model.generate_content([content, image])
             else:
-                response = self.ai_model.generate_content(prompt)
+                response = model.generate_content(content)
             
             if response and response.text:
                 return response.text.strip()
             return None
         except Exception as e:
+            self._local.status_code = status_from_exception(e)
             print(f"❌ Gemini query failed: {e}")
             return None
     
@@ -0,0 +1,377 @@
+"""
+Local LLM stand-in server
+Speaks the SLM /generate and Drona chat protocols with configurable latency, injected errors and
+optional streaming, so agent flows and monitors can be exercised and timed without a real backend.
+Can also proxy to a real server while recording its traffic, or replay recorded fixtures.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from core.ai.base import AIProvider
+from core.ai.replay import FixtureStore
+
+
+DEFAULT_ERROR_CODES = [429, 500, 503]
+
+
+class LatencyModel:
+    """Response delay drawn from a distribution given as 'kind:params'"""
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, spec: str = 'fixed:0', rng: Optional[random.Random] = None):
+        """
+        Initialize latency model
+
+        Args:
+            spec: One of fixed:<s>, uniform:<low>,<high>, normal:<mean>,<stddev>,
+                lognormal:<median>,<sigma>, exponential:<mean> (a bare number means fixed)
+            rng: Random source (seeded for reproducible runs)
+        """
+        kind, _, params = str(spec).partition(':')
+        if not params and kind not in self.KINDS:
+            kind, params = 'fixed', kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (use one of {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(',') if p.strip()] if params else [0.0]
+        self.spec = spec
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        """One delay in seconds (never negative)"""
+        p = self.params
+        if self.kind == 'uniform':
+            delay = self.rng.uniform(p[0], p[1] if len(p) > 1 else p[0])
+        elif self.kind == 'normal':
+            delay = self.rng.gauss(p[0], p[1] if len(p) > 1 else 0.0)
+        elif self.kind == 'lognormal':
+            delay = p[0] * math.exp(self.rng.gauss(0.0, p[1] if len(p) > 1 else 0.5))
+        elif self.kind == 'exponential':
+            delay = self.rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        else:
+            delay = p[0]
+        return max(0.0, delay)
+
+
+def synthetic_response(prompt: str) -> str:
+    """Plausible answer for a Jarvis prompt, chosen by the response format the prompt asks for"""
+    if '"is_sensitive"' in prompt:
+        return json.dumps({"is_sensitive": False, "reason": "Mock analysis: no sensitive content detected",
+                           "sensitivity_level": "none", "recommended_protection": "none"})
+    if '"is_malicious"' in prompt:
+        return json.dumps({"level": "LOW", "analysis": "Mock analysis: process looks normal",
+                           "recommendations": "Allow", "is_malicious": False, "threat_type": "none"})
+    if '"is_suspicious"' in prompt:
+        return json.dumps({"level": "LOW", "analysis": "Mock analysis: connection looks normal",
+                           "recommendations": "Allow", "is_suspicious": False})
+    if 'Command Just Executed:' in prompt:
+        return "Mock analysis: the command completed and its output looks as expected."
+    if 'User Request:' in prompt:
+        return json.dumps({"command": "echo mock", "command_number": "intermediate"})
+    return "Mock response."
+
+
+class MockProvider(AIProvider):
+    """In-process provider giving the mock server's answers without HTTP (for benchmarks and offline runs)"""
+
+    supports_images = True
+
+    def __init__(self, latency: str = 'fixed:0', error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Initialize mock provider
+
+        Args:
+            latency: Latency distribution spec (see LatencyModel)
+            error_rate: Share of queries that fail with HTTP 503
+            seed: Random seed for reproducible runs
+        """
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        return getattr(self._local, 'status_code', None)
+
+    def setup(self) -> bool:
+        return True
+
+    def is_available(self) -> bool:
+        return True
+
+    def query(self, prompt: str, **kwargs) -> Optional[str]:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample()
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        self._local.status_code = 503 if failed else None
+        return None if failed else synthetic_response(prompt)
+
+
+class MockLLMServer:
+    """Threaded HTTP server imitating the SLM and Drona endpoints"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, latency: str = 'fixed:0',
+                 error_rate: float = 0.0, error_codes: Optional[List[int]] = None, hang_rate: float = 0.0,
+                 hang_seconds: float = 35.0, drop_rate: float = 0.0, token_delay: float = 0.02,
+                 responses: Optional[List[Tuple[str, str]]] = None, fixtures: Optional[str] = None,
+                 replay_latency: bool = False, upstream: Optional[str] = None, seed: Optional[int] = None,
+                 verbose: bool = False):
+        """
+        Initialize mock server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency: Latency distribution spec (see LatencyModel)
+            error_rate: Share of requests answered with an error status
+            error_codes: Statuses to pick injected errors from
+            hang_rate: Share of requests that hang for hang_seconds (client timeouts)
+            hang_seconds: How long a hanging request stalls
+            drop_rate: Share of requests whose connection is closed without a response
+            token_delay: Delay between chunks of a streamed response
+            responses: (substring, response) pairs checked before the synthetic answers
+            fixtures: Recorded fixture file to replay from, or to record into when upstream is set
+            replay_latency: Use each fixture's recorded latency instead of the latency model
+            upstream: Real server base URL to proxy to; its responses are recorded to fixtures
+            seed: Random seed for reproducible latency and error injection
+            verbose: Log every request
+        """
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.error_codes = error_codes or list(DEFAULT_ERROR_CODES)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.drop_rate = drop_rate
+        self.token_delay = token_delay
+        self.responses = list(responses or [])
+        self.store = FixtureStore(fixtures) if fixtures else None
+        self.replay_latency = replay_latency
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.verbose = verbose
+        self.stats = {'requests': 0, 'errors': 0, 'hangs': 0, 'drops': 0, 'streamed': 0,
+                      'replayed': 0, 'replay_misses': 0, 'recorded': 0}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **overrides) -> 'MockLLMServer':
+        """Build a server from mock_llm_* config keys (keyword arguments take precedence)"""
+        settings = {
+            'host': config.get('mock_llm_host', '127.0.0.1'),
+            'port': int(config.get('mock_llm_port', 8765)),
+            'latency': config.get('mock_llm_latency', 'fixed:0'),
+            'error_rate': float(config.get('mock_llm_error_rate', 0.0)),
+            'error_codes': config.get('mock_llm_error_codes'),
+            'hang_rate': float(config.get('mock_llm_hang_rate', 0.0)),
+            'drop_rate': float(config.get('mock_llm_drop_rate', 0.0)),
+            'token_delay': float(config.get('mock_llm_token_delay', 0.02)),
+        }
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**settings)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def mode(self) -> str:
+        if self.upstream:
+            return 'record'
+        return 'replay' if self.store is not None else 'synthetic'
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-llm', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'MockLLMServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def answer(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Optional[str], float]:
+        """
+        Work out the reply to one request
+
+        Returns:
+            (status, response text, seconds to wait before replying); a None response with status 200
+            means the connection should be dropped
+        """
+        prompt = str(payload.get('prompt', payload.get('message', '')))
+        if self.upstream:
+            return self._proxy(path, payload, prompt)
+
+        delay = self.latency.sample()
+        if self._roll(self.drop_rate):
+            self._count('drops')
+            return 200, None, delay
+        if self._roll(self.hang_rate):
+            self._count('hangs')
+            return 504, json.dumps({"error": "mock upstream timeout"}), self.hang_seconds
+        if self._roll(self.error_rate):
+            self._count('errors')
+            with self._lock:
+                status = self.rng.choice(self.error_codes)
+            return status, json.dumps({"error": f"mock injected error {status}"}), delay
+
+        if self.store is not None:
+            entry = self.store.lookup(prompt)
+            if entry is not None:
+                self._count('replayed')
+                if self.replay_latency:
+                    delay = float(entry.get('latency') or 0.0)
+                if entry.get('response') is None:
+                    status = entry.get('status') or 500
+                    return status, json.dumps({"error": f"recorded error {status}"}), delay
+                return 200, entry['response'], delay
+            self._count('replay_misses')
+
+        for match, response in self.responses:
+            if match in prompt:
+                return 200, response, delay
+        return 200, synthetic_response(prompt), delay
+
+    def _proxy(self, path: str, payload: Dict[str, Any], prompt: str) -> Tuple[int, Optional[str], float]:
+        """Forward to the real server and record the exchange"""
+        request = urllib.request.Request(self.upstream + path, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        started = time.monotonic()
+        status, text = 502, None
+        try:
+            with urllib.request.urlopen(request, timeout=60) as reply:
+                status = reply.status
+                result = json.loads(reply.read().decode('utf-8') or '{}')
+                text = result.get("response", result.get("message", result.get("text", "")))
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception as e:
+            if self.verbose:
+                print(f"⚠️ Upstream request failed: {e}")
+        if self.store is not None:
+            self.store.record(prompt, text, time.monotonic() - started, 'drona' if path != '/generate' else 'slm',
+                              None if text is not None else status)
+            self._count('recorded')
+        if text is None:
+            return status, json.dumps({"error": f"upstream error {status}"}), 0.0
+        return 200, text, 0.0
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, fmt, *args):
+                if server.verbose:
+                    print(f"🧪 {self.address_string()} {fmt % args}")
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path == '/health':
+                    self._send_json(200, {'status': 'ok', 'mode': server.mode})
+                elif path == '/stats':
+                    with server._lock:
+                        self._send_json(200, dict(server.stats))
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    payload = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                except (ValueError, UnicodeDecodeError):
+                    self._send_json(400, {'error': 'invalid JSON body'})
+                    return
+                server._count('requests')
+
+                # /generate is the SLM protocol; any other path is treated as the Drona chat endpoint
+                status, text, delay = server.answer(parts.path, payload)
+                if delay:
+                    time.sleep(delay)
+                if text is None:
+                    self.close_connection = True
+                    return
+                if status != 200:
+                    self._send_json(status, json.loads(text))
+                    return
+
+                stream = payload.get('stream') or parse_qs(parts.query).get('stream', ['0'])[0] in ('1', 'true')
+                if stream:
+                    server._count('streamed')
+                    self._stream(text)
+                else:
+                    self._send_json(200, {'response': text})
+
+            def _stream(self, text: str) -> None:
+                """Newline-delimited JSON chunks ({"token": ...}), then a final {"done": true, "response": ...}"""
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                tokens = [word + ' ' for word in text.split(' ')]
+                tokens[-1] = tokens[-1][:-1]
+                try:
+                    for token in tokens:
+                        self._chunk(json.dumps({'token': token}) + '\n')
+                        if server.token_delay:
+                            time.sleep(server.token_delay)
+                    self._chunk(json.dumps({'done': True, 'response': text}) + '\n')
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def _chunk(self, data: str) -> None:
+                raw = data.encode('utf-8')
+                self.wfile.write(f"{len(raw):x}\r\n".encode('ascii') + raw + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
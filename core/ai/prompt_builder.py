@@ -0,0 +1,144 @@
+"""
+Token-aware prompt assembly
+Fits prioritized prompt sections into a per-model token budget and reports the final prompt size
+"""
+
+from typing import Dict, Any, List, Tuple
+
+from config.templates import PromptText, join_sections
+from utils.tracing import traced
+
+
+# Prompt budgets (tokens) per model, before the reserve kept for the response
+DEFAULT_BUDGETS = {
+    'gemini': 32000,
+    'drona': 8000,
+    'slm': 3500,
+}
+
+# Tokens taken by the marker clip_text leaves in shortened text
+CLIP_MARKER_TOKENS = 12
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text and shell output)"""
+    return (len(text) + 3) // 4
+
+
+def clip_text(text: str, limit: int) -> str:
+    """Shorten text to limit characters, keeping the head and tail"""
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    return f"{text[:head]}\n[... {len(text) - limit} characters omitted ...]\n{text[-tail:]}"
+
+
+class PromptBuilder:
+    """Assemble prompts from sections, trimming low-priority sections to stay within the model's budget"""
+
+    def __init__(self, max_tokens: int = 8000, reserve_tokens: int = 512, verbose: bool = True):
+        """
+        Initialize prompt builder
+
+        Args:
+            max_tokens: Context the model may be sent (prompt plus response)
+            reserve_tokens: Tokens left free for the response
+            verbose: Print the size of every assembled prompt
+        """
+        self.max_tokens = max_tokens
+        self.reserve_tokens = reserve_tokens
+        self.verbose = verbose
+        self.last_stats: Dict[str, Any] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], model: str) -> 'PromptBuilder':
+        """Build a prompt builder for a model from prompt_budgets, prompt_response_reserve and prompt_size_report config keys"""
+        budgets = {**DEFAULT_BUDGETS, **(config.get('prompt_budgets') or {})}
+        return cls(
+            max_tokens=int(budgets.get(model, DEFAULT_BUDGETS['drona'])),
+            reserve_tokens=int(config.get('prompt_response_reserve', 512)),
+            verbose=bool(config.get('prompt_size_report', True))
+        )
+
+    @property
+    def budget(self) -> int:
+        """Tokens available to the prompt itself"""
+        return max(0, self.max_tokens - self.reserve_tokens)
+
+    @traced('prompt.build')
+    def build(self, sections: List[Dict[str, Any]]) -> Tuple[PromptText, Dict[str, Any]]:
+        """
+        Join sections in order, trimming the lowest-priority ones first until the prompt fits
+
+        Args:
+            sections: Dicts with name (used in size reports), text (including its heading and newlines),
+                      priority (0 is never trimmed, higher numbers are trimmed first) and min_tokens
+                      (size a section is clipped down to before it is dropped entirely); a leading
+                      section with a cache_key is the template's static prefix
+
+        Returns:
+            (prompt text carrying its cacheable prefix, stats with tokens, prefix_tokens, budget,
+             trimmed, dropped and over_budget)
+        """
+        texts = [s['text'] for s in sections]
+        sizes = [estimate_tokens(t) for t in texts]
+        over = sum(sizes) - self.budget
+        trimmed: List[str] = []
+        dropped: List[str] = []
+
+        order = sorted((i for i, s in enumerate(sections) if s.get('priority', 0) > 0),
+                       key=lambda i: -sections[i]['priority'])
+        for i in order:
+            if over <= 0:
+                break
+            floor = max(0, sections[i].get('min_tokens', 0))
+            if sizes[i] <= floor:
+                continue
+            target = max(floor, sizes[i] - over)
+            if target <= CLIP_MARKER_TOKENS:
+                texts[i] = ''
+                dropped.append(sections[i]['name'])
+            else:
+                texts[i] = self._clip_section(texts[i], target)
+                trimmed.append(sections[i]['name'])
+            over -= sizes[i] - estimate_tokens(texts[i])
+            sizes[i] = estimate_tokens(texts[i])
+
+        prompt = join_sections([dict(s, text=text) for s, text in zip(sections, texts)])
+        stats = {
+            'tokens': estimate_tokens(prompt),
+            'prefix_tokens': estimate_tokens(prompt.prefix),
+            'budget': self.budget,
+            'trimmed': trimmed,
+            'dropped': dropped,
+            'over_budget': over > 0,
+        }
+        self.last_stats = stats
+        if self.verbose:
+            self.report(stats)
+        return prompt, stats
+
+    @staticmethod
+    def _clip_section(text: str, tokens: int) -> str:
+        """Clip a section's body to about tokens, keeping its leading and trailing whitespace"""
+        body = text.strip()
+        lead = text[:len(text) - len(text.lstrip())]
+        trail = text[len(text.rstrip()):]
+        return lead + clip_text(body, (tokens - CLIP_MARKER_TOKENS) * 4) + trail
+
+    @staticmethod
+    def report(stats: Dict[str, Any]) -> None:
+        """Print the size of an assembled prompt"""
+        line = f"📏 Prompt size: ~{stats['tokens']:,} tokens (budget {stats['budget']:,}"
+        if stats.get('prefix_tokens'):
+            line += f", ~{stats['prefix_tokens']:,} in the cacheable prefix"
+        line += ")"
+        if stats['trimmed']:
+            line += f", trimmed: {', '.join(stats['trimmed'])}"
+        if stats['dropped']:
+            line += f", dropped: {', '.join(stats['dropped'])}"
+        print(line)
+        if stats['over_budget']:
+            print("⚠️  Prompt still exceeds the budget after trimming optional sections")
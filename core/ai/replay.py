@@ -0,0 +1,195 @@
+"""
+Recorded AI traffic
+Captures real provider responses to JSONL fixtures and replays them offline, keyed by the prompt
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from core.ai.base import AIProvider
+
+
+# Volatile blocks that change on every run and must not affect fixture matching
+_SYSTEM_INFO_BLOCK = re.compile(r'Current System Information:\n.*?\n(?=\n)', re.S)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt text with run-specific parts (live system information) removed"""
+    return _SYSTEM_INFO_BLOCK.sub('Current System Information:\n', str(prompt))
+
+
+def fixture_key(prompt: str) -> str:
+    """Stable key of a prompt for fixture lookup"""
+    return hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()[:24]
+
+
+class FixtureStore:
+    """Append-only JSONL file of recorded responses, indexed by fixture key"""
+
+    def __init__(self, path: str):
+        """
+        Initialize store
+
+        Args:
+            path: Fixture file (created on first record)
+        """
+        self.path = Path(path).expanduser()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> int:
+        """(Re)load fixtures from disk; returns the number of entries"""
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        count = 0
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict) and 'key' in entry:
+                        entries.setdefault(entry['key'], []).append(entry)
+                        count += 1
+        with self._lock:
+            self._entries = entries
+            self._served = {}
+        return count
+
+    def record(self, prompt: str, response: Optional[str], latency: float, source: str,
+               status: Optional[int] = None) -> Dict[str, Any]:
+        """Append one exchange to the fixture file"""
+        entry = {
+            'key': fixture_key(prompt),
+            'source': source,
+            'prompt': normalize_prompt(prompt)[:2000],
+            'response': response,
+            'status': status,
+            'latency': round(latency, 4),
+            'recorded_at': time.time(),
+        }
+        with self._lock:
+            self._entries.setdefault(entry['key'], []).append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def lookup(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Recorded entry for a prompt; repeated prompts cycle through their recordings in order"""
+        key = fixture_key(prompt)
+        with self._lock:
+            recorded = self._entries.get(key)
+            if not recorded:
+                return None
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            return recorded[index % len(recorded)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._entries.values())
+
+
+class RecordingProvider(AIProvider):
+    """Pass queries through to a real provider and record every exchange"""
+
+    def __init__(self, provider: AIProvider, path: str, source: str = 'ai'):
+        """
+        Initialize recorder
+
+        Args:
+            provider: Provider whose traffic is captured
+            path: Fixture file to append to
+            source: Provider name stored with each fixture
+        """
+        self.provider = provider
+        self.store = FixtureStore(path)
+        self.source = source
+
+    @property
+    def supports_images(self) -> bool:
+        return getattr(self.provider, 'supports_images', False)
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        return getattr(self.provider, 'last_status_code', None)
+
+    def setup(self) -> bool:
+        return self.provider.setup()
+
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+
+    def query(self, prompt: str, **kwargs) -> Optional[str]:
+        started = time.monotonic()
+        response = self.provider.query(prompt, **kwargs)
+        self.store.record(prompt, response, time.monotonic() - started, self.source, self.last_status_code)
+        return response
+
+
+class ReplayProvider(AIProvider):
+    """Serve recorded responses without any network access"""
+
+    supports_images = True
+
+    def __init__(self, path: str, replay_latency: bool = False, strict: bool = False):
+        """
+        Initialize replay
+
+        Args:
+            path: Fixture file to serve from
+            replay_latency: Sleep for each response's recorded latency (for throughput measurements)
+            strict: Fail prompts that have no recording instead of answering with a placeholder
+        """
+        self.store = FixtureStore(path)
+        self.replay_latency = replay_latency
+        self.strict = strict
+        self.misses = 0
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ReplayProvider':
+        """Build a replay provider from ai_replay, ai_replay_latency and ai_replay_strict config keys"""
+        return cls(
+            config['ai_replay'],
+            replay_latency=bool(config.get('ai_replay_latency', False)),
+            strict=bool(config.get('ai_replay_strict', False))
+        )
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        return getattr(self._local, 'status_code', None)
+
+    def setup(self) -> bool:
+        if not len(self.store):
+            print(f"❌ No recorded responses in {self.store.path}")
+            return False
+        print(f"✅ Replaying {len(self.store)} recorded AI responses from {self.store.path}")
+        return True
+
+    def is_available(self) -> bool:
+        return bool(len(self.store))
+
+    def query(self, prompt: str, **kwargs) -> Optional[str]:
+        self._local.status_code = None
+        entry = self.store.lookup(prompt)
+        if entry is None:
+            self.misses += 1
+            if self.strict:
+                print(f"❌ No recorded response for prompt {fixture_key(prompt)}")
+                self._local.status_code = 404
+                return None
+            return "No recorded response for this prompt."
+        if self.replay_latency and entry.get('latency'):
+            time.sleep(entry['latency'])
+        if entry.get('response') is None:
+            self._local.status_code = entry.get('status')
+        return entry.get('response')
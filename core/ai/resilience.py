@@ -0,0 +1,290 @@
+"""
+Resilience middleware for AI providers
+Retries transient failures with jittered exponential backoff under an overall deadline,
+and stops calling a failing backend through a half-open circuit breaker
+"""
+
+import random
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional
+
+from core.ai.base import AIProvider
+from utils.metrics import REGISTRY
+from utils.tracing import span
+
+
+# Statuses worth retrying: timeouts, rate limits and server-side errors
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Every breaker created in this process, for health reporting
+_breakers: "weakref.WeakValueDictionary[str, CircuitBreaker]" = weakref.WeakValueDictionary()
+
+
+AI_REQUEST_SECONDS = REGISTRY.histogram('jarvis_ai_request_seconds', 'AI query latency including retries',
+                                        ('provider',))
+AI_REQUESTS = REGISTRY.counter('jarvis_ai_requests_total', 'AI queries by outcome (ok/error)', ('provider', 'outcome'))
+AI_ERRORS = REGISTRY.counter('jarvis_ai_errors_total', 'Failed AI attempts by HTTP-style status', ('provider', 'status'))
+AI_RETRIES = REGISTRY.counter('jarvis_ai_retries_total', 'AI attempts retried after a transient failure', ('provider',))
+AI_CIRCUIT_STATE = REGISTRY.gauge('jarvis_ai_circuit_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)',
+                                  ('name',))
+
+
+def is_retryable(status: Optional[int]) -> bool:
+    """True if a failure with this status is likely transient (unknown failures are not retried)"""
+    return status in RETRYABLE_STATUS_CODES
+
+
+def status_from_exception(error: Exception) -> Optional[int]:
+    """Map a client-library exception to an HTTP-style status (None if it can't be classified)"""
+    code = getattr(error, 'code', None)
+    code = code() if callable(code) else code
+    code = getattr(code, 'value', code)
+    if isinstance(code, int) and 100 <= code < 600:
+        return code
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status, int):
+        return status
+
+    name = type(error).__name__
+    text = str(error)
+    if 'Timeout' in name or 'DeadlineExceeded' in name:
+        return 408
+    if 'ResourceExhausted' in name or 'TooManyRequests' in name or '429' in text:
+        return 429
+    if 'ServiceUnavailable' in name or 'ConnectionError' in name or '503' in text:
+        return 503
+    if 'InternalServerError' in name or '500' in text:
+        return 500
+    return None
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every circuit breaker in the process, by name"""
+    return {name: breaker.snapshot() for name, breaker in list(_breakers.items())}
+
+
+_STATE_VALUES = {'closed': 0, 'half-open': 1, 'open': 2}
+AI_CIRCUIT_STATE.add_collector(
+    lambda: [({'name': name}, _STATE_VALUES[state['state']]) for name, state in breaker_states().items()])
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe after a cooldown -> closed on success"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, verbose: bool = True):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Name shown in messages and health reports
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before one probe call is allowed
+            verbose: Print state changes
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.verbose = verbose
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._state = self.CLOSED
+        self._probing = False
+        self._lock = threading.Lock()
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit reads as half-open once its cooldown has passed"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self, peek: bool = False) -> bool:
+        """
+        Whether a call may go ahead
+
+        Args:
+            peek: Only look; don't claim the half-open probe slot
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN or self._probing:
+                return False
+            if not peek:
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED and self.verbose:
+                print(f"✅ AI provider '{self.name}' recovered, circuit closed")
+            self._state = self.CLOSED
+            self._probing = False
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            probe_failed = self._probing
+            self._probing = False
+            if probe_failed or (self._state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.opens += 1
+                if self.verbose:
+                    print(f"⚠️ AI provider '{self.name}' circuit open for {self.reset_timeout:g}s "
+                          f"({self.consecutive_failures} consecutive failures)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State for health reporting"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if state == self.OPEN else 0.0
+            return {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'opens': self.opens,
+                'retry_in': round(retry_in, 1),
+            }
+
+
+class ResilientProvider(AIProvider):
+    """Wrap any AIProvider with classified retries, backoff, a deadline and a circuit breaker"""
+
+    def __init__(self, provider: AIProvider, name: str = 'ai', max_retries: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 8.0, deadline: float = 60.0, breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize middleware
+
+        Args:
+            provider: Wrapped provider (must expose last_status_code to get retries)
+            name: Name shown in messages
+            max_retries: Retries after the first attempt for retryable failures
+            base_delay: Backoff before the first retry (doubled each time, full jitter)
+            max_delay: Largest single backoff
+            deadline: Seconds after which no further attempt is started
+            breaker: Circuit breaker guarding the provider (None: no breaker)
+        """
+        self.provider = provider
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.breaker = breaker
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], provider: AIProvider, name: str,
+                    breaker: bool = True) -> 'ResilientProvider':
+        """Build middleware from ai_retries, ai_backoff_base, ai_backoff_max, ai_deadline and ai_circuit_* config keys"""
+        circuit = CircuitBreaker(
+            name,
+            failure_threshold=int(config.get('ai_circuit_threshold', 5)),
+            reset_timeout=float(config.get('ai_circuit_reset', 30.0))
+        ) if breaker else None
+        return cls(
+            provider,
+            name=name,
+            max_retries=int(config.get('ai_retries', 3)),
+            base_delay=float(config.get('ai_backoff_base', 0.5)),
+            max_delay=float(config.get('ai_backoff_max', 8.0)),
+            deadline=float(config.get('ai_deadline', 60.0)),
+            breaker=circuit
+        )
+
+    def single_attempt(self) -> 'ResilientProvider':
+        """Same provider and circuit breaker without retries, for callers that retry (and rate-limit) themselves"""
+        return ResilientProvider(self.provider, name=self.name, max_retries=0, base_delay=self.base_delay,
+                                 max_delay=self.max_delay, deadline=self.deadline, breaker=self.breaker)
+
+    @property
+    def supports_images(self) -> bool:
+        return getattr(self.provider, 'supports_images', False)
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """Status of the last failed query on the current thread (None on success)"""
+        return getattr(self._local, 'status_code', None)
+
+    def __getattr__(self, attr: str):
+        # Provider-specific attributes (bot_id, health(), ...) pass through
+        if attr == 'provider':
+            raise AttributeError(attr)
+        return getattr(self.provider, attr)
+
+    def setup(self) -> bool:
+        return self.provider.setup()
+
+    def is_available(self) -> bool:
+        return self.provider.is_available() and (self.breaker is None or self.breaker.allow(peek=True))
+
+    def query(self, prompt: str, **kwargs) -> Optional[str]:
+        """Query the provider, retrying retryable failures until max_retries or the deadline"""
+        started = time.monotonic()
+        with span('ai.query', provider=self.name) as timing:
+            response = self._query(prompt, kwargs)
+            timing.set(status=self._local.status_code)
+        AI_REQUEST_SECONDS.observe(time.monotonic() - started, provider=self.name)
+        AI_REQUESTS.inc(provider=self.name, outcome='ok' if response else 'error')
+        return response
+
+    def _query(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        self._local.status_code = None
+        deadline = time.monotonic() + self.deadline
+        status = None
+        for attempt in range(self.max_retries + 1):
+            if self.breaker and not self.breaker.allow():
+                self._local.status_code = 503
+                return None
+
+            try:
+                with span('ai.attempt', provider=self.name, attempt=attempt + 1):
+                    response = self.provider.query(prompt, **kwargs)
+            except Exception as e:
+                response = None
+                status = status_from_exception(e)
+            else:
+                status = getattr(self.provider, 'last_status_code', None)
+            if response:
+                if self.breaker:
+                    self.breaker.record_success()
+                return response
+
+            if self.breaker:
+                self.breaker.record_failure()
+            AI_ERRORS.inc(provider=self.name, status=status or 'unknown')
+            if not is_retryable(status) or attempt == self.max_retries:
+                break
+            if self.breaker and not self.breaker.allow(peek=True):
+                break
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                break
+            AI_RETRIES.inc(provider=self.name)
+            print(f"🔁 {self.name} request failed (HTTP {status}), retry {attempt + 1}/{self.max_retries} "
+                  f"in {delay:.1f}s...")
+            time.sleep(delay)
+
+        self._local.status_code = status
+        return None
+
+    def health(self) -> Dict[str, Any]:
+        """Circuit state of this provider (and of router backends when wrapping a router)"""
+        state = {'circuit': self.breaker.snapshot() if self.breaker else None}
+        if hasattr(self.provider, 'health'):
+            state['backends'] = self.provider.health()
+        return state
@@ -0,0 +1,253 @@
+"""
+Routing AI provider
+Sends each request to the fastest healthy backend, hedges slow requests and fails over when a backend is down
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, List
+
+from core.ai.base import AIProvider
+from core.ai.resilience import CircuitBreaker
+from utils.metrics import REGISTRY
+from utils.tracing import span
+
+
+AI_BACKEND_SECONDS = REGISTRY.histogram('jarvis_ai_backend_seconds', 'Latency of individual router backend calls',
+                                        ('backend', 'outcome'))
+
+
+class BackendStats:
+    """Rolling latency and error window for one backend"""
+
+    def __init__(self, window: int = 50):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.last_used = 0.0
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile of recent successful calls (None before the first one)"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[round((len(ordered) - 1) * pct / 100)]
+
+    @property
+    def error_rate(self) -> float:
+        """Share of recent calls that failed"""
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            'p50': round(p50, 3) if p50 is not None else None,
+            'p95': round(p95, 3) if p95 is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'calls': len(self.outcomes),
+        }
+
+
+class RouterProvider(AIProvider):
+    """AI provider that routes requests across several backends by latency and health"""
+
+    def __init__(self, backends: Dict[str, AIProvider], hedge: bool = True, hedge_min_delay: float = 1.0,
+                 window: int = 50, failure_threshold: int = 3, cooldown: float = 30.0, explore_every: int = 20,
+                 debug: bool = False):
+        """
+        Initialize router
+
+        Args:
+            backends: Backends by name, in order of preference for ties
+            hedge: Send a second request to the next backend when the first passes its p95 latency
+            hedge_min_delay: Never hedge earlier than this many seconds
+            window: Calls kept for the rolling latency/error statistics
+            failure_threshold: Consecutive failures that open a backend's circuit
+            cooldown: Seconds an open circuit rejects requests before a single probe is let through
+            explore_every: Every Nth request goes to the least recently used backend so its statistics stay fresh
+            debug: Print routing decisions
+        """
+        self.backends = dict(backends)
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.explore_every = explore_every
+        self.debug = debug
+        self.requests = 0
+        self.stats = {name: BackendStats(window) for name in self.backends}
+        self.breakers = {name: CircuitBreaker(name, failure_threshold, cooldown) for name in self.backends}
+        self.active: List[str] = []
+        self._order = list(self.backends)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.backends)),
+                                        thread_name_prefix='ai-router')
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], backends: Dict[str, AIProvider]) -> 'RouterProvider':
+        """Build a router from ai_router_* config keys"""
+        return cls(
+            backends,
+            hedge=bool(config.get('ai_router_hedge', True)),
+            hedge_min_delay=float(config.get('ai_router_hedge_min_delay', 1.0)),
+            window=int(config.get('ai_router_window', 50)),
+            failure_threshold=int(config.get('ai_router_failure_threshold', 3)),
+            cooldown=float(config.get('ai_router_cooldown', 30.0)),
+            explore_every=int(config.get('ai_router_explore_every', 20)),
+            debug=bool(config.get('ai_router_debug', False))
+        )
+
+    @property
+    def supports_images(self) -> bool:
+        return any(getattr(self.backends[name], 'supports_images', False) for name in self.active)
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """HTTP status of the last failed backend call on the current thread (None on success)"""
+        return getattr(self._local, 'status_code', None)
+
+    def setup(self) -> bool:
+        """Set up every backend; the router is usable if at least one of them is"""
+        for name, backend in self.backends.items():
+            try:
+                if backend.setup():
+                    self.active.append(name)
+                else:
+                    print(f"⚠️ AI backend '{name}' unavailable, routing around it")
+            except Exception as e:
+                print(f"⚠️ AI backend '{name}' failed to set up: {e}")
+        if self.active:
+            print(f"🔀 AI router active: {', '.join(self.active)}")
+        return bool(self.active)
+
+    def is_available(self) -> bool:
+        return any(self._allowed(name, peek=True) for name in self.active)
+
+    def _allowed(self, name: str, peek: bool = False) -> bool:
+        """Circuit breaker check; after the cooldown exactly one caller gets through as a probe"""
+        return self.breakers[name].allow(peek)
+
+    def _record(self, name: str, latency: float, ok: bool) -> None:
+        stats = self.stats[name]
+        with self._lock:
+            stats.outcomes.append(ok)
+            if ok:
+                stats.latencies.append(latency)
+        if ok:
+            self.breakers[name].record_success()
+        else:
+            self.breakers[name].record_failure()
+
+    def _ranked(self, needs_images: bool) -> List[str]:
+        """Healthy backends, fastest (by p50, errors penalized) first; untried ones keep configured order"""
+        candidates = [name for name in self.active
+                      if not needs_images or getattr(self.backends[name], 'supports_images', False)]
+        if needs_images and not candidates:
+            candidates = list(self.active)
+
+        def score(name: str):
+            stats = self.stats[name]
+            p50 = stats.percentile(50)
+            if p50 is None:
+                # Untried backends get a chance; ones that have only ever failed go last
+                p50 = float('inf') if stats.outcomes else 0.0
+            return (states[name] == CircuitBreaker.OPEN, p50 * (1 + 4 * stats.error_rate), self._order.index(name))
+
+        states = {name: self.breakers[name].state for name in candidates}
+        with self._lock:
+            ranked = sorted(candidates, key=score)
+            self.requests += 1
+            if self.explore_every and self.requests % self.explore_every == 0 and len(ranked) > 1:
+                # A backend that lost a few slow calls would otherwise never be measured again
+                stale = min((name for name in ranked if states[name] == CircuitBreaker.CLOSED),
+                            key=lambda name: self.stats[name].last_used, default=None)
+                if stale:
+                    ranked.remove(stale)
+                    ranked.insert(0, stale)
+            return ranked
+
+    def _call(self, name: str, prompt: str, kwargs: Dict[str, Any]):
+        """Query one backend, recording latency and outcome; returns (name, response, status)"""
+        backend = self.backends[name]
+        started = time.monotonic()
+        self.stats[name].last_used = started
+        try:
+            with span('ai.backend', backend=name):
+                response = backend.query(prompt, **kwargs)
+        except Exception as e:
+            if self.debug:
+                print(f"⚠️ AI backend '{name}' raised: {e}")
+            response = None
+        latency = time.monotonic() - started
+        self._record(name, latency, bool(response))
+        AI_BACKEND_SECONDS.observe(latency, backend=name, outcome='ok' if response else 'error')
+        return name, response, getattr(backend, 'last_status_code', None)
+
+    def _claim(self, queue: List[str]) -> Optional[str]:
+        """Pop the next backend whose circuit lets this request through"""
+        while queue:
+            name = queue.pop(0)
+            if self._allowed(name):
+                return name
+        return None
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait on a backend before hedging (None until it has enough history)"""
+        stats = self.stats[name]
+        if len(stats.latencies) < 5:
+            return None
+        return max(self.hedge_min_delay, stats.percentile(95))
+
+    def query(self, prompt: str, **kwargs) -> Optional[str]:
+        """Query the best backend, hedging after its p95 latency and failing over on errors"""
+        self._local.status_code = None
+        ranked = [name for name in self._ranked(bool(kwargs.get('image_data'))) if self._allowed(name, peek=True)]
+        if not ranked:
+            print("❌ All AI backends are unavailable (circuits open)")
+            self._local.status_code = 503
+            return None
+
+        pending = {}
+        queue = list(ranked)
+        last_status = None
+        while queue or pending:
+            if not pending:
+                name = self._claim(queue)
+                if name is None:
+                    break
+                if self.debug:
+                    print(f"🔀 Routing request to '{name}'")
+                pending[self._pool.submit(self._call, name, prompt, kwargs)] = name
+                delay = self._hedge_delay(name) if (self.hedge and queue) else None
+            else:
+                delay = None
+
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slower than its p95: race the next backend, first answer wins
+                name = self._claim(queue)
+                if name is None:
+                    continue
+                if self.debug:
+                    print(f"🔀 Hedging request to '{name}'")
+                pending[self._pool.submit(self._call, name, prompt, kwargs)] = name
+                continue
+            for future in done:
+                del pending[future]
+                name, response, status = future.result()
+                if response:
+                    if self.debug:
+                        print(f"🔀 Answer from '{name}'")
+                    return response
+                last_status = status or last_status
+
+        self._local.status_code = last_status or 503
+        return None
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend latency percentiles, error rate and circuit state"""
+        with self._lock:
+            stats = {name: self.stats[name].snapshot() for name in self.backends}
+        for name, breaker in self.breakers.items():
+            stats[name]['circuit'] = breaker.state
+        return stats
@@ -0,0 +1,173 @@
+"""
+Interactive conversation session
+Keeps a compact, token-budgeted history of earlier turns so follow-up queries can build on them
+"""
+
+import os
+import time
+from typing import Dict, Any, Optional, List, Callable
+
+from core.ai.prompt_builder import estimate_tokens, clip_text
+
+
+class ConversationSession:
+    """Conversation history for the interactive REPL, rendered into each prompt within a token budget"""
+
+    def __init__(self, token_budget: int = 3000, keep_turns: int = 4, output_chars: int = 1500,
+                 system_info_ttl: float = 60.0):
+        """
+        Initialize session
+
+        Args:
+            token_budget: Maximum tokens of history added to a prompt
+            keep_turns: Recent turns kept verbatim (older ones are summarized)
+            output_chars: Longest command output kept per command
+            system_info_ttl: Seconds a system information snapshot is reused
+        """
+        self.token_budget = token_budget
+        self.keep_turns = max(1, keep_turns)
+        self.output_chars = output_chars
+        self.system_info_ttl = system_info_ttl
+
+        self.turns: List[Dict[str, Any]] = []
+        self.summary: List[str] = []
+        self.current: Optional[Dict[str, Any]] = None
+        self._system_info: Optional[str] = None
+        self._system_info_at = 0.0
+        self._system_info_cwd: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ConversationSession':
+        """Build a session from session_token_budget, session_keep_turns, ... config keys"""
+        return cls(
+            token_budget=int(config.get('session_token_budget', 3000)),
+            keep_turns=int(config.get('session_keep_turns', 4)),
+            output_chars=int(config.get('session_output_chars', 1500)),
+            system_info_ttl=float(config.get('session_system_info_ttl', 60.0))
+        )
+
+    def system_info(self, collect: Callable[[], str]) -> str:
+        """Return a cached system information snapshot, refreshing it after the TTL or a directory change"""
+        now = time.monotonic()
+        cwd = os.getcwd()
+        if (self._system_info is None or now - self._system_info_at > self.system_info_ttl
+                or cwd != self._system_info_cwd):
+            self._system_info = collect()
+            self._system_info_at = now
+            self._system_info_cwd = cwd
+        return self._system_info
+
+    def begin_turn(self, query: str) -> None:
+        """Start a new user turn"""
+        if self.current:
+            self.end_turn()
+        self.current = {'query': query, 'commands': [], 'answer': None, 'started': time.time()}
+
+    def record_command(self, command: str, output: str, success: bool) -> None:
+        """Record a command run during the current turn"""
+        if not self.current:
+            return
+        self.current['commands'].append({
+            'command': command,
+            'output': clip_text(output or '', self.output_chars),
+            'success': success,
+            'at': time.time()
+        })
+
+    def end_turn(self, answer: Optional[str] = None) -> None:
+        """Close the current turn, summarizing turns that fall out of the verbatim window"""
+        if not self.current:
+            return
+        if answer:
+            self.current['answer'] = clip_text(answer, self.output_chars)
+        self.turns.append(self.current)
+        self.current = None
+        while len(self.turns) > self.keep_turns:
+            self.summary.append(self._summarize(self.turns.pop(0)))
+
+    def reset(self) -> None:
+        """Forget the conversation (cached system information is kept)"""
+        self.turns = []
+        self.summary = []
+        self.current = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.turns or self.summary or (self.current and self.current['commands']))
+
+    @staticmethod
+    def _summarize(turn: Dict[str, Any]) -> str:
+        """Compress a turn into one line: the question, commands run and the start of the answer"""
+        parts = [f"Q: {turn['query'][:120]}"]
+        if turn['commands']:
+            ran = ', '.join(f"`{c['command'][:60]}`{'' if c['success'] else ' (failed)'}"
+                            for c in turn['commands'][:4])
+            parts.append(f"ran {ran}")
+        if turn.get('answer'):
+            parts.append(f"answered: {' '.join(turn['answer'].split())[:160]}")
+        return ' | '.join(parts)
+
+    @staticmethod
+    def _render_turn(turn: Dict[str, Any], label: str, skip_last_command: bool = False) -> str:
+        lines = [f"{label}: {turn['query']}"]
+        commands = turn['commands'][:-1] if skip_last_command else turn['commands']
+        for c in commands:
+            age = int(time.time() - c['at'])
+            lines.append(f"$ {c['command']}  (success: {c['success']}, {age}s ago)")
+            lines.append(c['output'] or "(no output)")
+        if turn.get('answer'):
+            lines.append(f"Jarvis answered: {turn['answer']}")
+        return '\n'.join(lines)
+
+    def render_context(self, skip_last_command: bool = False) -> str:
+        """
+        Render history for a prompt within the token budget
+
+        Args:
+            skip_last_command: Leave out the current turn's latest command (the prompt shows it already)
+
+        Returns:
+            Context block, or '' when there is nothing to add
+        """
+        if self.is_empty:
+            return ''
+
+        header = ("CONVERSATION CONTEXT (earlier in this session - reuse these command outputs "
+                  "instead of re-running commands unless fresh data is needed):")
+        budget = self.token_budget - estimate_tokens(header)
+
+        # The current turn is always kept (clipped if needed)
+        kept: List[str] = []
+        if self.current and (self.current['commands'][:-1] if skip_last_command else self.current['commands']):
+            block = self._render_turn(self.current, "Current request (earlier steps)", skip_last_command)
+            if estimate_tokens(block) > budget:
+                block = clip_text(block, max(200, budget * 4))
+            kept.append(block)
+            budget -= estimate_tokens(block)
+
+        # Then recent turns newest first; those that don't fit fall back to their one-line summary
+        overflow: List[str] = []
+        for turn in reversed(self.turns):
+            block = self._render_turn(turn, "Earlier request")
+            cost = estimate_tokens(block)
+            if not overflow and cost <= budget:
+                kept.append(block)
+                budget -= cost
+            else:
+                overflow.append(self._summarize(turn))
+
+        summary_lines = self.summary + list(reversed(overflow))
+        summary_text = ''
+        # Oldest summaries are dropped first when even the one-liners exceed the budget
+        while summary_lines and estimate_tokens('\n'.join(summary_lines)) > max(budget, 0):
+            summary_lines.pop(0)
+        if summary_lines:
+            summary_text = "Summary of older requests:\n" + '\n'.join(f"- {line}" for line in summary_lines)
+
+        if not kept and not summary_text:
+            return ''
+        sections = [header]
+        if summary_text:
+            sections.append(summary_text)
+        sections.extend(reversed(kept))
+        return '\n\n'.join(sections)
@@ -3,6 +3,7 @@ SLM (Self-hosted Language Model) provider
 """
 
 import sys
+import threading
 from typing import Optional
 import sys
 from pathlib import Path
@@ -14,6 +15,7 @@ if str(_project_root) not in sys.path:
 
 from utils.config import load_config
 from core.ai.base import AIProvider
+from core.ai.resilience import status_from_exception
 
 
 class SLMProvider(AIProvider):
@@ -22,12 +24,20 @@ class SLMProvider(AIProvider):
     def __init__(self):
         self.slm_url = None
         self.ai_available = False
+        self.prefix_cache = True
+        self._local = threading.local()
+    
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """HTTP status of the last failed query on the current thread (None on success)"""
+        return getattr(self._local, 'status_code', None)
     
     def setup(self) -> bool:
         """Setup SLM connection"""
         try:
             config = load_config()
             self.slm_url = config.get('slm_url', 'http://35.174.147.167:5000')
+            self.prefix_cache = bool(config.get('slm_prefix_cache', True))
             
             # Test the connection
             test_response = self.query("Hello")
@@ -48,22 +58,32 @@ class SLMProvider(AIProvider):
     
     def query(self, prompt: str, **kwargs) -> Optional[str]:
         """Query SLM server"""
+        self._local.status_code = None
         try:
             import requests
+            payload = {"prompt": prompt}
+            
+            # Let servers with prompt caching reuse the KV state of a template's static prefix
+            cache_key = getattr(prompt, 'cache_key', None)
+            if self.prefix_cache and cache_key:
+                payload.update(cache_prompt=True, cache_key=cache_key, prefix_length=len(prompt.prefix))
+            
             response = requests.post(
                 f"{self.slm_url}/generate",
-                json={"prompt": prompt},
+                json=payload,
                 timeout=30
             )
             if response.status_code == 200:
                 return response.json().get("response", "")
             else:
+                self._local.status_code = response.status_code
                 print(f"❌ SLM server error: {response.status_code}")
                 return None
         except ImportError:
             print(f"❌ requests module not found. Please install it: pip3 install requests")
             return None
         except Exception as e:
+            self._local.status_code = status_from_exception(e)
             print(f"❌ SLM query failed: {e}")
             return None
     
@@ -0,0 +1,8 @@
+"""Command execution for agent-run commands: rewriting, streaming, sandboxing, result caching and shell parsing"""
+
+from core.execution.cache import CommandCache, classify_command
+from core.execution.executor import StreamingExecutor
+from core.execution.rewrite import CommandRewriter
+from core.execution.sandbox import Sandbox, format_usage
+
+__all__ = ['CommandCache', 'classify_command', 'StreamingExecutor', 'CommandRewriter', 'Sandbox', 'format_usage']
@@ -0,0 +1,270 @@
+"""
+Command result cache
+Reuses results of idempotent, read-only commands for a short TTL and drops everything when a command may mutate state
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+from core.execution.shell import (
+    split_segments, segment_argv, program_name, has_substitution, has_write_redirect
+)
+from utils.metrics import CACHE_REQUESTS
+
+
+# Read-only commands and how long (seconds) their output stays fresh
+READ_ONLY_TTLS = {
+    'uname': 3600, 'hostname': 3600, 'whoami': 3600, 'id': 3600, 'groups': 3600,
+    'sw_vers': 3600, 'arch': 3600, 'nproc': 3600, 'lscpu': 3600, 'system_profiler': 3600,
+    'which': 300, 'whereis': 300, 'printenv': 300, 'env': 300, 'locale': 300,
+    'sysctl': 300, 'lsblk': 60, 'mount': 60, 'ifconfig': 60, 'route': 60, 'arp': 30,
+    'df': 30, 'du': 60, 'find': 30, 'ls': 10, 'stat': 10, 'file': 60, 'tree': 30,
+    'cat': 10, 'head': 10, 'tail': 10, 'wc': 10, 'md5': 60, 'md5sum': 60, 'shasum': 60, 'sha256sum': 60,
+    'ps': 5, 'top': 5, 'pgrep': 5, 'free': 5, 'vm_stat': 5, 'vmstat': 5, 'iostat': 5,
+    'uptime': 10, 'w': 10, 'who': 10, 'last': 30, 'lsof': 10, 'netstat': 10, 'ss': 10,
+    'dmesg': 10, 'journalctl': 10,
+}
+
+# Commands that only read (after the given subcommand), e.g. 'git status'
+SUBCOMMAND_TTLS = {
+    'git': ({'status', 'log', 'diff', 'show', 'branch', 'remote', 'rev-parse', 'describe',
+             'ls-files', 'blame', 'tag', 'shortlog'}, 10),
+    'ip': ({'addr', 'address', 'a', 'route', 'r', 'link', 'l', 'neigh', 'n', 'rule'}, 60),
+    'docker': ({'ps', 'images', 'info', 'version', 'inspect', 'stats'}, 10),
+    'kubectl': ({'get', 'describe', 'top', 'version', 'logs'}, 15),
+    'systemctl': ({'status', 'is-active', 'is-enabled', 'list-units', 'list-unit-files', 'show'}, 10),
+    'launchctl': ({'list', 'print'}, 30),
+    'brew': ({'list', 'info', 'outdated', 'config', '--version'}, 300),
+    'pip': ({'list', 'show', 'freeze'}, 300),
+    'pip3': ({'list', 'show', 'freeze'}, 300),
+    'npm': ({'ls', 'list', 'outdated', 'view'}, 300),
+    'defaults': ({'read'}, 60),
+    'diskutil': ({'list', 'info'}, 60),
+}
+
+# Text filters that only transform their input (never limit freshness on their own)
+FILTERS = {
+    'grep', 'egrep', 'fgrep', 'rg', 'awk', 'sed', 'sort', 'uniq', 'cut', 'tr', 'column',
+    'jq', 'nl', 'rev', 'fold', 'fmt', 'head', 'tail', 'wc', 'less', 'more', 'cat', 'tac',
+}
+
+# Side-effect free but time-dependent - never cached, never invalidate
+VOLATILE = {'date', 'echo', 'printf', 'sleep', 'true', 'false', 'pwd', 'cal', 'clear', 'history', 'tty'}
+
+# Arguments that turn an otherwise read-only command into a writer
+MUTATING_ARGS = {
+    'find': {'-delete', '-exec', '-execdir', '-ok', '-okdir', '-fprint', '-fprintf', '-fls'},
+    'sed': {'-i', '--in-place'},
+    'sysctl': {'-w'},
+    'ip': {'add', 'del', 'delete', 'set', 'flush', 'change', 'replace'},
+    'sort': {'-o', '--output'},
+}
+
+# git subcommands that only read in their listing form: flags that write, and whether a
+# positional argument is allowed (only as a pattern after --list)
+GIT_LISTING_SUBCOMMANDS = {
+    'branch': {'-d', '-D', '--delete', '-m', '-M', '--move', '-c', '-C', '--copy', '-f', '--force',
+               '-u', '--set-upstream-to', '--unset-upstream', '--edit-description', '-t', '--track'},
+    'tag': {'-d', '--delete', '-f', '--force', '-a', '--annotate', '-s', '--sign', '-u', '--local-user',
+            '-m', '--message', '-F', '--file'},
+    'remote': {'add', 'remove', 'rm', 'rename', 'set-url', 'set-head', 'set-branches', 'prune', 'update'},
+}
+
+# awk programs that print into files or pipes
+_AWK_WRITE = re.compile(r'print[^;}]*(?:>|\|)')
+
+PRIVILEGE_WRAPPERS = {'sudo', 'doas', 'nice', 'time', 'nohup', 'timeout', 'env', 'ionice', 'stdbuf', 'command'}
+
+# Wrapper options that take a separate value argument
+WRAPPER_VALUE_OPTIONS = {
+    'sudo': {'-u', '-g', '-C', '-h', '-p', '-U', '-r', '-t', '-D'},
+    'doas': {'-u', '-C'},
+    'nice': {'-n', '--adjustment'},
+    'timeout': {'-s', '--signal', '-k', '--kill-after'},
+    'env': {'-u', '--unset', '-C', '--chdir', '-S', '--split-string'},
+    'ionice': {'-c', '--class', '-n', '--classdata', '-p', '--pid'},
+    'stdbuf': {'-i', '-o', '-e'},
+    'time': {'-f', '--format', '-o', '--output'},
+}
+
+
+def _strip_wrappers(argv: List[str]) -> List[str]:
+    """Skip sudo/nice/timeout/env style prefixes to the real program (a bare 'env' lists the environment)"""
+    while argv and program_name(argv) in PRIVILEGE_WRAPPERS:
+        wrapper = program_name(argv)
+        value_options = WRAPPER_VALUE_OPTIONS.get(wrapper, set())
+        rest = argv[1:]
+        while rest and rest[0].startswith('-'):
+            option = rest.pop(0)
+            if option == '--':
+                break
+            if option in value_options and rest:
+                rest.pop(0)
+        if wrapper == 'env':
+            # VAR=value assignments before the program
+            while rest and '=' in rest[0]:
+                rest.pop(0)
+            if not rest:
+                return argv[:1]
+        if wrapper == 'timeout' and rest:
+            rest = rest[1:]  # duration
+        argv = rest
+    return argv
+
+
+def _git_listing_only(subcommand: str, args: List[str]) -> bool:
+    """True when git branch/tag/remote only lists (no names to create, delete, move or change)"""
+    writes = GIT_LISTING_SUBCOMMANDS[subcommand]
+    rest = args[args.index(subcommand) + 1:]
+    if any(arg in writes or arg.split('=', 1)[0] in writes for arg in rest):
+        return False
+    positional = [arg for arg in rest if not arg.startswith('-')]
+    if subcommand == 'remote':
+        return not positional
+    # 'git branch --list "feat*"' filters; any other name creates a branch or tag
+    return not positional or any(arg in ('-l', '--list') for arg in rest)
+
+
+def classify_command(command: str, ttls: Optional[Dict[str, int]] = None) -> Tuple[str, Optional[int]]:
+    """
+    Classify a shell command for caching
+
+    Returns:
+        ('read', ttl) for idempotent read-only commands,
+        ('volatile', None) for harmless commands whose output must not be reused,
+        ('mutating', None) for anything that may change state (or can't be analyzed)
+    """
+    ttls = ttls or {}
+    if not command.strip() or has_substitution(command):
+        return 'mutating', None
+
+    ttl: Optional[int] = None
+    volatile = False
+    for segment, sep in split_segments(command):
+        if sep == '&' or has_write_redirect(segment):
+            return 'mutating', None
+        argv = segment_argv(segment)
+        if argv is None:
+            return 'mutating', None
+        argv = _strip_wrappers(argv)
+        if not argv:
+            continue
+        program = program_name(argv)
+        args = argv[1:]
+
+        mutating_args = MUTATING_ARGS.get(program, set())
+        if any(arg in mutating_args or arg.split('=', 1)[0] in mutating_args for arg in args):
+            return 'mutating', None
+        if program == 'sysctl' and any('=' in arg for arg in args):
+            return 'mutating', None
+        if program == 'awk' and any('system(' in arg or _AWK_WRITE.search(arg) for arg in args):
+            return 'mutating', None
+        if program in ('tail', 'journalctl') and any(arg in ('-f', '-F', '--follow') for arg in args):
+            volatile = True
+            continue
+
+        if program in VOLATILE:
+            volatile = True
+            continue
+        if program in SUBCOMMAND_TTLS:
+            subcommands, default_ttl = SUBCOMMAND_TTLS[program]
+            positional = [arg for arg in args if not arg.startswith('-') or arg == '--version']
+            if not positional or positional[0] not in subcommands:
+                return 'mutating', None
+            if program == 'git' and positional[0] in GIT_LISTING_SUBCOMMANDS and not _git_listing_only(positional[0], args):
+                return 'mutating', None
+            segment_ttl = ttls.get(f"{program} {positional[0]}", ttls.get(program, default_ttl))
+        elif program in READ_ONLY_TTLS or program in ttls:
+            segment_ttl = ttls.get(program, READ_ONLY_TTLS.get(program))
+        elif program in FILTERS:
+            continue
+        else:
+            return 'mutating', None
+
+        ttl = segment_ttl if ttl is None else min(ttl, segment_ttl)
+
+    if volatile or ttl is None:
+        return 'volatile', None
+    return ('read', ttl) if ttl > 0 else ('volatile', None)
+
+
+class CommandCache:
+    """LRU cache of read-only command results keyed by command line and working directory"""
+
+    def __init__(self, ttls: Optional[Dict[str, int]] = None, max_entries: int = 128, enabled: bool = True):
+        """
+        Initialize cache
+
+        Args:
+            ttls: Per-program (or 'program subcommand') TTL overrides in seconds; 0 disables caching
+            max_entries: Maximum cached results
+            enabled: Turn caching off entirely
+        """
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._entries: "OrderedDict[Tuple[str, str, int], Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'CommandCache':
+        """Build a cache from command_cache, command_cache_ttls and command_cache_size config keys"""
+        return cls(
+            ttls=config.get('command_cache_ttls'),
+            max_entries=int(config.get('command_cache_size', 128)),
+            enabled=bool(config.get('command_cache', True))
+        )
+
+    @staticmethod
+    def _key(command: str, env: Optional[Dict[str, str]] = None) -> Tuple[str, str, int]:
+        # Output depends on the environment too (PATH, KUBECONFIG, ...), so terminals don't share entries
+        return command.strip(), os.getcwd(), hash(frozenset(env.items())) if env is not None else 0
+
+    def get(self, command: str, env: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result (with 'cached' and 'cache_age' set) or None"""
+        if not self.enabled:
+            return None
+        key = self._key(command, env)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            CACHE_REQUESTS.inc(cache='command', result='miss')
+            return None
+        age = time.monotonic() - entry['stored_at']
+        if age > entry['ttl']:
+            del self._entries[key]
+            self.stats['misses'] += 1
+            CACHE_REQUESTS.inc(cache='command', result='miss')
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        CACHE_REQUESTS.inc(cache='command', result='hit')
+        result = dict(entry['result'])
+        result['cached'] = True
+        result['cache_age'] = age
+        return result
+
+    def record(self, command: str, result: Dict[str, Any], env: Optional[Dict[str, str]] = None) -> None:
+        """Store a result if the command is read-only, or invalidate everything if it may mutate state"""
+        if not self.enabled:
+            return
+        kind, ttl = classify_command(command, self.ttls)
+        if kind == 'mutating':
+            if self._entries:
+                self._entries.clear()
+                self.stats['invalidations'] += 1
+            return
+        if kind != 'read' or not result.get('success'):
+            return
+        key = self._key(command, env)
+        self._entries[key] = {'result': dict(result), 'ttl': ttl, 'stored_at': time.monotonic()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        self._entries.clear()
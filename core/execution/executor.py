@@ -0,0 +1,252 @@
+"""
+Streaming command executor
+Runs shell commands with live output, a bounded capture and a wall-clock budget enforced on the whole process group
+"""
+
+import codecs
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, Any, Optional, Callable, IO
+
+
+READ_CHUNK = 64 * 1024
+TRUNCATION_MARKER = "\n[... output truncated at {limit} bytes ...]\n"
+
+
+def _exit_code(status: int) -> int:
+    """Return code for a wait status, negative for signals (os.waitstatus_to_exitcode needs Python 3.9)"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class StreamingExecutor:
+    """Run a command, streaming stdout/stderr as they arrive and stopping runaway commands early"""
+
+    def __init__(self, timeout: float = 30.0, max_output_bytes: int = 1024 * 1024, live: bool = True,
+                 kill_grace: float = 2.0, out: Optional[IO[str]] = None):
+        """
+        Initialize executor
+
+        Args:
+            timeout: Wall-clock budget per command (seconds)
+            max_output_bytes: Bytes captured across stdout and stderr before the command is stopped
+            live: Echo output to the terminal while the command runs
+            kill_grace: Seconds between SIGTERM and SIGKILL when stopping a process group
+            out: Stream for live output (default: sys.stdout)
+        """
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.live = live
+        self.kill_grace = kill_grace
+        self.out = out
+        # pid -> (wait status, rusage) of shells reaped early where os.waitid is missing (macOS)
+        self._reaped: Dict[int, tuple] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StreamingExecutor':
+        """Build an executor from command_timeout, command_max_output and command_live_output config keys"""
+        return cls(
+            timeout=float(config.get('command_timeout', 30)),
+            max_output_bytes=int(config.get('command_max_output', 1024 * 1024)),
+            live=bool(config.get('command_live_output', True))
+        )
+
+    def run(self, command: str, popen_kwargs: Optional[Dict[str, Any]] = None,
+            on_spawn: Optional[Callable[[subprocess.Popen], None]] = None,
+            live: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Run a shell command
+
+        Args:
+            command: Shell command line
+            live: Override live echo for this command
+            popen_kwargs: Extra Popen arguments (e.g. env for the command)
+            on_spawn: Called with the process right after it starts
+
+        Returns:
+            Dict with success, stdout, stderr, returncode, plus timed_out, truncated,
+            streamed, duration and (where available) rusage of the finished command
+        """
+        if os.name != 'posix':
+            return self._run_blocking(command)
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        proc = subprocess.Popen(
+            command, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=True, **(popen_kwargs or {})
+        )
+        if on_spawn:
+            on_spawn(proc)
+
+        captured = {'stdout': [], 'stderr': []}
+        decoders = {name: codecs.getincrementaldecoder('utf-8')(errors='replace') for name in captured}
+        total = 0
+        timed_out = truncated = lingering = False
+        live = self.live if live is None else live
+        out = self.out or sys.stdout
+
+        selector = selectors.DefaultSelector()
+        for name, pipe in (('stdout', proc.stdout), ('stderr', proc.stderr)):
+            os.set_blocking(pipe.fileno(), False)
+            selector.register(pipe, selectors.EVENT_READ, name)
+
+        try:
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                events = selector.select(timeout=min(remaining, 0.25))
+                if not events and self._exited(proc):
+                    # Shell is gone but a background child still holds the pipes open
+                    lingering = True
+                    break
+                for key, _ in events:
+                    try:
+                        chunk = os.read(key.fileobj.fileno(), READ_CHUNK)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    room = self.max_output_bytes - total
+                    if len(chunk) > room:
+                        chunk = chunk[:max(0, room)]
+                        truncated = True
+                    total += len(chunk)
+                    text = decoders[key.data].decode(chunk)
+                    captured[key.data].append(text)
+                    if live and text:
+                        out.write(text)
+                        out.flush()
+                    if truncated:
+                        break
+                if truncated:
+                    break
+        except KeyboardInterrupt:
+            self._kill_group(proc)
+            raise
+        finally:
+            selector.close()
+
+        if timed_out or truncated or lingering:
+            self._kill_group(proc)
+        rusage = self._wait(proc, max(0.1, deadline - time.monotonic()) if not (timed_out or truncated) else None)
+        for pipe in (proc.stdout, proc.stderr):
+            pipe.close()
+
+        stdout = ''.join(captured['stdout']) + decoders['stdout'].decode(b'', final=True)
+        stderr = ''.join(captured['stderr']) + decoders['stderr'].decode(b'', final=True)
+        if truncated:
+            stdout += TRUNCATION_MARKER.format(limit=self.max_output_bytes)
+        if timed_out:
+            stderr += f"\nCommand timed out after {self.timeout:g}s"
+
+        return {
+            "success": proc.returncode == 0 and not timed_out and not truncated,
+            "stdout": stdout,
+            "stderr": stderr,
+            "returncode": proc.returncode if proc.returncode is not None else -1,
+            "timed_out": timed_out,
+            "truncated": truncated,
+            "streamed": live,
+            "duration": time.monotonic() - started,
+            "rusage": rusage,
+        }
+
+    def _wait(self, proc: subprocess.Popen, timeout: Optional[float]):
+        """Reap the shell, collecting its resource usage; stop the group if it overstays the budget"""
+        wait_until = time.monotonic() + (timeout if timeout is not None else self.kill_grace + 1)
+        while True:
+            reaped = self._reaped.pop(proc.pid, None)
+            if reaped:
+                proc.returncode = _exit_code(reaped[0])
+                return reaped[1]
+            try:
+                pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+            except ChildProcessError:
+                proc.wait()
+                return None
+            if pid:
+                proc.returncode = _exit_code(status)
+                return rusage
+            if time.monotonic() >= wait_until:
+                # Output closed but the shell is still running (e.g. a detached child kept it alive)
+                self._kill_group(proc)
+                wait_until = time.monotonic() + self.kill_grace + 1
+            time.sleep(0.01)
+
+    def _exited(self, proc: subprocess.Popen) -> bool:
+        """Check whether the shell has exited, keeping its resource usage for _wait"""
+        if proc.pid in self._reaped:
+            return True
+        try:
+            # Peek without reaping so wait4 in _wait still collects rusage
+            return os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        except ChildProcessError:
+            return True
+        except (AttributeError, OSError):
+            pass
+        # No waitid (macOS): reap with wait4 now and hand the result to _wait
+        try:
+            pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+        except ChildProcessError:
+            return True
+        if pid:
+            self._reaped[pid] = (status, rusage)
+        return bool(pid)
+
+    def _kill_group(self, proc: subprocess.Popen) -> None:
+        """SIGTERM the command's process group, escalating to SIGKILL after the grace period"""
+        # start_new_session makes the shell its group's leader, and the group outlives a reaped shell
+        pgid = proc.pid
+        for sig, wait in ((signal.SIGTERM, self.kill_grace), (signal.SIGKILL, 0)):
+            try:
+                os.killpg(pgid, sig)
+            except (ProcessLookupError, PermissionError):
+                return
+            end = time.monotonic() + wait
+            while time.monotonic() < end:
+                if self._exited(proc):
+                    try:
+                        os.killpg(pgid, signal.SIGKILL)  # stragglers left in the group
+                    except (ProcessLookupError, PermissionError):
+                        pass
+                    return
+                time.sleep(0.02)
+
+    def _run_blocking(self, command: str) -> Dict[str, Any]:
+        """Fallback for platforms without non-blocking pipes"""
+        started = time.monotonic()
+        try:
+            result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=self.timeout)
+            stdout = result.stdout[:self.max_output_bytes]
+            return {
+                "success": result.returncode == 0,
+                "stdout": stdout,
+                "stderr": result.stderr[:self.max_output_bytes],
+                "returncode": result.returncode,
+                "timed_out": False,
+                "truncated": len(result.stdout) > self.max_output_bytes,
+                "streamed": False,
+                "duration": time.monotonic() - started,
+                "rusage": None,
+            }
+        except subprocess.TimeoutExpired:
+            return {
+                "success": False,
+                "stdout": "",
+                "stderr": "Command timed out",
+                "returncode": -1,
+                "timed_out": True,
+                "truncated": False,
+                "streamed": False,
+                "duration": time.monotonic() - started,
+                "rusage": None,
+            }
@@ -0,0 +1,257 @@
+"""
+Command rewriting
+Applies platform-aware, data-driven rules that turn interactive or never-ending commands into bounded ones
+"""
+
+import json
+import os
+import platform
+import re
+import shlex
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.rewrite_rules import DEFAULT_REWRITE_RULES
+from core.execution.shell import split_segments, join_segments, raw_tokens, is_assignment
+
+
+# Prefix commands and their options that take a value; the real program follows them
+WRAPPERS = {
+    'sudo': {'-u', '-g', '-C', '-h', '-p', '-U', '-r', '-t'},
+    'doas': {'-u', '-C'},
+    'nice': {'-n', '--adjustment'},
+    'ionice': {'-c', '-n', '-p', '--class', '--classdata'},
+    'nohup': set(),
+    'time': {'-f', '-o', '--format', '--output'},
+    'timeout': {'-s', '-k', '--signal', '--kill-after'},
+    'env': {'-u', '-C', '--unset', '--chdir'},
+}
+
+MAX_UNWRAP_DEPTH = 3
+
+_SHORT_CLUSTER = re.compile(r'^-([A-Za-z]+)(.*)$')
+
+# (raw text, unquoted value) of one argument
+Arg = Tuple[str, str]
+
+
+def _short_letters(flags) -> set:
+    return {flag[1] for flag in flags if len(flag) == 2 and flag[0] == '-' and flag[1].isalpha()}
+
+
+class RewriteRule:
+    """One compiled rewrite rule (see config/rewrite_rules.py for the keys)"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.program = spec['program']
+        self.replace_program = spec.get('replace_program')
+        self.drop_args = bool(spec.get('drop_args'))
+        self.drop_options = bool(spec.get('drop_options'))
+        self.remove_args = frozenset(spec.get('remove_args') or ())
+        self.remove_letters = _short_letters(self.remove_args)
+        self.add_args = [str(arg) for arg in spec.get('add_args') or ()]
+        self.unless_args = frozenset(spec.get('unless_args') or ())
+        self.unless_letters = _short_letters(self.unless_args)
+        self.rename_options = {str(old): str(new) for old, new in (spec.get('rename_options') or {}).items()}
+        self.option_values = {str(option): {str(k): str(v) for k, v in values.items()}
+                              for option, values in (spec.get('option_values') or {}).items()}
+        unwrap = spec.get('unwrap')
+        self.unwrap = frozenset(unwrap) if isinstance(unwrap, list) else (frozenset() if unwrap else None)
+
+    def has_flag(self, args: List[Arg]) -> bool:
+        """True if any unless_args flag is already present (also inside short clusters like -bn1)"""
+        for _, value in args:
+            if value.split('=', 1)[0] in self.unless_args:
+                return True
+            cluster = _SHORT_CLUSTER.match(value)
+            if cluster and self.unless_letters & set(cluster.group(1)):
+                return True
+        return False
+
+    @staticmethod
+    def _split_option(value: str, options) -> Optional[Tuple[str, str]]:
+        """(option, attached value) if value is one of options, alone or with its value attached (-l1)"""
+        if value in options:
+            return value, ''
+        if len(value) > 2 and value[:2] in options and not value.startswith('--'):
+            return value[:2], value[2:]
+        return None
+
+    def translate(self, args: List[Arg]) -> List[Arg]:
+        """Apply rename_options (to unquoted options) and option_values"""
+        translated = []
+        pending: Optional[Dict[str, str]] = None
+        for raw, value in args:
+            if pending is not None:
+                if value in pending:
+                    value = pending[value]
+                    raw = shlex.quote(value)
+                pending = None
+                translated.append((raw, value))
+                continue
+            if raw == value:
+                option = self._split_option(value, self.rename_options)
+                if option:
+                    value = raw = self.rename_options[option[0]] + option[1]
+                option = self._split_option(value, self.option_values)
+                if option:
+                    values = self.option_values[option[0]]
+                    if not option[1]:
+                        pending = values
+                    elif option[1] in values:
+                        value = option[0] + values[option[1]]
+                        raw = option[0] + shlex.quote(values[option[1]])
+            translated.append((raw, value))
+        return translated
+
+    def strip_flags(self, args: List[Arg]) -> List[Arg]:
+        """Remove remove_args flags, including their letters inside short clusters (-fn 20 -> -n 20)"""
+        kept = []
+        for raw, value in args:
+            if raw == value and value in self.remove_args:
+                continue
+            cluster = _SHORT_CLUSTER.match(value) if raw == value else None
+            if cluster and self.remove_letters & set(cluster.group(1)):
+                letters = ''.join(c for c in cluster.group(1) if c not in self.remove_letters)
+                if not letters:
+                    continue
+                value = f"-{letters}{cluster.group(2)}"
+                raw = value
+            kept.append((raw, value))
+        return kept
+
+
+@lru_cache(maxsize=8)
+def _compile(system: str, user_rules_json: str) -> Tuple[RewriteRule, ...]:
+    """Compile user rules (first) and the defaults for one platform - cached, so this runs once per process"""
+    user_rules = json.loads(user_rules_json)
+    disabled = {rule.get('program') for rule in user_rules if rule.get('disable')}
+    compiled = []
+    for spec in user_rules + [r for r in DEFAULT_REWRITE_RULES if r['program'] not in disabled]:
+        if spec.get('disable'):
+            continue
+        platforms = spec.get('platforms')
+        if platforms and system not in platforms:
+            continue
+        try:
+            compiled.append(RewriteRule(spec))
+        except (KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring invalid command rewrite rule {spec!r}: {e}")
+    return tuple(compiled)
+
+
+def _program_index(values: List[str]) -> Optional[int]:
+    """Index of the real program in a segment, skipping VAR=value words and sudo/nice/timeout style prefixes"""
+    i, n = 0, len(values)
+    while i < n and is_assignment(values[i]):
+        i += 1
+    while i < n and os.path.basename(values[i]) in WRAPPERS:
+        wrapper = os.path.basename(values[i])
+        i += 1
+        while i < n and values[i].startswith('-'):
+            i += 2 if values[i] in WRAPPERS[wrapper] else 1
+        if wrapper == 'timeout':
+            i += 1  # duration
+        while wrapper == 'env' and i < n and is_assignment(values[i]):
+            i += 1
+    return i if i < n else None
+
+
+def _unwrapped_command(args: List[Arg], value_options: frozenset) -> Optional[str]:
+    """The command a watch-style wrapper repeats, as shell text (None if there is none)"""
+    exec_mode = False
+    i = 0
+    while i < len(args):
+        value = args[i][1]
+        if value == '--':
+            i += 1
+            break
+        if not value.startswith('-') or value == '-':
+            break
+        if value in ('-x', '--exec'):
+            exec_mode = True
+        i += 2 if value in value_options else 1
+    rest = [value for _, value in args[i:]]
+    if not rest:
+        return None
+    # watch hands its arguments to 'sh -c' joined by spaces unless --exec is given
+    return ' '.join(shlex.quote(arg) for arg in rest) if exec_mode else ' '.join(rest)
+
+
+class CommandRewriter:
+    """Rewrite each segment of a command line according to compiled rules"""
+
+    def __init__(self, rules: Tuple[RewriteRule, ...], enabled: bool = True):
+        """
+        Initialize rewriter
+
+        Args:
+            rules: Compiled rules, applied in order
+            enabled: Turn rewriting off entirely
+        """
+        self.rules = rules
+        self.enabled = enabled
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'CommandRewriter':
+        """Build a rewriter from command_rewrite and command_rewrite_rules config keys"""
+        user_rules = config.get('command_rewrite_rules') or []
+        rules = _compile(platform.system(), json.dumps(user_rules, sort_keys=True))
+        return cls(rules, enabled=bool(config.get('command_rewrite', True)))
+
+    def rewrite(self, command: str) -> str:
+        """Return the bounded, non-interactive form of a command (unchanged segments keep their exact text)"""
+        if not self.enabled:
+            return command
+        return self._rewrite(command, 0)
+
+    def _rewrite(self, command: str, depth: int) -> str:
+        segments = [(self._rewrite_segment(text, depth), sep) for text, sep in split_segments(command)]
+        return join_segments(segments)
+
+    def _rewrite_segment(self, text: str, depth: int) -> str:
+        tokens = raw_tokens(text)
+        start = _program_index([value for _, value, _, _ in tokens])
+        if start is None:
+            return text
+
+        program_raw = tokens[start][0]
+        program = os.path.basename(tokens[start][1])
+        args: List[Arg] = [(raw, value) for raw, value, _, _ in tokens[start + 1:]]
+        head, tail = text[:tokens[start][2]], text[tokens[-1][3]:]
+        changed = False
+
+        for rule in self.rules:
+            if rule.program != program:
+                continue
+            if rule.unwrap is not None:
+                inner = _unwrapped_command(args, rule.unwrap)
+                if inner is None:
+                    continue
+                if depth < MAX_UNWRAP_DEPTH:
+                    inner = self._rewrite(inner, depth + 1)
+                return f"{head}{inner}{tail}"
+            if rule.replace_program:
+                program = program_raw = rule.replace_program
+                if rule.drop_args:
+                    args = []
+                elif rule.drop_options:
+                    args = [arg for arg in args if not arg[1].startswith('-')]
+                changed = True
+            if rule.rename_options or rule.option_values:
+                translated = rule.translate(args)
+                if translated != args:
+                    args = translated
+                    changed = True
+            if rule.remove_args:
+                stripped = rule.strip_flags(args)
+                if stripped != args:
+                    args = stripped
+                    changed = True
+            if rule.add_args and not rule.has_flag(args):
+                args = [(shlex.quote(arg), arg) for arg in rule.add_args] + args
+                changed = True
+
+        if not changed:
+            return text
+        return head + ' '.join([program_raw] + [raw for raw, _ in args]) + tail
@@ -0,0 +1,288 @@
+"""
+Execution sandbox for agent-run commands
+Applies rlimits, CPU/IO priorities and optional cgroup v2 limits, and reports per-command resource usage
+
+Limits are applied to the shell right after it starts (prlimit, setpriority, cgroup.procs) rather than
+in a preexec_fn, which is unsafe once the process has threads (router pool, dispatcher, query server)
+"""
+
+import itertools
+import os
+import platform
+import signal
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from core.execution.executor import StreamingExecutor
+
+
+MB = 1024 * 1024
+
+# stderr phrases left behind when a limit stops a command
+LIMIT_MESSAGES = [
+    ('Cannot allocate memory', 'memory'),
+    ('MemoryError', 'memory'),
+    ('File size limit exceeded', 'file size'),
+    ('Resource temporarily unavailable', 'processes'),
+    ('retry: fork', 'processes'),
+]
+
+# ulimit flag and unit (bytes per step) for platforms without prlimit (macOS)
+ULIMIT_FLAGS = {
+    'RLIMIT_CPU': ('-t', 1),
+    'RLIMIT_AS': ('-v', 1024),
+    'RLIMIT_FSIZE': ('-f', 512),
+    'RLIMIT_NPROC': ('-u', 1),
+}
+
+_cgroup_ids = itertools.count(1)
+
+
+class Sandbox:
+    """Resource limits and priorities applied to every agent-run command"""
+
+    def __init__(self, enabled: bool = True, cpu_seconds: Optional[int] = 60,
+                 memory_mb: Optional[int] = None, file_size_mb: Optional[int] = 512,
+                 max_processes: Optional[int] = 256, nice: int = 10, ionice: Optional[str] = 'low',
+                 cgroup_root: Optional[str] = None, cgroup_memory_mb: Optional[int] = None,
+                 cgroup_cpu_percent: Optional[int] = None):
+        """
+        Initialize sandbox
+
+        Args:
+            enabled: Apply limits (usage is reported either way)
+            cpu_seconds: CPU time per process (RLIMIT_CPU)
+            memory_mb: Address space per process (RLIMIT_AS) - off by default, JVMs and Go binaries reserve
+                far more than they use; cgroup_memory_mb limits actual memory
+            file_size_mb: Largest file a command may write (RLIMIT_FSIZE)
+            max_processes: Extra processes a command may start beyond those the user already runs (RLIMIT_NPROC)
+            nice: Scheduling niceness added to commands
+            ionice: 'low' (best-effort, lowest), 'idle' or None - Linux only
+            cgroup_root: Delegated cgroup v2 directory to create per-command groups in (e.g. /sys/fs/cgroup/jarvis)
+            cgroup_memory_mb: memory.max for the whole command (cgroup only)
+            cgroup_cpu_percent: cpu.max as a percentage of one CPU (cgroup only)
+        """
+        self.enabled = enabled
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.file_size_mb = file_size_mb
+        self.max_processes = max_processes
+        self.nice = nice
+        self.ionice = ionice if platform.system() == 'Linux' else None
+        self.cgroup_root = Path(cgroup_root) if cgroup_root else None
+        self.cgroup_memory_mb = cgroup_memory_mb
+        self.cgroup_cpu_percent = cgroup_cpu_percent
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Sandbox':
+        """Build a sandbox from sandbox_* config keys"""
+        return cls(
+            enabled=bool(config.get('sandbox', True)),
+            cpu_seconds=config.get('sandbox_cpu_seconds', 60),
+            memory_mb=config.get('sandbox_memory_mb'),
+            file_size_mb=config.get('sandbox_file_size_mb', 512),
+            max_processes=config.get('sandbox_max_processes', 256),
+            nice=int(config.get('sandbox_nice', 10)),
+            ionice=config.get('sandbox_ionice', 'low'),
+            cgroup_root=config.get('sandbox_cgroup_root'),
+            cgroup_memory_mb=config.get('sandbox_cgroup_memory_mb'),
+            cgroup_cpu_percent=config.get('sandbox_cgroup_cpu_percent')
+        )
+
+    def _limits(self) -> List[tuple]:
+        """(rlimit name, rlimit, soft value) triples to apply to the command"""
+        if not (self.enabled and RESOURCE_AVAILABLE):
+            return []
+        limits = []
+        if self.cpu_seconds:
+            limits.append(('RLIMIT_CPU', resource.RLIMIT_CPU, int(self.cpu_seconds)))
+        if self.memory_mb and hasattr(resource, 'RLIMIT_AS'):
+            limits.append(('RLIMIT_AS', resource.RLIMIT_AS, int(self.memory_mb) * MB))
+        if self.file_size_mb:
+            limits.append(('RLIMIT_FSIZE', resource.RLIMIT_FSIZE, int(self.file_size_mb) * MB))
+        if self.max_processes and PSUTIL_AVAILABLE and hasattr(resource, 'RLIMIT_NPROC'):
+            # RLIMIT_NPROC counts every process of the user, so allow headroom above today's count
+            try:
+                uid = os.getuid()
+                running = sum(1 for p in psutil.process_iter(['uids'])
+                              if p.info['uids'] and p.info['uids'].real == uid)
+                limits.append(('RLIMIT_NPROC', resource.RLIMIT_NPROC, running + int(self.max_processes)))
+            except Exception:
+                pass
+        return limits
+
+    def _create_cgroup(self) -> Optional[Path]:
+        """Create a per-command cgroup under the delegated root (None if unavailable)"""
+        if not (self.enabled and self.cgroup_root):
+            return None
+        path = self.cgroup_root / f"cmd-{os.getpid()}-{next(_cgroup_ids)}"
+        try:
+            path.mkdir()
+            if self.cgroup_memory_mb:
+                (path / 'memory.max').write_text(str(int(self.cgroup_memory_mb) * MB))
+            if self.cgroup_cpu_percent:
+                (path / 'cpu.max').write_text(f"{int(self.cgroup_cpu_percent) * 1000} 100000")
+            if self.max_processes:
+                (path / 'pids.max').write_text(str(int(self.max_processes)))
+            return path
+        except OSError:
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+            return None
+
+    @staticmethod
+    def _cgroup_stats(path: Path) -> Dict[str, Any]:
+        """Read peak memory, CPU time and OOM kills from a finished command's cgroup"""
+        stats: Dict[str, Any] = {}
+        try:
+            peak = path / 'memory.peak'
+            if peak.exists():
+                stats['memory_peak_mb'] = round(int(peak.read_text()) / MB, 1)
+            for line in (path / 'memory.events').read_text().splitlines():
+                key, _, value = line.partition(' ')
+                if key == 'oom_kill':
+                    stats['oom_kills'] = int(value)
+            for line in (path / 'cpu.stat').read_text().splitlines():
+                key, _, value = line.partition(' ')
+                if key == 'usage_usec':
+                    stats['cpu_seconds'] = round(int(value) / 1e6, 3)
+        except (OSError, ValueError):
+            pass
+        return stats
+
+    def run(self, executor: StreamingExecutor, command: str, live: Optional[bool] = None,
+            env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Run a command through the executor inside the sandbox
+
+        Args:
+            executor: Executor that spawns and streams the command
+            command: Shell command line
+            live: Override live echo for this command
+            env: Environment for the command (default: this process's)
+
+        Returns:
+            The executor result with a 'usage' dict (cpu_user, cpu_system, max_rss_mb, limits_hit, ...)
+        """
+        limits = self._limits()
+        nice = self.nice if self.enabled else 0
+        cgroup = self._create_cgroup()
+        if limits and not hasattr(resource, 'prlimit'):
+            # No prlimit (macOS): the shell lowers its own soft limits before running the command
+            command = self._ulimit_prefix(limits) + command
+            limits = []
+
+        def on_spawn(proc) -> None:
+            # The shell's children inherit all of this; anything it forks in the first instant may not
+            if cgroup:
+                try:
+                    (cgroup / 'cgroup.procs').write_text(str(proc.pid))
+                except OSError:
+                    pass
+            for _, limit, value in limits:
+                try:
+                    _, hard = resource.prlimit(proc.pid, limit)
+                    if hard != resource.RLIM_INFINITY:
+                        value = min(value, hard)
+                    resource.prlimit(proc.pid, limit, (value, hard))
+                except (ValueError, OSError):
+                    pass
+            if nice:
+                try:
+                    os.setpriority(os.PRIO_PROCESS, proc.pid, min(19, os.getpriority(os.PRIO_PROCESS, 0) + nice))
+                except (AttributeError, OSError):
+                    pass
+            if self.enabled and self.ionice and PSUTIL_AVAILABLE:
+                try:
+                    if self.ionice == 'idle':
+                        psutil.Process(proc.pid).ionice(psutil.IOPRIO_CLASS_IDLE)
+                    else:
+                        psutil.Process(proc.pid).ionice(psutil.IOPRIO_CLASS_BE, value=7)
+                except Exception:
+                    pass
+
+        popen_kwargs = {'env': env} if env is not None else None
+        cgroup_stats: Dict[str, Any] = {}
+        try:
+            result = executor.run(command, popen_kwargs=popen_kwargs, on_spawn=on_spawn, live=live)
+        finally:
+            if cgroup:
+                cgroup_stats = self._cgroup_stats(cgroup)
+                try:
+                    cgroup.rmdir()
+                except OSError:
+                    pass
+
+        result['usage'] = self._usage(result, cgroup_stats)
+        return result
+
+    @staticmethod
+    def _ulimit_prefix(limits: List[tuple]) -> str:
+        """Shell line that lowers soft limits (ignoring ones above the hard limit) before a command"""
+        parts = []
+        for name, _, value in limits:
+            flag, unit = ULIMIT_FLAGS[name]
+            parts.append(f"ulimit -S {flag} {max(1, value // unit)} 2>/dev/null")
+        return '; '.join(parts) + '\n'
+
+    @staticmethod
+    def _usage(result: Dict[str, Any], cgroup_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize resource usage and which limits (if any) stopped the command"""
+        usage: Dict[str, Any] = {'wall_seconds': round(result.get('duration', 0.0), 3)}
+        rusage = result.pop('rusage', None)
+        if rusage is not None:
+            # ru_maxrss is kilobytes on Linux and bytes on macOS
+            rss = rusage.ru_maxrss / MB if platform.system() == 'Darwin' else rusage.ru_maxrss / 1024
+            usage.update(cpu_user=round(rusage.ru_utime, 3), cpu_system=round(rusage.ru_stime, 3),
+                         max_rss_mb=round(rss, 1))
+        usage.update(cgroup_stats)
+
+        limits_hit = []
+        returncode = result.get('returncode')
+        if returncode == -signal.SIGXCPU or returncode == 128 + signal.SIGXCPU:
+            limits_hit.append('cpu time')
+        if returncode == -signal.SIGXFSZ or returncode == 128 + signal.SIGXFSZ:
+            limits_hit.append('file size')
+        if cgroup_stats.get('oom_kills'):
+            limits_hit.append('memory (cgroup)')
+        stderr = result.get('stderr', '')
+        for phrase, limit in LIMIT_MESSAGES:
+            if phrase in stderr and limit not in limits_hit:
+                limits_hit.append(limit)
+        if result.get('timed_out'):
+            limits_hit.append('wall clock')
+        if result.get('truncated'):
+            limits_hit.append('output size')
+        usage['limits_hit'] = limits_hit
+        return usage
+
+
+def format_usage(usage: Optional[Dict[str, Any]]) -> str:
+    """One-line description of a command's resource usage"""
+    if not usage:
+        return ''
+    parts = [f"wall {usage.get('wall_seconds', 0):.2f}s"]
+    if 'cpu_user' in usage:
+        parts.append(f"CPU {usage['cpu_user']:.2f}s user + {usage['cpu_system']:.2f}s sys")
+    if 'max_rss_mb' in usage:
+        parts.append(f"max RSS {usage['max_rss_mb']:.1f} MB")
+    if 'memory_peak_mb' in usage:
+        parts.append(f"cgroup peak {usage['memory_peak_mb']:.1f} MB")
+    text = ', '.join(parts)
+    if usage.get('limits_hit'):
+        text += f" - stopped by limits: {', '.join(usage['limits_hit'])}"
+    return text
@@ -0,0 +1,131 @@
+"""
+Shell command parsing helpers
+Quote-aware splitting of command lines into pipeline/list segments and argv extraction
+"""
+
+import os
+import re
+import shlex
+from typing import List, Optional, Tuple
+
+
+# Longest first so '&&' wins over '&' and '|&' over '|'
+SEPARATORS = ('&&', '||', '|&', '|', ';', '&', '\n')
+
+_ASSIGNMENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+
+# Redirections that never write user data (discarding output, merging streams)
+_BENIGN_REDIRECTS = re.compile(r'(?:\d*>>?|&>)\s*/dev/null|\d*>&\d|\d*<&\d')
+
+
+def mask_quotes(command: str) -> str:
+    """Return command with quoted and escaped characters replaced by '_' (same length)"""
+    out = []
+    quote = None
+    i, n = 0, len(command)
+    while i < n:
+        c = command[i]
+        if quote:
+            if c == '\\' and quote == '"' and i + 1 < n:
+                out.append('__')
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+            out.append('_')
+        elif c == '\\' and i + 1 < n:
+            out.append('__')
+            i += 2
+            continue
+        elif c in ('"', "'"):
+            quote = c
+            out.append('_')
+        else:
+            out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+def split_segments(command: str) -> List[Tuple[str, str]]:
+    """
+    Split a command line at unquoted |, ||, &&, ;, & and newlines
+
+    Returns:
+        List of (segment text, separator that follows it or '')
+    """
+    masked = mask_quotes(command)
+    segments = []
+    start = i = 0
+    n = len(masked)
+    while i < n:
+        sep = next((s for s in SEPARATORS if masked.startswith(s, i)), None)
+        if sep:
+            prev = masked[i - 1] if i else ''
+            nxt = masked[i + len(sep)] if i + len(sep) < n else ''
+            # '2>&1', '&>file', '>|file' are redirections, not separators
+            if (sep in ('&', '|', '|&') and prev in '<>') or (sep == '&' and nxt == '>'):
+                i += len(sep)
+                continue
+            segments.append((command[start:i], sep))
+            i += len(sep)
+            start = i
+            continue
+        i += 1
+    segments.append((command[start:], ''))
+    return [(text, sep) for text, sep in segments if text.strip() or sep]
+
+
+def join_segments(segments: List[Tuple[str, str]]) -> str:
+    """Inverse of split_segments"""
+    return ''.join(text + sep for text, sep in segments)
+
+
+def has_substitution(command: str) -> bool:
+    """True if the command uses $(...), backticks or process substitution outside single quotes"""
+    masked_single = re.sub(r"'[^']*'", lambda m: '_' * len(m.group(0)), command)
+    return any(token in masked_single for token in ('$(', '`', '<(', '>('))
+
+
+def has_write_redirect(segment: str) -> bool:
+    """True if a segment redirects output to a file (ignoring /dev/null and fd merges)"""
+    masked = _BENIGN_REDIRECTS.sub('', mask_quotes(segment))
+    return '>' in masked
+
+
+def raw_tokens(segment: str) -> List[Tuple[str, str, int, int]]:
+    """
+    Tokenize one segment keeping the original text of every word
+
+    Returns:
+        List of (raw text, shlex-unquoted value, start, end) - raw text can be reused verbatim when rebuilding
+    """
+    tokens = []
+    for match in re.finditer(r'\S+', mask_quotes(segment)):
+        raw = segment[match.start():match.end()]
+        try:
+            value = ''.join(shlex.split(raw))
+        except ValueError:
+            value = raw
+        tokens.append((raw, value, match.start(), match.end()))
+    return tokens
+
+
+def is_assignment(word: str) -> bool:
+    """True for a leading VAR=value word"""
+    return bool(_ASSIGNMENT.match(word))
+
+
+def segment_argv(segment: str) -> Optional[List[str]]:
+    """Tokenize one segment, dropping leading VAR=value assignments (None if unparseable)"""
+    try:
+        argv = shlex.split(segment)
+    except ValueError:
+        return None
+    while argv and is_assignment(argv[0]):
+        argv.pop(0)
+    return argv
+
+
+def program_name(argv: List[str]) -> str:
+    """Base name of the program an argv runs"""
+    return os.path.basename(argv[0]) if argv else ''
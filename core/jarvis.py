@@ -7,11 +7,11 @@ import sys
 import os
 import json
 import re
-import subprocess
 import time
 import base64
+import copy
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # Add project root to path for imports
 _project_root = Path(__file__).parent.parent
@@ -21,13 +21,26 @@ if str(_project_root) not in sys.path:
 from core.ai.gemini import GeminiProvider
 from core.ai.slm import SLMProvider
 from core.ai.drona import DronaProvider
+from core.ai.router import RouterProvider
+from core.ai.resilience import ResilientProvider
+from core.ai.replay import RecordingProvider, ReplayProvider
+from core.ai.session import ConversationSession
+from core.ai.prompt_builder import PromptBuilder
+from core.execution.cache import CommandCache
+from core.execution.executor import StreamingExecutor
+from core.execution.rewrite import CommandRewriter
+from core.execution.sandbox import Sandbox, format_usage
 from core.monitoring.network import NetworkMonitor
 from core.monitoring.process import ProcessMonitor
+from core.monitoring.daemon import MonitorDaemon, VerdictCache
 from core.security.scanner import SecurityScanner
 from core.voice.voice_mode import VoiceMode
 from utils.config import load_config
 from utils.system_info import SystemInfo
-from utils.notifications import NotificationManager
+from utils.dispatcher import NotificationDispatcher
+from utils.sinks import AlertRouter
+from utils.metrics import MetricsServer
+from utils.tracing import span, traced
 
 
 class Jarvis:
@@ -44,6 +57,22 @@ class Jarvis:
         
         # Initialize AI provider
         self.ai_provider = None
+        self.routed = False
+        
+        # Conversation history shared by follow-up queries
+        config = load_config()
+        self.session = ConversationSession.from_config(config)
+        
+        # Keeps every prompt within the selected model's token budget
+        self.prompt_builder = PromptBuilder.from_config(config, model)
+        
+        # Command execution: bounded rewrites, sandboxed streaming runs and reuse of read-only results
+        self.command_cache = CommandCache.from_config(config)
+        self.executor = StreamingExecutor.from_config(config)
+        self.sandbox = Sandbox.from_config(config)
+        self.rewriter = CommandRewriter.from_config(config)
+        # Environment for agent-run commands (None: this process's); the resident server sets the client's
+        self.command_env: Optional[Dict[str, str]] = None
         
         # Load image if provided
         if image_path:
@@ -82,18 +111,36 @@ class Jarvis:
             print(f"⚠️ Warning: Failed to load image: {e}")
             self.image_data = None
     
+    def _create_provider(self, model: str):
+        """Create the provider for a model name"""
+        if model == 'slm':
+            return SLMProvider()
+        elif model == 'gemini':
+            return GeminiProvider()
+        elif model == 'drona':
+            return DronaProvider(bot_id=self.bot_id)
+        print(f"❌ Unknown model: {model}")
+        print("❌ Supported models: 'slm', 'gemini', 'drona'")
+        sys.exit(1)
+    
     def setup_ai(self) -> None:
-        """Setup AI connection using the appropriate provider"""
-        if self.model == 'slm':
-            self.ai_provider = SLMProvider()
-        elif self.model == 'gemini':
-            self.ai_provider = GeminiProvider()
-        elif self.model == 'drona':
-            self.ai_provider = DronaProvider(bot_id=self.bot_id)
+        """Setup AI connection using the appropriate provider (a router when fallback backends are configured)"""
+        config = load_config()
+        fallbacks = [name for name in config.get('ai_backends', []) if name != self.model]
+        self.routed = bool(fallbacks)
+        if config.get('ai_replay'):
+            # Offline runs: answer from recorded fixtures instead of any backend
+            self.routed = False
+            self.ai_provider = ResilientProvider.from_config(config, ReplayProvider.from_config(config), 'replay')
+        elif fallbacks:
+            # The router keeps a breaker per backend; the middleware adds retries and the deadline
+            backends = {name: self._create_provider(name) for name in [self.model] + fallbacks}
+            router = RouterProvider.from_config(config, backends)
+            self.ai_provider = ResilientProvider.from_config(config, router, 'router', breaker=False)
         else:
-            print(f"❌ Unknown model: {self.model}")
-            print("❌ Supported models: 'slm', 'gemini', 'drona'")
-            sys.exit(1)
+            self.ai_provider = ResilientProvider.from_config(config, self._create_provider(self.model), self.model)
+        if config.get('ai_record') and not config.get('ai_replay'):
+            self.ai_provider = RecordingProvider(self.ai_provider, config['ai_record'], self.model)
         
         # Setup the provider
         if not self.ai_provider.setup():
@@ -109,9 +156,12 @@ class Jarvis:
         print("🤖 Processing...")
         
         # Always use unified flow - LLM decides through its responses
-        self.unified_query_processing(query)
+        with span('jarvis.query'):
+            self.unified_query_processing(query)
     
-    def parse_json_response(self, response_text: str) -> Optional[Dict]:
+    @staticmethod
+    @traced('response.parse')
+    def parse_json_response(response_text: str) -> Optional[Dict]:
         """Parse JSON response from LLM, handling both JSON and plain text"""
         # Try to extract JSON from response
         json_match = re.search(r'\{[^{}]*"command"[^{}]*\}', response_text, re.DOTALL)
@@ -142,23 +192,27 @@ class Jarvis:
     def unified_query_processing(self, query: str) -> None:
         """Unified query processing - LLM decides whether single or multi-step is needed"""
         try:
-            # Get system info for context
-            system_info = self.get_system_info()
+            # Get system info for context (snapshot reused across follow-ups)
+            system_info = self.session.system_info(self.get_system_info)
             
             # Create unified prompt - LLM decides the approach
-            prompt = self._build_query_prompt(query, system_info)
+            context = self.session.render_context()
+            self.session.begin_turn(query)
+            prompt = self._build_query_prompt(query, system_info, context)
             
             # Process query with unified command execution flow
             self.execute_command_flow(query, prompt, system_info)
                 
         except Exception as e:
+            self.session.end_turn()
             print(f"❌ Error processing query: {e}")
             print("❌ AI connection may be lost. Please restart Jarvis.")
     
-    def _build_query_prompt(self, query: str, system_info: str) -> str:
-        """Build the prompt for query processing"""
-        from config.prompts import build_query_prompt
-        return build_query_prompt(query, system_info)
+    def _build_query_prompt(self, query: str, system_info: str, context: str = "") -> str:
+        """Build the prompt for query processing, within the model's token budget"""
+        from config.prompts import query_prompt_sections
+        prompt, _ = self.prompt_builder.build(query_prompt_sections(query, system_info, context))
+        return prompt
     
     def execute_command_flow(self, initial_query: str, initial_prompt: str, system_info: str) -> None:
         """Execute command flow with intermediate/last command handling - Agentic iteration"""
@@ -174,7 +228,11 @@ class Jarvis:
                 print(f"\n🔄 Agentic iteration {iteration}/{max_iterations}...")
             
             # Get response from AI model
-            if self.model == 'drona':
+            if self.routed:
+                # Backends ignore the keyword arguments they don't use
+                response_text = self.ai_provider.query(current_prompt, image_data=self.image_data,
+                                                       image_mime_type=self.image_mime_type, test=False)
+            elif self.model == 'drona':
                 response_text = self.ai_provider.query(current_prompt, image_data=self.image_data, test=False)
             elif self.model == 'gemini':
                 response_text = self.ai_provider.query(current_prompt, image_data=self.image_data, image_mime_type=self.image_mime_type)
@@ -210,6 +268,15 @@ class Jarvis:
                 
                 # Execute command and get results
                 result = self.execute_command_silent(command)
+                execution_note = ""
+                if result.get("cached"):
+                    execution_note = (f"Output reused from the read-only command cache "
+                                      f"(captured {result['cache_age']:.0f}s ago)")
+                    print(f"♻️  {execution_note}")
+                usage = format_usage(result.get("usage"))
+                if usage:
+                    usage_note = f"Resource usage: {usage}"
+                    execution_note = f"{execution_note}; {usage_note}" if execution_note else usage_note
                 
                 # Show result to user
                 self.show_command_result(command, result)
@@ -220,25 +287,28 @@ class Jarvis:
                 else:
                     print("❌ Command failed!")
                 
+                output_text = result["stdout"] if result["stdout"] else result["stderr"]
+                if not output_text:
+                    output_text = "Command executed with no output"
+                self.session.record_command(command, output_text, result["success"])
+                
                 # If last command, stop flow
                 if command_number == "last":
                     print("\n✅ Agentic flow complete!")
+                    self.session.end_turn()
                     break
                 
                 # If intermediate, send output back to LLM and continue
                 if command_number == "intermediate":
-                    output_text = result["stdout"] if result["stdout"] else result["stderr"]
-                    if not output_text:
-                        output_text = "Command executed with no output"
-                    
                     print(f"\n🔄 Analyzing output and determining next steps...")
                     print(f"📤 Sending command output back to LLM with original query...")
                     
                     # Update prompt for next iteration - ALWAYS include original query
-                    from config.prompts import build_iteration_prompt
-                    current_prompt = build_iteration_prompt(
-                        initial_query, system_info, command, output_text, result["success"]
-                    )
+                    from config.prompts import iteration_prompt_sections
+                    current_prompt, _ = self.prompt_builder.build(iteration_prompt_sections(
+                        initial_query, system_info, command, output_text, result["success"],
+                        self.session.render_context(skip_last_command=True), execution_note
+                    ))
                     
                     continue
             else:
@@ -249,55 +319,32 @@ class Jarvis:
                 print(response_text)
                 print("=" * 60)
                 print()
+                self.session.end_turn(response_text)
                 break
         
         if iteration >= max_iterations:
             print("\n⚠️ Maximum iterations reached. Stopping flow.")
+        self.session.end_turn()
     
-    def sanitize_command(self, command: str) -> str:
-        """Convert interactive commands to non-interactive versions to prevent timeouts"""
-        command_lower = command.lower().strip()
-        
-        # Convert top commands to non-interactive versions
-        if command_lower.startswith('top ') and '-l' not in command_lower:
-            if 'top -' in command_lower:
-                command = command.replace('top ', 'top -l 1 ', 1)
-            elif command_lower == 'top':
-                command = 'top -l 1'
-            else:
-                command = command.replace('top ', 'top -l 1 ', 1)
-        
-        # Convert other potentially interactive commands
-        if 'htop' in command_lower or 'btop' in command_lower:
-            if 'htop' in command_lower:
-                command = command.replace('htop', 'top -l 1', 1)
-            if 'btop' in command_lower:
-                command = command.replace('btop', 'top -l 1', 1)
-        
-        return command
-    
-    def execute_command_silent(self, command: str) -> Dict[str, Any]:
-        """Execute command and return results without showing to user"""
+    def execute_command_silent(self, command: str, use_cache: bool = True, live: Optional[bool] = None) -> Dict[str, Any]:
+        """Execute command in the sandbox, streaming its output live, and return a bounded capture with resource usage (read-only results may come from cache)"""
         try:
-            # Sanitize command to prevent interactive/timeout issues
-            sanitized_command = self.sanitize_command(command)
+            # Rewrite interactive/unbounded commands into bounded forms to prevent timeouts
+            sanitized_command = self.rewriter.rewrite(command)
             if sanitized_command != command:
                 print(f"⚠️  Auto-converted interactive command: {command} → {sanitized_command}")
             
-            result = subprocess.run(sanitized_command, shell=True, capture_output=True, text=True, timeout=30)
-            return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "returncode": result.returncode
-            }
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "stdout": "",
-                "stderr": "Command timed out",
-                "returncode": -1
-            }
+            with span('command.execute', command=sanitized_command) as timing:
+                if use_cache:
+                    cached = self.command_cache.get(sanitized_command, self.command_env)
+                    if cached:
+                        timing.set(cached=True)
+                        return cached
+                
+                result = self.sandbox.run(self.executor, sanitized_command, live=live, env=self.command_env)
+                timing.set(returncode=result.get('returncode'))
+            self.command_cache.record(sanitized_command, result, self.command_env)
+            return result
         except Exception as e:
             return {
                 "success": False,
@@ -308,6 +355,8 @@ class Jarvis:
     
     def show_command_result(self, command: str, result: Dict[str, Any]) -> None:
         """Show command execution result to user"""
+        # Streamed output has already been shown while the command ran
+        streamed = result.get("streamed") and not result.get("cached")
         print("\n" + "=" * 60)
         print("🚀 Command Executed:")
         print("=" * 60)
@@ -316,15 +365,23 @@ class Jarvis:
         
         if result["success"]:
             print("✅ Command executed successfully!")
-            if result["stdout"]:
+            if result["stdout"] and not streamed:
                 print("\nOutput:")
                 print(result["stdout"])
         else:
             print("❌ Command failed!")
-            if result["stderr"]:
+            if result.get("timed_out"):
+                print(f"⏱️  Stopped after {result.get('duration', 0):.1f}s (time budget exceeded)")
+            if result.get("truncated"):
+                print("✂️  Stopped after reaching the output limit")
+            if result["stderr"] and not streamed:
                 print("\nError:")
                 print(result["stderr"])
         
+        usage = format_usage(result.get("usage"))
+        if usage:
+            print(f"📊 Resources: {usage}")
+        
         print("=" * 60)
     
     def clear_screen(self) -> None:
@@ -351,12 +408,28 @@ class Jarvis:
         print("  help, h     - Show this help")
         print("  test, t     - Test the system")
         print("  clear, c    - Clear screen")
+        print("  new, n      - Start a new conversation (forget earlier questions)")
+        print("  health      - Show AI provider circuit and latency state")
         print("  pwd         - Show current directory")
         print("  ls          - List files in current directory")
         print("  quit, q     - Exit Jarvis")
         print("  <question>  - Ask Jarvis anything")
         print()
     
+    def print_ai_health(self) -> None:
+        """Print circuit breaker state and, with a router, per-backend latency"""
+        health = self.ai_provider.health() if hasattr(self.ai_provider, 'health') else {}
+        circuit = health.get('circuit')
+        if circuit:
+            print(f"🩺 {self.model}: circuit {circuit['state']}, {circuit['consecutive_failures']} consecutive failures, "
+                  f"opened {circuit['opens']} times")
+        for name, backend in (health.get('backends') or {}).items():
+            p50 = f"{backend['p50']:.2f}s" if backend['p50'] is not None else "n/a"
+            p95 = f"{backend['p95']:.2f}s" if backend['p95'] is not None else "n/a"
+            print(f"🩺 {name}: circuit {backend['circuit']}, p50 {p50}, p95 {p95}, "
+                  f"errors {backend['error_rate']:.0%} of {backend['calls']} calls")
+        print()
+    
     def run(self) -> None:
         """Main run loop - Interactive mode"""
         self.clear_screen()
@@ -383,10 +456,15 @@ class Jarvis:
                     self.clear_screen()
                     self.print_header()
                     self.print_help()
+                elif user_input.lower() in ['new', 'n']:
+                    self.session.reset()
+                    print("🆕 Started a new conversation")
+                elif user_input.lower() == 'health':
+                    self.print_ai_health()
                 elif user_input.lower() == 'pwd':
                     print(f"Current directory: {os.getcwd()}")
                 elif user_input.lower() == 'ls':
-                    result = self.execute_command_silent('ls -la')
+                    result = self.execute_command_silent('ls -la', use_cache=False, live=False)
                     if result["stdout"]:
                         print(result["stdout"])
                 else:
@@ -402,34 +480,116 @@ class Jarvis:
                 print(f"❌ Error: {e}")
                 print()
     
-    def monitor_network(self) -> None:
+    def start_metrics_server(self, config: Dict[str, Any], port: Optional[int] = None) -> Optional[MetricsServer]:
+        """Serve /metrics for a long-running mode when metrics_port (or port) is set"""
+        try:
+            server = MetricsServer.from_config(config, port)
+            if server:
+                print(f"📈 Metrics available at {server.start()}")
+            return server
+        except OSError as e:
+            print(f"⚠️  Could not start metrics endpoint: {e}")
+            return None
+    
+    def monitor_network(self, metrics_port: Optional[int] = None) -> None:
         """Monitor network connections using NetworkMonitor"""
-        notification_manager = NotificationManager(debug=True)
+        config = load_config()
+        metrics_server = self.start_metrics_server(config, metrics_port)
+        notification_manager = NotificationDispatcher.from_config(config, debug=True)
+        alert_router = AlertRouter.from_config(config)
         monitor = NetworkMonitor(
             model=self.model,
             ai_provider=self.ai_provider,
-            notification_manager=notification_manager
+            notification_manager=notification_manager,
+            alert_router=alert_router
         )
-        monitor.monitor()
+        try:
+            monitor.monitor()
+        finally:
+            notification_manager.close()
+            if alert_router:
+                alert_router.close()
+            if metrics_server:
+                metrics_server.stop()
     
-    def monitor_processes(self) -> None:
+    def monitor_processes(self, metrics_port: Optional[int] = None) -> None:
         """Monitor processes using ProcessMonitor"""
-        notification_manager = NotificationManager(debug=True)
+        config = load_config()
+        metrics_server = self.start_metrics_server(config, metrics_port)
+        notification_manager = NotificationDispatcher.from_config(config, debug=True)
+        alert_router = AlertRouter.from_config(config)
         monitor = ProcessMonitor(
             model=self.model,
             ai_provider=self.ai_provider,
-            notification_manager=notification_manager
+            notification_manager=notification_manager,
+            alert_router=alert_router
         )
-        monitor.monitor()
+        try:
+            monitor.monitor()
+        finally:
+            notification_manager.close()
+            if alert_router:
+                alert_router.close()
+            if metrics_server:
+                metrics_server.stop()
+    
+    def monitor_daemon(self, monitors: List[str], metrics_port: Optional[int] = None) -> None:
+        """
+        Run several monitors in one process under MonitorDaemon
+        
+        Args:
+            monitors: Monitor names (process, network); processes run first so network alerts reuse their table
+            metrics_port: Serve /metrics on this port while running
+        """
+        aliases = {'process': 'process', 'processes': 'process', 'network': 'network'}
+        unknown = [name for name in monitors if name not in aliases]
+        if unknown:
+            print(f"❌ Unknown monitor type: {', '.join(unknown)}")
+            return
+        wanted = {aliases[name] for name in monitors}
+        
+        config = load_config()
+        metrics_server = self.start_metrics_server(config, metrics_port)
+        # One set of resources shared by every monitor
+        notification_manager = NotificationDispatcher.from_config(config, debug=True)
+        alert_router = AlertRouter.from_config(config)
+        shared = {
+            'model': self.model,
+            'ai_provider': self.ai_provider,
+            'notification_manager': notification_manager,
+            'alert_router': alert_router,
+            'verdict_cache': VerdictCache.from_config(config),
+        }
+        instances = {}
+        if 'process' in wanted:
+            instances['process'] = ProcessMonitor(**shared)
+        if 'network' in wanted:
+            instances['network'] = NetworkMonitor(**shared)
+        try:
+            MonitorDaemon.from_config(config, instances, model=self.model).run()
+        finally:
+            notification_manager.close()
+            if alert_router:
+                alert_router.close()
+            if metrics_server:
+                metrics_server.stop()
     
-    def scan_folder(self, folder_path: str) -> None:
+    def scan_folder(self, folder_path: str, resume: bool = False, **scanner_options) -> None:
         """Scan folder for sensitive files using SecurityScanner"""
         if self.model != 'drona':
             print("❌ Scan feature is only available with -m drona")
             return
         
-        scanner = SecurityScanner(ai_provider=self.ai_provider)
-        scanner.scan_folder(folder_path, model=self.model)
+        # The scan pipeline retries each file itself, taking a rate-limit token per attempt;
+        # middleware retries underneath would multiply attempts and bypass the limit
+        provider = self.ai_provider
+        if isinstance(provider, RecordingProvider) and isinstance(provider.provider, ResilientProvider):
+            provider = copy.copy(provider)
+            provider.provider = provider.provider.single_attempt()
+        elif isinstance(provider, ResilientProvider):
+            provider = provider.single_attempt()
+        scanner = SecurityScanner(ai_provider=provider, **scanner_options)
+        scanner.scan_folder(folder_path, model=self.model, resume=resume)
     
     def run_voice_mode(self) -> None:
         """Run voice command mode using VoiceMode"""
@@ -2,6 +2,7 @@
 
 from core.monitoring.network import NetworkMonitor
 from core.monitoring.process import ProcessMonitor
+from core.monitoring.snapshot import Snapshot
+from core.monitoring.daemon import MonitorDaemon, VerdictCache
 
-__all__ = ['NetworkMonitor', 'ProcessMonitor']
-
+__all__ = ['NetworkMonitor', 'ProcessMonitor', 'Snapshot', 'MonitorDaemon', 'VerdictCache']
@@ -0,0 +1,241 @@
+"""
+Monitor daemon
+Runs several monitors in one process under one scheduler. Each tick collects at most one process
+table and one connection table, shared by every monitor due in that tick, and the monitors share
+one AI provider, notification dispatcher, alert router and verdict cache.
+"""
+
+import math
+import platform
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from core.monitoring.snapshot import Snapshot
+from utils.metrics import REGISTRY, CACHE_REQUESTS, MONITOR_CYCLE_SECONDS
+from utils.tracing import span
+
+
+# Seconds between cycles; the standalone monitors use 5s and 3s, the process interval is
+# stretched to a multiple of the network one so every other network cycle shares its snapshot
+DEFAULT_INTERVALS = {'process': 6.0, 'network': 3.0}
+
+DAEMON_TICKS = REGISTRY.counter('jarvis_daemon_ticks_total', 'Scheduler ticks that ran at least one monitor')
+DAEMON_TICK_SECONDS = REGISTRY.histogram('jarvis_daemon_tick_seconds', 'Duration of one scheduler tick')
+
+
+class VerdictCache:
+    """Thread-safe LRU cache with a TTL for remote IP lookups and AI threat assessments"""
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 1024):
+        """
+        Initialize cache
+
+        Args:
+            ttl: Seconds an entry stays fresh (0 disables caching)
+            max_entries: Maximum cached entries
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        REGISTRY.gauge('jarvis_verdict_cache_entries', 'Entries in the shared monitor verdict cache').set_function(
+            lambda: len(self._entries))
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'VerdictCache':
+        """Build a cache from verdict_cache_ttl and verdict_cache_size config keys"""
+        return cls(ttl=float(config.get('verdict_cache_ttl', 600)),
+                   max_entries=int(config.get('verdict_cache_size', 1024)))
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Return the fresh cached value for key, or compute and cache it
+
+        Args:
+            key: Hashable cache key
+            compute: Called on a miss; None results are returned but not cached
+
+        Returns:
+            Cached or computed value
+        """
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    CACHE_REQUESTS.inc(cache='verdict', result='hit')
+                    return entry[1]
+                self.stats['misses'] += 1
+            CACHE_REQUESTS.inc(cache='verdict', result='miss')
+
+        value = compute()
+        if value is not None and self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+
+class MonitorDaemon:
+    """Tick-based scheduler driving several monitors from shared per-tick snapshots"""
+
+    def __init__(self, monitors: Dict[str, Any], intervals: Optional[Dict[str, float]] = None,
+                 tick: float = 1.0, model: str = 'gemini', status_every: float = 30.0):
+        """
+        Initialize daemon
+
+        Args:
+            monitors: Monitor name -> monitor with establish_baseline(snapshot), step(snapshot) and status_line()
+            intervals: Seconds between cycles per monitor, rounded to whole ticks (default: DEFAULT_INTERVALS)
+            tick: Scheduler resolution in seconds; monitors due in the same tick share one snapshot
+            model: AI model name shown in the banner
+            status_every: Seconds between status lines
+        """
+        self.monitors = monitors
+        self.tick = max(0.1, float(tick))
+        intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.every = {name: max(1, int(round(float(intervals.get(name, 5.0)) / self.tick))) for name in monitors}
+        self.model = model
+        self.status_every = status_every
+        self.running = False
+        self.ticks = 0
+        self.shared_ticks = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], monitors: Dict[str, Any], model: str = 'gemini') -> 'MonitorDaemon':
+        """Build a daemon from daemon_tick, monitor_intervals and daemon_status_every config keys"""
+        return cls(
+            monitors,
+            intervals=config.get('monitor_intervals'),
+            tick=float(config.get('daemon_tick', 1.0)),
+            model=model,
+            status_every=float(config.get('daemon_status_every', 30))
+        )
+
+    def due(self, tick_number: int, skipped: int = 0) -> List[str]:
+        """Monitors due in the given tick or the skipped ticks just before it, in registration order"""
+        return [name for name in self.monitors
+                if any((tick_number - offset) % self.every[name] == 0 for offset in range(skipped + 1))]
+
+    def establish_baselines(self) -> None:
+        """Baseline every monitor from one shared snapshot; drops monitors that lack permissions"""
+        snapshot = Snapshot()
+        for name, monitor in list(self.monitors.items()):
+            try:
+                count = monitor.establish_baseline(snapshot)
+                print(f"✅ {name}: baseline established ({count} entries)")
+            except (psutil.AccessDenied, PermissionError):
+                print(f"❌ {name}: access denied - this monitor requires elevated permissions (try sudo)")
+                del self.monitors[name]
+
+    def run_tick(self, tick_number: int, skipped: int = 0) -> List[str]:
+        """
+        Run the monitors due in a tick against one shared snapshot
+
+        Args:
+            tick_number: Scheduler tick counter
+            skipped: Ticks missed before this one (their monitors run now)
+
+        Returns:
+            Names of the monitors that ran
+        """
+        names = self.due(tick_number, skipped)
+        if not names:
+            return names
+        snapshot = Snapshot()
+        with span('daemon.tick', tick=tick_number, monitors=','.join(names)), DAEMON_TICK_SECONDS.time():
+            for name in names:
+                monitor = self.monitors[name]
+                with span(f'monitor.{name}.cycle', iteration=tick_number), MONITOR_CYCLE_SECONDS.time(monitor=name):
+                    try:
+                        monitor.step(snapshot)
+                    except (psutil.AccessDenied, PermissionError):
+                        print(f"\n❌ {name}: lost access to system tables. Monitor stopped.")
+                        del self.monitors[name]
+                    except Exception as e:
+                        print(f"\n⚠️  {name}: error during cycle: {e}")
+        DAEMON_TICKS.inc()
+        self.ticks += 1
+        if len(names) > 1:
+            self.shared_ticks += 1
+        return names
+
+    def print_status(self) -> None:
+        statuses = '; '.join(f"{name}: {monitor.status_line()}" for name, monitor in self.monitors.items())
+        print(f"[{time.strftime('%H:%M:%S')}] 📊 Status: Monitoring... ({statuses})")
+
+    def run(self) -> None:
+        """Run the monitors until Ctrl+C or until every monitor has stopped"""
+        if not PSUTIL_AVAILABLE:
+            print("❌ psutil module not found. Please install it: pip3 install psutil")
+            return
+
+        print("\n" + "=" * 80)
+        print("🛰️  MONITOR DAEMON - Shared scheduler for process and network monitoring")
+        print("=" * 80)
+        print(f"🤖 Using AI Model: {self.model.upper()}")
+        print(f"💻 System: {platform.system()}")
+        print(f"⏱️  Tick: {self.tick:g}s")
+        for name in self.monitors:
+            print(f"   • {name}: every {self.every[name] * self.tick:g}s")
+        print("🔔 Desktop notifications will be sent for threats")
+        print("🔍 Press Ctrl+C to stop monitoring")
+        print("=" * 80)
+        print()
+
+        self.running = True
+        start = time.monotonic()
+        try:
+            print("🔄 Establishing baselines...")
+            self.establish_baselines()
+            print("🔍 Now monitoring...\n")
+
+            tick_number = 0
+            next_status = start + self.status_every
+            while self.running and self.monitors:
+                tick_number += 1
+                # Sleep to the tick boundary so slow cycles don't drift the schedule
+                delay = start + tick_number * self.tick - time.monotonic()
+                skipped = 0
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fold ticks missed while a slow cycle (e.g. an AI call) ran into this one
+                    skipped = int(-delay // self.tick)
+                    tick_number += skipped
+                self.run_tick(tick_number, skipped)
+
+                if time.monotonic() >= next_status:
+                    next_status += self.status_every * max(1, math.ceil((time.monotonic() - next_status) / self.status_every))
+                    self.print_status()
+
+        except KeyboardInterrupt:
+            print("\n\n" + "=" * 80)
+            print("🛑 Monitor daemon stopped by user")
+            print("=" * 80)
+            print(f"📊 Monitoring Summary:")
+            for name, monitor in self.monitors.items():
+                print(f"   • {name}: {monitor.status_line()}")
+            print(f"   • Ticks run: {self.ticks} ({self.shared_ticks} shared a snapshot between monitors)")
+            print("=" * 80)
+            print()
+        except Exception as e:
+            print(f"\n❌ Error in monitor daemon: {e}")
+        finally:
+            self.running = False
+
+    def stop(self) -> None:
+        """Stop the scheduler after the current tick"""
+        self.running = False
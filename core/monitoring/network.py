@@ -5,7 +5,7 @@ Monitors outbound network connections and alerts on suspicious activity
 
 import time
 import platform
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, List, Set, Tuple
 
 try:
     import psutil
@@ -14,12 +14,21 @@ except ImportError:
     PSUTIL_AVAILABLE = False
 
 from utils.notifications import NotificationManager
+from utils.metrics import REGISTRY, MONITOR_CYCLE_SECONDS, MONITOR_ALERTS
+from utils.tracing import span
+from utils.sinks import AlertRouter, build_alert
+from core.monitoring.snapshot import Snapshot
+
+
+CONNECTIONS = REGISTRY.gauge('jarvis_monitor_connections', 'Established outbound connections seen in the last cycle')
+NEW_CONNECTIONS = REGISTRY.counter('jarvis_monitor_new_connections_total', 'Outbound connections not seen in the previous cycle')
 
 
 class NetworkMonitor:
     """Monitor network connections for suspicious outbound traffic"""
     
-    def __init__(self, model: str = 'gemini', ai_provider=None, notification_manager: Optional[NotificationManager] = None):
+    def __init__(self, model: str = 'gemini', ai_provider=None, notification_manager: Optional[NotificationManager] = None,
+                 alert_router: Optional[AlertRouter] = None, verdict_cache=None):
         """
         Initialize network monitor
         
@@ -27,11 +36,17 @@ class NetworkMonitor:
             model: AI model name for threat analysis
             ai_provider: AI provider instance for threat analysis
             notification_manager: Notification manager instance
+            alert_router: Fans alerts out to webhook/syslog/file sinks
+            verdict_cache: Cache of remote IP lookups and AI threat assessments (shared in daemon mode)
         """
         self.model = model
         self.ai_provider = ai_provider
         self.notification_manager = notification_manager or NotificationManager(debug=True)
+        self.alert_router = alert_router
+        self.verdict_cache = verdict_cache
         self.running = False
+        self.known_connections: Set[tuple] = set()
+        self.alert_count = 0
     
     def analyze_remote_ip(self, ip_address: str) -> Dict[str, Any]:
         """Analyze remote IP address to determine if it's suspicious"""
@@ -145,8 +160,16 @@ class NetworkMonitor:
             print(f"⚠️  Error analyzing threat: {e}")
             return None
     
-    def alert_network_activity(self, connection: Dict[str, Any], alert_num: int) -> None:
-        """Alert on new network activity and analyze if suspicious"""
+    def alert_network_activity(self, connection: Dict[str, Any], alert_num: int,
+                               pinfo: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Alert on new network activity and analyze if suspicious
+        
+        Args:
+            connection: Connection details from diff_connections()
+            alert_num: Running alert number
+            pinfo: Owning process info from this tick's process table (looked up with psutil when missing)
+        """
         print("\n" + "🚨" * 40)
         print(f"🔴 ALERT #{alert_num} - NEW OUTBOUND CONNECTION DETECTED")
         print("🚨" * 40)
@@ -159,7 +182,12 @@ class NetworkMonitor:
         process_cmdline = "Unknown"
         process_user = "Unknown"
         
-        if PSUTIL_AVAILABLE and connection['pid'] and connection['pid'] > 0:
+        if pinfo:
+            process_name = pinfo.get('name') or process_name
+            process_exe = pinfo.get('exe') or process_exe
+            process_cmdline = ' '.join(pinfo['cmdline']) if pinfo.get('cmdline') else "N/A"
+            process_user = pinfo.get('username') or process_user
+        elif PSUTIL_AVAILABLE and connection['pid'] and connection['pid'] > 0:
             try:
                 proc = psutil.Process(connection['pid'])
                 process_name = proc.name()
@@ -174,7 +202,7 @@ class NetworkMonitor:
         # Send system notification
         notification_title = f"Network Alert #{alert_num}"
         notification_message = f"{process_name} connected to {connection['remote_ip']}:{connection['remote_port']}"
-        self.notification_manager.send(notification_title, notification_message)
+        self.notification_manager.send(notification_title, notification_message, severity='INFO', group=process_name)
         
         # Display connection details
         print(f"📍 Connection Details:")
@@ -194,7 +222,11 @@ class NetworkMonitor:
         print()
         
         # Try to get geographic location of remote IP
-        remote_info = self.analyze_remote_ip(connection['remote_ip'])
+        if self.verdict_cache is not None:
+            remote_info = self.verdict_cache.get_or_compute(
+                ('remote_ip', connection['remote_ip']), lambda: self.analyze_remote_ip(connection['remote_ip']))
+        else:
+            remote_info = self.analyze_remote_ip(connection['remote_ip'])
         if remote_info:
             print(f"🔍 Remote IP Analysis:")
             print(f"   • IP Address: {remote_info['ip']}")
@@ -208,7 +240,13 @@ class NetworkMonitor:
         threat_level_str = "UNKNOWN"
         if self.ai_provider:
             print("🤖 AI Analysis: Analyzing connection for suspicious activity...")
-            threat_level = self.analyze_connection_threat(connection, process_name, process_exe, process_cmdline, remote_info)
+            if self.verdict_cache is not None:
+                # Same program talking to the same endpoint gets the same verdict
+                key = ('connection', process_exe, process_cmdline, connection['remote_ip'], connection['remote_port'])
+                threat_level = self.verdict_cache.get_or_compute(key, lambda: self.analyze_connection_threat(
+                    connection, process_name, process_exe, process_cmdline, remote_info))
+            else:
+                threat_level = self.analyze_connection_threat(connection, process_name, process_exe, process_cmdline, remote_info)
             
             if threat_level:
                 threat_level_str = threat_level.get('level', 'UNKNOWN').upper()
@@ -221,11 +259,110 @@ class NetworkMonitor:
                 if threat_level_str in ['HIGH', 'CRITICAL']:
                     enhanced_title = f"{threat_level_str} THREAT - Alert #{alert_num}"
                     enhanced_message = f"{process_name} to {connection['remote_ip']} | {threat_level.get('analysis', '')[:100]}"
-                    self.notification_manager.send(enhanced_title, enhanced_message)
+                    self.notification_manager.send(enhanced_title, enhanced_message, severity=threat_level_str,
+                                                   group=f"{process_name} {connection['remote_ip']}")
+        
+        MONITOR_ALERTS.inc(monitor='network', type='NEW_CONNECTION',
+                           severity=threat_level_str if threat_level_str != 'UNKNOWN' else 'INFO')
+        if self.alert_router:
+            self.alert_router.emit(build_alert(
+                'network',
+                threat_level_str if threat_level_str != 'UNKNOWN' else 'INFO',
+                notification_title,
+                notification_message,
+                {
+                    'alert_num': alert_num,
+                    'pid': connection['pid'],
+                    'process_name': process_name,
+                    'process_exe': process_exe,
+                    'process_user': process_user,
+                    'local_address': f"{connection['local_ip']}:{connection['local_port']}",
+                    'remote_address': f"{connection['remote_ip']}:{connection['remote_port']}",
+                    'remote_type': (remote_info or {}).get('type'),
+                    'remote_hostname': (remote_info or {}).get('hostname'),
+                    'threat_level': threat_level_str,
+                }
+            ))
         
         print("🚨" * 40)
         print()
     
+    def diff_connections(self, connections: List[Any], known_connections: Set[tuple]) -> Tuple[Set[tuple], List[Dict[str, Any]]]:
+        """
+        Compare a connection table against the previous poll
+        
+        Args:
+            connections: Entries from psutil.net_connections()
+            known_connections: Connection IDs seen in the previous poll
+        
+        Returns:
+            (IDs of current ESTABLISHED outbound connections, details of the ones not seen before)
+        """
+        current_connections = set()
+        new_connections = []
+        
+        for conn in connections:
+            try:
+                # Only monitor ESTABLISHED outbound connections
+                if conn.status == 'ESTABLISHED' and conn.raddr:
+                    conn_id = (conn.pid, conn.raddr.ip, conn.raddr.port, conn.laddr.port)
+                    current_connections.add(conn_id)
+                    
+                    # Check if this is a new connection
+                    if conn_id not in known_connections:
+                        new_connections.append({
+                            'pid': conn.pid,
+                            'local_ip': conn.laddr.ip,
+                            'local_port': conn.laddr.port,
+                            'remote_ip': conn.raddr.ip,
+                            'remote_port': conn.raddr.port,
+                            'status': conn.status
+                        })
+            except (AttributeError, TypeError):
+                continue
+        
+        return current_connections, new_connections
+    
+    def establish_baseline(self, snapshot: Snapshot) -> int:
+        """
+        Record the established connections in a snapshot as known
+        
+        Args:
+            snapshot: Tick snapshot whose connection table becomes the baseline
+        
+        Returns:
+            Number of connections in the baseline
+        """
+        self.known_connections, _ = self.diff_connections(snapshot.connections, set())
+        return len(self.known_connections)
+    
+    def step(self, snapshot: Snapshot) -> int:
+        """
+        Run one monitoring cycle against a tick snapshot and raise alerts
+        
+        Args:
+            snapshot: Tick snapshot (its connection table may be shared with other monitors)
+        
+        Returns:
+            Number of alerts raised in this cycle
+        """
+        current_connections, new_connections = self.diff_connections(snapshot.connections, self.known_connections)
+        CONNECTIONS.set(len(current_connections))
+        NEW_CONNECTIONS.inc(len(new_connections))
+        
+        # Process new connections
+        for new_conn in new_connections:
+            self.alert_count += 1
+            self.alert_network_activity(new_conn, self.alert_count, snapshot.process(new_conn['pid']))
+        
+        # Update known connections
+        self.known_connections = current_connections
+        return len(new_connections)
+    
+    def status_line(self) -> str:
+        """One-line monitoring status"""
+        return f"{len(self.known_connections)} active connections, {self.alert_count} alerts raised"
+    
     def monitor(self) -> None:
         """Monitor network connections and alert on suspicious outbound traffic"""
         if not PSUTIL_AVAILABLE:
@@ -245,15 +382,15 @@ class NetworkMonitor:
         print()
         
         # Track known connections to detect new ones
-        known_connections = set()
-        alert_count = 0
+        self.known_connections = set()
+        self.alert_count = 0
         self.running = True
         
         try:
             # Initial scan to establish baseline
             print("🔄 Establishing baseline connections...")
             try:
-                connections = psutil.net_connections(kind='inet')
+                count = self.establish_baseline(Snapshot())
             except psutil.AccessDenied:
                 print("\n❌ Access Denied: Network monitoring requires elevated permissions on macOS")
                 print("💡 Please run with sudo:")
@@ -262,16 +399,7 @@ class NetworkMonitor:
                 print("\n⚠️  Note: Use sudo with caution and only from trusted sources")
                 return
             
-            for conn in connections:
-                try:
-                    if conn.status == 'ESTABLISHED' and conn.raddr:
-                        # Track by (pid, remote_ip, remote_port, local_port)
-                        conn_id = (conn.pid, conn.raddr.ip, conn.raddr.port, conn.laddr.port)
-                        known_connections.add(conn_id)
-                except (AttributeError, TypeError):
-                    continue
-            
-            print(f"✅ Baseline established: {len(known_connections)} active connections")
+            print(f"✅ Baseline established: {count} active connections")
             print("🔍 Now monitoring for NEW outbound connections...\n")
             
             # Continuous monitoring loop
@@ -280,56 +408,24 @@ class NetworkMonitor:
                 iteration += 1
                 time.sleep(3)  # Check every 3 seconds
                 
-                # Get current connections
-                current_connections = set()
-                new_connections = []
-                
-                try:
-                    connections = psutil.net_connections(kind='inet')
-                except psutil.AccessDenied:
-                    print("\n❌ Lost access to network connections. Monitoring stopped.")
-                    break
-                
-                for conn in connections:
+                with span('monitor.network.cycle', iteration=iteration), MONITOR_CYCLE_SECONDS.time(monitor='network'):
                     try:
-                        # Only monitor ESTABLISHED outbound connections
-                        if conn.status == 'ESTABLISHED' and conn.raddr:
-                            conn_id = (conn.pid, conn.raddr.ip, conn.raddr.port, conn.laddr.port)
-                            current_connections.add(conn_id)
-                            
-                            # Check if this is a new connection
-                            if conn_id not in known_connections:
-                                new_connections.append({
-                                    'pid': conn.pid,
-                                    'local_ip': conn.laddr.ip,
-                                    'local_port': conn.laddr.port,
-                                    'remote_ip': conn.raddr.ip,
-                                    'remote_port': conn.raddr.port,
-                                    'status': conn.status
-                                })
-                    except (AttributeError, TypeError):
-                        continue
-                
-                # Process new connections
-                if new_connections:
-                    for new_conn in new_connections:
-                        alert_count += 1
-                        self.alert_network_activity(new_conn, alert_count)
-                
-                # Update known connections
-                known_connections = current_connections
-                
-                # Show status update every 10 iterations (30 seconds)
-                if iteration % 10 == 0:
-                    print(f"[{time.strftime('%H:%M:%S')}] 📊 Status: Monitoring... ({len(current_connections)} active connections, {alert_count} alerts raised)")
+                        self.step(Snapshot())
+                    except psutil.AccessDenied:
+                        print("\n❌ Lost access to network connections. Monitoring stopped.")
+                        break
+                    
+                    # Show status update every 10 iterations (30 seconds)
+                    if iteration % 10 == 0:
+                        print(f"[{time.strftime('%H:%M:%S')}] 📊 Status: Monitoring... ({self.status_line()})")
         
         except KeyboardInterrupt:
             print("\n\n" + "=" * 80)
             print("🛑 Network monitoring stopped by user")
             print("=" * 80)
             print(f"📊 Monitoring Summary:")
-            print(f"   • Total alerts raised: {alert_count}")
-            print(f"   • Active connections at stop: {len(known_connections)}")
+            print(f"   • Total alerts raised: {self.alert_count}")
+            print(f"   • Active connections at stop: {len(self.known_connections)}")
             print("=" * 80)
             print()
         except Exception as e:
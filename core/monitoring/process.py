@@ -5,7 +5,7 @@ Monitors processes for anomalies, threats, and suspicious behavior
 
 import time
 import platform
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 try:
     import psutil
@@ -14,12 +14,24 @@ except ImportError:
     PSUTIL_AVAILABLE = False
 
 from utils.notifications import NotificationManager
+from utils.metrics import REGISTRY, MONITOR_CYCLE_SECONDS, MONITOR_ALERTS
+from utils.tracing import span
+from utils.sinks import AlertRouter, build_alert
+from core.monitoring.snapshot import Snapshot
+
+
+PROCESSES = REGISTRY.gauge('jarvis_monitor_processes', 'Processes seen in the last cycle')
+NEW_PROCESSES = REGISTRY.counter('jarvis_monitor_new_processes_total', 'Processes not seen in an earlier cycle')
+
+# The baseline scan only needs identity and resource usage
+BASELINE_ATTRS = ['pid', 'name', 'username', 'cpu_percent', 'memory_percent']
 
 
 class ProcessMonitor:
     """Monitor processes for anomalies, threats, and suspicious behavior"""
     
-    def __init__(self, model: str = 'gemini', ai_provider=None, notification_manager: Optional[NotificationManager] = None):
+    def __init__(self, model: str = 'gemini', ai_provider=None, notification_manager: Optional[NotificationManager] = None,
+                 alert_router: Optional[AlertRouter] = None, verdict_cache=None):
         """
         Initialize process monitor
         
@@ -27,11 +39,18 @@ class ProcessMonitor:
             model: AI model name for threat analysis
             ai_provider: AI provider instance for threat analysis
             notification_manager: Notification manager instance
+            alert_router: Fans alerts out to webhook/syslog/file sinks
+            verdict_cache: Cache of AI threat assessments (shared between monitors in daemon mode)
         """
         self.model = model
         self.ai_provider = ai_provider
         self.notification_manager = notification_manager or NotificationManager(debug=True)
+        self.alert_router = alert_router
+        self.verdict_cache = verdict_cache
         self.running = False
+        self.known_processes: Dict[int, Dict[str, Any]] = {}
+        self.alert_count = 0
+        self.process_count = 0
         
         # CPU/Memory thresholds
         self.HIGH_CPU_THRESHOLD = 80.0  # 80% CPU usage
@@ -269,7 +288,13 @@ class ProcessMonitor:
         threat_assessment = None
         if self.ai_provider and activity['type'] == 'NEW_PROCESS':
             print("🤖 AI Analysis: Analyzing process for threats...")
-            threat_assessment = self.analyze_process_with_ai(pinfo, indicators)
+            if self.verdict_cache is not None:
+                # Same binary and command line with the same findings gets the same verdict
+                key = ('process', name, exe, cmdline_str, tuple(indicators.get('reasons', [])))
+                threat_assessment = self.verdict_cache.get_or_compute(
+                    key, lambda: self.analyze_process_with_ai(pinfo, indicators))
+            else:
+                threat_assessment = self.analyze_process_with_ai(pinfo, indicators)
             
             if threat_assessment:
                 print(f"⚠️  AI Threat Assessment: {threat_assessment.get('level', 'UNKNOWN').upper()}")
@@ -280,6 +305,8 @@ class ProcessMonitor:
         print("🚨" * 40)
         print()
         
+        MONITOR_ALERTS.inc(monitor='process', type=activity['type'], severity=activity['severity'])
+        
         # Send desktop notification
         notification_title = f"{activity['severity']} Process Alert #{alert_num}"
         if activity['type'] == 'NEW_PROCESS':
@@ -291,13 +318,172 @@ class ProcessMonitor:
         else:
             notification_message = f"{name} - {activity['type']}"
         
-        self.notification_manager.send(notification_title, notification_message)
+        self.notification_manager.send(notification_title, notification_message, severity=activity['severity'],
+                                       group=name)
         
         # Send enhanced notification for HIGH/CRITICAL threats
         if activity['severity'] in ['HIGH', 'CRITICAL']:
             enhanced_title = f"{activity['severity']} THREAT - {activity['type']}"
             enhanced_message = f"{name} (PID {pid}) | {username} | Check terminal for details"
-            self.notification_manager.send(enhanced_title, enhanced_message)
+            self.notification_manager.send(enhanced_title, enhanced_message, severity=activity['severity'],
+                                           group=f"{name} {pid}")
+        
+        if self.alert_router:
+            details = {
+                'alert_num': alert_num,
+                'activity_type': activity['type'],
+                'pid': pid,
+                'process_name': name,
+                'process_exe': exe,
+                'process_user': username,
+                'cmdline': cmdline_str[:500],
+                'cpu_percent': round(cpu_percent, 1),
+                'memory_percent': round(mem_percent, 1),
+                'reasons': '; '.join(indicators.get('reasons', [])),
+            }
+            if threat_assessment:
+                details['ai_threat_level'] = str(threat_assessment.get('level', 'UNKNOWN')).upper()
+                details['ai_analysis'] = threat_assessment.get('analysis', '')
+            self.alert_router.emit(build_alert('process', activity['severity'], notification_title,
+                                               notification_message, details))
+    
+    def establish_baseline(self, snapshot: Snapshot) -> int:
+        """
+        Record the processes in a snapshot as known
+        
+        Args:
+            snapshot: Tick snapshot whose process table becomes the baseline
+        
+        Returns:
+            Number of processes in the baseline
+        """
+        self.known_processes = {}
+        for pinfo in snapshot.processes:
+            try:
+                self.known_processes[pinfo['pid']] = {
+                    'name': pinfo['name'],
+                    'username': pinfo['username'],
+                    'cpu_baseline': pinfo['cpu_percent'] or 0,
+                    'mem_baseline': pinfo['memory_percent'] or 0,
+                    'first_seen': time.time()
+                }
+            except (KeyError, TypeError):
+                continue
+        return len(self.known_processes)
+    
+    def check_processes(self, processes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compare a process table against the known processes and update their baselines
+        
+        Args:
+            processes: Process info dicts (pid, name, username, exe, cmdline, cpu/memory percent, ...)
+        
+        Returns:
+            Suspicious activities found (new suspicious processes, CPU and memory spikes)
+        """
+        current_processes = {}
+        suspicious_activities = []
+        known_processes = self.known_processes
+        
+        for pinfo in processes:
+            try:
+                pid = pinfo['pid']
+                current_processes[pid] = True
+                
+                # Check if this is a new process
+                if pid not in known_processes:
+                    # Analyze new process
+                    NEW_PROCESSES.inc()
+                    threat_indicators = self.analyze_process_threat(pinfo)
+                    
+                    if threat_indicators['is_suspicious']:
+                        suspicious_activities.append({
+                            'type': 'NEW_PROCESS',
+                            'severity': threat_indicators['severity'],
+                            'process': pinfo,
+                            'indicators': threat_indicators
+                        })
+                    
+                    # Add to known processes
+                    known_processes[pid] = {
+                        'name': pinfo['name'],
+                        'username': pinfo['username'],
+                        'cpu_baseline': pinfo['cpu_percent'] or 0,
+                        'mem_baseline': pinfo['memory_percent'] or 0,
+                        'first_seen': time.time()
+                    }
+                else:
+                    # Check existing process for anomalies
+                    baseline = known_processes[pid]
+                    cpu_current = pinfo['cpu_percent'] or 0
+                    mem_current = pinfo['memory_percent'] or 0
+                    
+                    # Check for CPU spike
+                    if cpu_current > self.HIGH_CPU_THRESHOLD:
+                        cpu_increase = cpu_current - baseline['cpu_baseline']
+                        if cpu_increase > 50:  # 50% increase
+                            suspicious_activities.append({
+                                'type': 'HIGH_CPU',
+                                'severity': 'MEDIUM' if cpu_current < 95 else 'HIGH',
+                                'process': pinfo,
+                                'indicators': {
+                                    'cpu_current': cpu_current,
+                                    'cpu_baseline': baseline['cpu_baseline'],
+                                    'cpu_increase': cpu_increase
+                                }
+                            })
+                    
+                    # Check for Memory spike
+                    if mem_current > self.HIGH_MEMORY_THRESHOLD:
+                        mem_increase = mem_current - baseline['mem_baseline']
+                        if mem_increase > 30:  # 30% increase
+                            suspicious_activities.append({
+                                'type': 'HIGH_MEMORY',
+                                'severity': 'MEDIUM' if mem_current < 95 else 'HIGH',
+                                'process': pinfo,
+                                'indicators': {
+                                    'mem_current': mem_current,
+                                    'mem_baseline': baseline['mem_baseline'],
+                                    'mem_increase': mem_increase
+                                }
+                            })
+                    
+                    # Update baseline (rolling average)
+                    baseline['cpu_baseline'] = (baseline['cpu_baseline'] * 0.7 + cpu_current * 0.3)
+                    baseline['mem_baseline'] = (baseline['mem_baseline'] * 0.7 + mem_current * 0.3)
+                
+            except Exception:
+                continue
+        
+        self.process_count = len(current_processes)
+        PROCESSES.set(self.process_count)
+        
+        # Clean up terminated processes from tracking
+        terminated_pids = [pid for pid in known_processes if pid not in current_processes]
+        for pid in terminated_pids:
+            del known_processes[pid]
+        
+        return suspicious_activities
+    
+    def step(self, snapshot: Snapshot) -> int:
+        """
+        Run one monitoring cycle against a tick snapshot and raise alerts
+        
+        Args:
+            snapshot: Tick snapshot (its process table may be shared with other monitors)
+        
+        Returns:
+            Number of alerts raised in this cycle
+        """
+        suspicious_activities = self.check_processes(snapshot.processes)
+        for activity in suspicious_activities:
+            self.alert_count += 1
+            self.alert_process_activity(activity, self.alert_count)
+        return len(suspicious_activities)
+    
+    def status_line(self) -> str:
+        """One-line monitoring status"""
+        return f"{self.process_count} processes, {self.alert_count} alerts raised"
     
     def monitor(self) -> None:
         """Monitor processes for anomalies, threats, and suspicious behavior"""
@@ -323,27 +509,19 @@ class ProcessMonitor:
         print()
         
         # Track known processes and their baselines
-        known_processes = {}
-        alert_count = 0
+        self.known_processes = {}
+        self.alert_count = 0
         self.running = True
         
         try:
             # Initial scan to establish baseline
             print("🔄 Establishing process baseline...")
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent']):
-                try:
-                    pinfo = proc.info
-                    known_processes[pinfo['pid']] = {
-                        'name': pinfo['name'],
-                        'username': pinfo['username'],
-                        'cpu_baseline': pinfo['cpu_percent'] or 0,
-                        'mem_baseline': pinfo['memory_percent'] or 0,
-                        'first_seen': time.time()
-                    }
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            try:
+                count = self.establish_baseline(Snapshot(BASELINE_ATTRS))
+            except (psutil.AccessDenied, PermissionError):
+                count = 0
             
-            print(f"✅ Baseline established: {len(known_processes)} processes")
+            print(f"✅ Baseline established: {count} processes")
             print("🔍 Now monitoring for anomalies and threats...\n")
             
             # Continuous monitoring loop
@@ -352,115 +530,26 @@ class ProcessMonitor:
                 iteration += 1
                 time.sleep(5)  # Check every 5 seconds
                 
-                current_processes = {}
-                suspicious_activities = []
-                
-                try:
-                    processes = list(psutil.process_iter([
-                        'pid', 'name', 'username', 'exe', 'cmdline',
-                        'cpu_percent', 'memory_percent', 'status',
-                        'create_time', 'num_threads', 'open_files'
-                    ]))
-                except (psutil.AccessDenied, PermissionError):
-                    print("\n❌ Access Denied: Process monitoring requires elevated permissions")
-                    print("💡 Please run with sudo:")
-                    print("   sudo python3 jarvis.py -monitor process")
-                    break
-                
-                for proc in processes:
+                with span('monitor.process.cycle', iteration=iteration), MONITOR_CYCLE_SECONDS.time(monitor='process'):
                     try:
-                        pinfo = proc.info
-                        pid = pinfo['pid']
-                        current_processes[pid] = True
-                        
-                        # Check if this is a new process
-                        if pid not in known_processes:
-                            # Analyze new process
-                            threat_indicators = self.analyze_process_threat(pinfo)
-                            
-                            if threat_indicators['is_suspicious']:
-                                suspicious_activities.append({
-                                    'type': 'NEW_PROCESS',
-                                    'severity': threat_indicators['severity'],
-                                    'process': pinfo,
-                                    'indicators': threat_indicators
-                                })
-                            
-                            # Add to known processes
-                            known_processes[pid] = {
-                                'name': pinfo['name'],
-                                'username': pinfo['username'],
-                                'cpu_baseline': pinfo['cpu_percent'] or 0,
-                                'mem_baseline': pinfo['memory_percent'] or 0,
-                                'first_seen': time.time()
-                            }
-                        else:
-                            # Check existing process for anomalies
-                            baseline = known_processes[pid]
-                            cpu_current = pinfo['cpu_percent'] or 0
-                            mem_current = pinfo['memory_percent'] or 0
-                            
-                            # Check for CPU spike
-                            if cpu_current > self.HIGH_CPU_THRESHOLD:
-                                cpu_increase = cpu_current - baseline['cpu_baseline']
-                                if cpu_increase > 50:  # 50% increase
-                                    suspicious_activities.append({
-                                        'type': 'HIGH_CPU',
-                                        'severity': 'MEDIUM' if cpu_current < 95 else 'HIGH',
-                                        'process': pinfo,
-                                        'indicators': {
-                                            'cpu_current': cpu_current,
-                                            'cpu_baseline': baseline['cpu_baseline'],
-                                            'cpu_increase': cpu_increase
-                                        }
-                                    })
-                            
-                            # Check for Memory spike
-                            if mem_current > self.HIGH_MEMORY_THRESHOLD:
-                                mem_increase = mem_current - baseline['mem_baseline']
-                                if mem_increase > 30:  # 30% increase
-                                    suspicious_activities.append({
-                                        'type': 'HIGH_MEMORY',
-                                        'severity': 'MEDIUM' if mem_current < 95 else 'HIGH',
-                                        'process': pinfo,
-                                        'indicators': {
-                                            'mem_current': mem_current,
-                                            'mem_baseline': baseline['mem_baseline'],
-                                            'mem_increase': mem_increase
-                                        }
-                                    })
-                            
-                            # Update baseline (rolling average)
-                            baseline['cpu_baseline'] = (baseline['cpu_baseline'] * 0.7 + cpu_current * 0.3)
-                            baseline['mem_baseline'] = (baseline['mem_baseline'] * 0.7 + mem_current * 0.3)
-                        
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        continue
-                    except Exception:
-                        continue
-                
-                # Process suspicious activities
-                if suspicious_activities:
-                    for activity in suspicious_activities:
-                        alert_count += 1
-                        self.alert_process_activity(activity, alert_count)
-                
-                # Clean up terminated processes from tracking
-                terminated_pids = [pid for pid in known_processes if pid not in current_processes]
-                for pid in terminated_pids:
-                    del known_processes[pid]
-                
-                # Show status update every 6 iterations (30 seconds)
-                if iteration % 6 == 0:
-                    print(f"[{time.strftime('%H:%M:%S')}] 📊 Status: Monitoring... ({len(current_processes)} processes, {alert_count} alerts raised)")
+                        self.step(Snapshot())
+                    except (psutil.AccessDenied, PermissionError):
+                        print("\n❌ Access Denied: Process monitoring requires elevated permissions")
+                        print("💡 Please run with sudo:")
+                        print("   sudo python3 jarvis.py -monitor process")
+                        break
+                    
+                    # Show status update every 6 iterations (30 seconds)
+                    if iteration % 6 == 0:
+                        print(f"[{time.strftime('%H:%M:%S')}] 📊 Status: Monitoring... ({self.status_line()})")
         
         except KeyboardInterrupt:
             print("\n\n" + "=" * 80)
             print("🛑 Process monitoring stopped by user")
             print("=" * 80)
             print(f"📊 Monitoring Summary:")
-            print(f"   • Total alerts raised: {alert_count}")
-            print(f"   • Processes monitored: {len(known_processes)}")
+            print(f"   • Total alerts raised: {self.alert_count}")
+            print(f"   • Processes monitored: {len(self.known_processes)}")
             print("=" * 80)
             print()
         except Exception as e:
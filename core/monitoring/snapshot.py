@@ -0,0 +1,76 @@
+"""
+Per-tick system snapshots
+Process and connection tables are read from psutil at most once per tick, on first use,
+and shared by every monitor that runs in that tick
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, List
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from utils.metrics import REGISTRY
+
+
+# Fields collected for every process (what ProcessMonitor's threat checks and alerts use)
+PROCESS_ATTRS = ['pid', 'name', 'username', 'exe', 'cmdline', 'cpu_percent', 'memory_percent', 'status',
+                 'create_time', 'num_threads', 'open_files']
+
+SNAPSHOT_SECONDS = REGISTRY.histogram('jarvis_snapshot_seconds', 'Time spent reading psutil tables for a snapshot',
+                                      ('table',))
+
+
+class Snapshot:
+    """Lazily collected process and connection tables for one scheduler tick"""
+
+    def __init__(self, process_attrs: Optional[List[str]] = None):
+        """
+        Initialize snapshot
+
+        Args:
+            process_attrs: psutil fields to collect per process (default: PROCESS_ATTRS)
+        """
+        self.process_attrs = list(process_attrs or PROCESS_ATTRS)
+        self.taken_at = time.time()
+        self._processes: Optional[List[Dict[str, Any]]] = None
+        self._connections: Optional[List[Any]] = None
+        self._index: Optional[Dict[int, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def processes(self) -> List[Dict[str, Any]]:
+        """Process info dicts (psutil.AccessDenied/PermissionError propagate to the monitor)"""
+        with self._lock:
+            if self._processes is None:
+                with SNAPSHOT_SECONDS.time(table='processes'):
+                    self._processes = [proc.info for proc in psutil.process_iter(self.process_attrs)]
+            return self._processes
+
+    @property
+    def connections(self) -> List[Any]:
+        """psutil.net_connections(kind='inet') entries"""
+        with self._lock:
+            if self._connections is None:
+                with SNAPSHOT_SECONDS.time(table='connections'):
+                    self._connections = psutil.net_connections(kind='inet')
+            return self._connections
+
+    def process(self, pid: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Info for one process if the process table was already collected this tick (never triggers a scan)"""
+        with self._lock:
+            if self._processes is None or pid is None:
+                return None
+            if self._index is None:
+                self._index = {pinfo['pid']: pinfo for pinfo in self._processes}
+            return self._index.get(pid)
+
+    @property
+    def collected(self) -> List[str]:
+        """Tables read so far"""
+        return [name for name, table in (('processes', self._processes), ('connections', self._connections))
+                if table is not None]
@@ -1,6 +1,12 @@
 """Security scanning and threat detection"""
 
 from core.security.scanner import SecurityScanner
+from core.security.prefilter import SecretPrefilter
+from core.security.pipeline import ScanPipeline, TokenBucket
+from core.security.extractor import FileExtractor
+from core.security.checkpoint import ScanJournal
+from core.security.archive import ArchiveWalker
+from core.security.scope import ScanScope
+from core.security.report import ReportSink, JSONLSink, SARIFSink, CSVSink, create_sink
 
-__all__ = ['SecurityScanner']
-
+__all__ = ['SecurityScanner', 'SecretPrefilter', 'ScanPipeline', 'TokenBucket', 'FileExtractor', 'ScanJournal', 'ArchiveWalker', 'ScanScope', 'ReportSink', 'JSONLSink', 'SARIFSink', 'CSVSink', 'create_sink']
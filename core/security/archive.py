@@ -0,0 +1,182 @@
+"""
+Archive traversal for the security scanner
+Streams members of zip/jar/tar archives without extracting to disk, with zip-bomb limits
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, IO
+
+from core.security.extractor import sniff_binary
+
+
+ZIP_SUFFIXES = ('.zip', '.jar', '.war', '.ear', '.apk', '.whl', '.nupkg', '.xpi')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+COMPRESSED_SUFFIXES = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+READ_CHUNK = 64 * 1024
+
+
+class ArchiveLimitExceeded(Exception):
+    """Raised when an archive exceeds a traversal limit (likely a decompression bomb)"""
+
+
+def archive_kind(name: str) -> Optional[str]:
+    """Return 'zip', 'tar' or a single-file compression suffix for an archive name"""
+    lower = name.lower()
+    if lower.endswith(ZIP_SUFFIXES):
+        return 'zip'
+    if lower.endswith(TAR_SUFFIXES):
+        return 'tar'
+    for suffix in COMPRESSED_SUFFIXES:
+        if lower.endswith(suffix):
+            return suffix
+    return None
+
+
+class ArchiveWalker:
+    """Enumerate archive members as bounded text samples with virtual paths"""
+
+    def __init__(self, max_depth: int = 3, max_members: int = 1000,
+                 max_total_bytes: int = 256 * 1024 * 1024, max_ratio: int = 100,
+                 max_nested_bytes: int = 32 * 1024 * 1024, member_bytes: int = 10000):
+        """
+        Initialize walker
+
+        Args:
+            max_depth: Maximum nesting depth (archive inside archive)
+            max_members: Maximum members enumerated per top-level archive
+            max_total_bytes: Maximum decompressed bytes read per top-level archive
+            max_ratio: Maximum compression ratio accepted for a zip member
+            max_nested_bytes: Largest nested archive buffered in memory for recursion
+            member_bytes: Bytes of each member sampled for scanning
+        """
+        self.max_depth = max_depth
+        self.max_members = max_members
+        self.max_total_bytes = max_total_bytes
+        self.max_ratio = max_ratio
+        self.max_nested_bytes = max_nested_bytes
+        self.member_bytes = member_bytes
+
+    def walk(self, archive_path: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Yield members of an archive on disk
+
+        Each member is a dict with 'virtual_path', 'size' and either 'text'
+        (bounded sample), 'binary_kind' or 'error'. Stops with an 'error' member
+        when a limit is hit.
+        """
+        budget = {'members': 0, 'bytes': 0}
+        kind = archive_kind(archive_path.name)
+        try:
+            with open(archive_path, 'rb') as f:
+                yield from self._walk_stream(f, kind, str(archive_path), 1, budget)
+        except ArchiveLimitExceeded as e:
+            yield {'virtual_path': str(archive_path), 'size': 0, 'error': f"Archive limit exceeded: {e}"}
+        except (zipfile.BadZipFile, tarfile.TarError, OSError, EOFError, lzma.LZMAError) as e:
+            yield {'virtual_path': str(archive_path), 'size': 0, 'error': f"Unreadable archive: {e}"}
+
+    def _charge(self, budget: Dict[str, int], nbytes: int) -> None:
+        """Account decompressed bytes against the per-archive budget"""
+        budget['bytes'] += nbytes
+        if budget['bytes'] > self.max_total_bytes:
+            raise ArchiveLimitExceeded(f"more than {self.max_total_bytes} decompressed bytes")
+
+    def _count_member(self, budget: Dict[str, int]) -> None:
+        """Account one member against the per-archive budget"""
+        budget['members'] += 1
+        if budget['members'] > self.max_members:
+            raise ArchiveLimitExceeded(f"more than {self.max_members} members")
+
+    def _walk_stream(self, stream: IO[bytes], kind: Optional[str], prefix: str,
+                     depth: int, budget: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Dispatch on archive kind"""
+        if kind == 'zip':
+            yield from self._walk_zip(stream, prefix, depth, budget)
+        elif kind == 'tar':
+            yield from self._walk_tar(stream, prefix, depth, budget)
+        elif kind in COMPRESSED_SUFFIXES:
+            inner_name = prefix.rsplit('/', 1)[-1].rsplit('!', 1)[-1][:-len(kind)] or 'data'
+            with COMPRESSED_SUFFIXES[kind](stream, 'rb') as inner:
+                yield from self._member(inner, f"{prefix}!/{inner_name}", inner_name, None, depth, budget)
+
+    def _walk_zip(self, stream: IO[bytes], prefix: str, depth: int,
+                  budget: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Yield members of a zip/jar archive"""
+        with zipfile.ZipFile(stream) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                self._count_member(budget)
+                virtual_path = f"{prefix}!/{info.filename}"
+                if info.compress_size and info.file_size / info.compress_size > self.max_ratio:
+                    yield {'virtual_path': virtual_path, 'size': info.file_size,
+                           'error': f"Skipped: compression ratio above {self.max_ratio}:1"}
+                    continue
+                with zf.open(info) as member:
+                    yield from self._member(member, virtual_path, info.filename, info.file_size, depth, budget)
+
+    def _walk_tar(self, stream: IO[bytes], prefix: str, depth: int,
+                  budget: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Yield members of a (compressed) tar archive in a single streaming pass"""
+        with tarfile.open(fileobj=stream, mode='r|*') as tf:
+            for info in tf:
+                if not info.isfile():
+                    continue
+                self._count_member(budget)
+                virtual_path = f"{prefix}!/{info.name}"
+                member = tf.extractfile(info)
+                if member is None:
+                    continue
+                yield from self._member(member, virtual_path, info.name, info.size, depth, budget)
+                # The stream decompresses through the unread remainder to reach the next member
+                self._charge(budget, max(0, info.size - member.tell()))
+
+    def _member(self, member: IO[bytes], virtual_path: str, name: str, size: Optional[int],
+                depth: int, budget: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Sample one member, recursing into nested archives"""
+        nested_kind = archive_kind(name)
+        if nested_kind and depth < self.max_depth:
+            data = self._read(member, self.max_nested_bytes + 1, budget)
+            if len(data) > self.max_nested_bytes:
+                yield {'virtual_path': virtual_path, 'size': size or len(data),
+                       'error': f"Skipped nested archive larger than {self.max_nested_bytes} bytes"}
+                return
+            try:
+                yield from self._walk_stream(io.BytesIO(data), nested_kind, virtual_path, depth + 1, budget)
+            except (zipfile.BadZipFile, tarfile.TarError, EOFError, lzma.LZMAError, OSError) as e:
+                yield {'virtual_path': virtual_path, 'size': len(data), 'error': f"Unreadable archive: {e}"}
+            return
+
+        head = self._read(member, self.member_bytes, budget)
+        result = {'virtual_path': virtual_path, 'size': size if size is not None else len(head)}
+        binary = sniff_binary(head[:8192])
+        if nested_kind or binary:
+            result['binary_kind'] = binary or 'archive (max depth reached)'
+            yield result
+            return
+
+        text = head.decode('utf-8', errors='ignore')
+        truncated = len(head) >= self.member_bytes if size is None else size > len(head)
+        if truncated:
+            text += "\n\n[... content truncated ...]"
+        result['text'] = text
+        yield result
+
+    def _read(self, member: IO[bytes], limit: int, budget: Dict[str, int]) -> bytes:
+        """Read at most limit bytes, charging them to the decompression budget"""
+        chunks = []
+        remaining = limit
+        while remaining > 0:
+            chunk = member.read(min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            self._charge(budget, len(chunk))
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
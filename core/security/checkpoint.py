@@ -0,0 +1,131 @@
+"""
+Scan checkpoint journal
+Persists the file list and per-file verdicts so interrupted scans can resume
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from utils.config import get_config_path
+
+
+class ScanJournal:
+    """Append-only journal of scan progress for one folder"""
+
+    def __init__(self, folder_path: str, journal_dir: Optional[Path] = None,
+                 flush_every: int = 50, flush_interval: float = 5.0):
+        """
+        Initialize journal
+
+        Args:
+            folder_path: Folder being scanned (one journal per absolute path)
+            journal_dir: Directory for journal files (default: ~/.jarvis/scans)
+            flush_every: Write buffered records after this many results
+            flush_interval: Write buffered records at least this often (seconds)
+        """
+        self.folder_path = str(Path(folder_path).resolve())
+        self.journal_dir = Path(journal_dir) if journal_dir else get_config_path().parent / "scans"
+        scan_id = hashlib.sha1(self.folder_path.encode('utf-8')).hexdigest()[:16]
+        self.files_path = self.journal_dir / f"{scan_id}.files"
+        self.journal_path = self.journal_dir / f"{scan_id}.jsonl"
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._handle = None
+
+    def exists(self) -> bool:
+        """Check whether a resumable checkpoint exists"""
+        return self.files_path.exists() and self.journal_path.exists()
+
+    def start(self, files: List[Path]) -> None:
+        """Begin a fresh journal with the walked file list"""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+
+        # File list is written atomically so a crash never leaves a partial list
+        tmp_path = self.files_path.with_suffix('.files.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"folder": self.folder_path, "total": len(files)}) + "\n")
+            for file_path in files:
+                f.write(str(file_path) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.files_path)
+
+        self._handle = open(self.journal_path, 'w', encoding='utf-8')
+
+    def load(self) -> Tuple[List[Path], Dict[str, Dict[str, Any]]]:
+        """
+        Load a checkpoint for resuming
+
+        Returns:
+            (file list from the original walk, completed records keyed by path)
+        """
+        with open(self.files_path, 'r', encoding='utf-8') as f:
+            f.readline()  # header
+            files = [Path(line.rstrip('\n')) for line in f if line.strip()]
+
+        done: Dict[str, Dict[str, Any]] = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn write at crash time - everything before it is valid
+                if isinstance(record, dict) and 'path' in record:
+                    done[record['path']] = record
+
+        # Rewrite the valid prefix so new records never follow a torn line
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.journal_path.with_suffix('.jsonl.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in done.values():
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+        self._handle = open(self.journal_path, 'a', encoding='utf-8')
+        return files, done
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Buffer a completed file result, flushing periodically"""
+        self._buffer.append(json.dumps(record, default=str) + "\n")
+        if (len(self._buffer) >= self.flush_every or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records and fsync the journal"""
+        if not self._handle:
+            return
+        if self._buffer:
+            self._handle.write(''.join(self._buffer))
+            self._buffer = []
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush and close the journal, keeping it for a later resume"""
+        if self._handle:
+            self.flush()
+            self._handle.close()
+            self._handle = None
+
+    def discard(self) -> None:
+        """Remove the checkpoint after a completed scan"""
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+        self._buffer = []
+        for path in (self.files_path, self.journal_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,185 @@
+"""
+Bounded file content extraction
+Sniffs binary files and reads only a byte budget (head plus sampled middle/tail windows)
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+
+# Leading bytes of common binary formats
+MAGIC_NUMBERS = [
+    (b'\x7fELF', 'elf'),
+    (b'MZ', 'pe'),
+    (b'\xcf\xfa\xed\xfe', 'mach-o'),
+    (b'\xce\xfa\xed\xfe', 'mach-o'),
+    (b'\xca\xfe\xba\xbe', 'mach-o/class'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'RIFF', 'riff'),
+    (b'OggS', 'ogg'),
+    (b'ID3', 'mp3'),
+    (b'fLaC', 'flac'),
+    (b'%PDF', 'pdf'),
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bzip2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'7z\xbc\xaf\x27\x1c', '7z'),
+    (b'Rar!\x1a\x07', 'rar'),
+    (b'SQLite format 3\x00', 'sqlite'),
+    (b'\x00asm', 'wasm'),
+]
+
+
+def _is_pe(head: bytes) -> bool:
+    """MZ stub whose e_lfanew field (offset 0x3C) points at a PE signature"""
+    if len(head) < 0x40:
+        return False
+    offset = struct.unpack_from('<I', head, 0x3C)[0]
+    return head[offset:offset + 4] == b'PE\x00\x00'
+
+
+def _is_id3(head: bytes) -> bool:
+    """ID3v2 tag: major version 2-4 followed by a revision byte"""
+    return len(head) >= 5 and head[3] in (2, 3, 4) and head[4] != 0xff
+
+
+def _is_bzip2(head: bytes) -> bool:
+    """bzip2 stream: block size digit 1-9, then a block or end-of-stream magic when present"""
+    if len(head) < 4 or head[3] not in b'123456789':
+        return False
+    return len(head) < 10 or head[4:10] in (b'1AY&SY', b'\x17\x72\x45\x38\x50\x90')
+
+
+# Short ASCII magics that also start ordinary text; trust them only when the header checks out
+MAGIC_CHECKS = {
+    'pe': _is_pe,
+    'mp3': _is_id3,
+    'bzip2': _is_bzip2,
+}
+
+TEXT_BOMS = [
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+TRUNCATION_MARKER = "\n\n[... content truncated ...]"
+
+
+def sniff_binary(head: bytes) -> Optional[str]:
+    """Return the binary kind of a file from its first block, or None if it looks like text"""
+    for bom, _ in TEXT_BOMS:
+        if head.startswith(bom):
+            return None
+    for magic, kind in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            check = MAGIC_CHECKS.get(kind)
+            if check is None or check(head):
+                return kind
+    if b'\x00' in head:
+        return 'binary'
+    return None
+
+
+class FileExtractor:
+    """Read a bounded amount of text from files of any size"""
+
+    def __init__(self, max_bytes: int = 10000, sample_windows: bool = True, sniff_size: int = 8192):
+        """
+        Initialize extractor
+
+        Args:
+            max_bytes: Byte budget per file - never read or allocate more than this
+            sample_windows: Spend part of the budget on middle and tail windows of large files
+            sniff_size: Size of the first block used for binary detection
+        """
+        self.max_bytes = max(1, int(max_bytes))
+        self.sample_windows = sample_windows
+        self.sniff_size = min(sniff_size, self.max_bytes)
+
+    def _plan_windows(self, size: int) -> List[Tuple[int, int]]:
+        """Choose (offset, length) windows covering at most max_bytes of a file"""
+        if size <= self.max_bytes:
+            return [(0, size)]
+        if not self.sample_windows or self.max_bytes < 1024:
+            return [(0, self.max_bytes)]
+
+        head = self.max_bytes * 6 // 10
+        middle = self.max_bytes * 2 // 10
+        tail = self.max_bytes - head - middle
+        return [
+            (0, head),
+            ((size - middle) // 2, middle),
+            (size - tail, tail),
+        ]
+
+    def _read_windows(self, f, size: int, windows: List[Tuple[int, int]]) -> List[bytes]:
+        """Read windows through mmap, falling back to bounded seek/read"""
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return [mm[offset:offset + length] for offset, length in windows]
+        except (ValueError, OSError):
+            chunks = []
+            for offset, length in windows:
+                f.seek(offset)
+                chunks.append(f.read(length))
+            return chunks
+
+    def extract(self, file_path: Path) -> Dict[str, Any]:
+        """
+        Extract text from a file within the byte budget
+
+        Returns:
+            Dict with 'text' (None for binary/unreadable files), 'binary_kind',
+            'size' and 'truncated'
+        """
+        result = {'text': None, 'binary_kind': None, 'size': 0, 'truncated': False}
+        try:
+            with open(file_path, 'rb') as f:
+                size = file_path.stat().st_size
+                result['size'] = size
+
+                head = f.read(self.sniff_size)
+                kind = sniff_binary(head)
+                if kind:
+                    result['binary_kind'] = kind
+                    return result
+
+                encoding = 'utf-8'
+                for bom, bom_encoding in TEXT_BOMS:
+                    if head.startswith(bom):
+                        encoding = bom_encoding
+                        break
+
+                if size == 0:
+                    # Pseudo-files (e.g. /proc) report size 0 - read a bounded prefix
+                    chunks = [head + f.read(self.max_bytes - len(head))]
+                    truncated = bool(f.read(1))
+                elif size <= len(head):
+                    chunks = [head]
+                    truncated = False
+                else:
+                    windows = self._plan_windows(size)
+                    chunks = self._read_windows(f, size, windows)
+                    truncated = size > self.max_bytes
+
+            texts = [chunk.decode(encoding, errors='ignore') for chunk in chunks]
+            text = texts[0]
+            if len(texts) == 3:
+                text += "\n\n[... middle of file sampled ...]\n\n" + texts[1]
+                text += "\n\n[... end of file sampled ...]\n\n" + texts[2]
+            if truncated:
+                text += TRUNCATION_MARKER
+
+            result['text'] = text
+            result['truncated'] = truncated
+            return result
+        except Exception:
+            return result
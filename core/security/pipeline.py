@@ -0,0 +1,209 @@
+"""
+Concurrent scan pipeline
+Reader, classifier and reporter stages connected by bounded queues
+"""
+
+import queue
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Iterable
+
+from core.ai.resilience import RETRYABLE_STATUS_CODES
+
+
+_WORKER_DONE = object()
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate_per_minute: float, capacity: int = 1):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate_per_minute: Sustained number of acquisitions allowed per minute
+            capacity: Burst size
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """Block until a token is available. Returns False if stopped while waiting."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class ScanPipeline:
+    """Run prepare -> classify -> report with a pool of classifier workers"""
+
+    def __init__(self, prepare: Callable[[int, Any], Dict[str, Any]],
+                 classify: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                 report: Callable[[Dict[str, Any]], None],
+                 concurrency: int = 4, rate_limit: Optional[float] = None,
+                 max_retries: int = 3, ordered: bool = True,
+                 retry_status: Optional[Callable[[], Optional[int]]] = None):
+        """
+        Initialize the pipeline
+
+        Args:
+            prepare: Reader stage, turns (index, path) into a work item or a list of
+                     items (e.g. archive members). Items with 'needs_ai' set are sent
+                     to the classifier stage.
+            classify: Classifier stage, returns a categorization or None on failure
+            report: Reporter stage, called once per item on the calling thread
+            concurrency: Number of classifier workers
+            rate_limit: Maximum classifier calls per minute (None for unlimited)
+            max_retries: Retries for a failed call with a retryable status
+            ordered: Report items in input order (False reports as they finish)
+            retry_status: Returns the HTTP status of the last failed call on this thread
+        """
+        self.prepare = prepare
+        self.classify = classify
+        self.report = report
+        self.concurrency = max(1, int(concurrency))
+        self.bucket = TokenBucket(rate_limit, capacity=self.concurrency) if rate_limit else None
+        self.max_retries = max(0, int(max_retries))
+        self.ordered = ordered
+        self.retry_status = retry_status
+        self.stop_event = threading.Event()
+        self.error = None
+
+        self.work_queue = queue.Queue(maxsize=self.concurrency * 4)
+        self.result_queue = queue.Queue()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """Put onto a bounded queue, giving up if the pipeline is stopping"""
+        while not self.stop_event.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader(self, items: Iterable) -> None:
+        """Reader stage - prepare each item and route it"""
+        try:
+            index = 0
+            for path_index, path in enumerate(items):
+                if self.stop_event.is_set():
+                    break
+                prepared = self.prepare(path_index, path)
+                for item in prepared if isinstance(prepared, list) else [prepared]:
+                    item['index'] = index
+                    index += 1
+                    if item.get('needs_ai'):
+                        if not self._put(self.work_queue, item):
+                            return
+                    else:
+                        self.result_queue.put(item)
+        except Exception as e:
+            self.error = e
+            self.stop_event.set()
+        finally:
+            for _ in range(self.concurrency):
+                self._put(self.work_queue, None)
+
+    def _classify_with_retry(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Call the classifier, retrying with jittered backoff on 429/5xx"""
+        for attempt in range(self.max_retries + 1):
+            if self.bucket and not self.bucket.acquire(self.stop_event):
+                return None
+
+            result = self.classify(item)
+            if result is not None:
+                return result
+
+            status = self.retry_status() if self.retry_status else None
+            if status not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return None
+
+            delay = min(30.0, 2 ** attempt)
+            if self.stop_event.wait(delay / 2 + random.uniform(0, delay / 2)):
+                return None
+        return None
+
+    def _worker(self) -> None:
+        """Classifier stage - one of `concurrency` workers"""
+        try:
+            while True:
+                try:
+                    item = self.work_queue.get(timeout=0.2)
+                except queue.Empty:
+                    if self.stop_event.is_set():
+                        break
+                    continue
+                if item is None or self.stop_event.is_set():
+                    break
+                try:
+                    item['categorization'] = self._classify_with_retry(item)
+                except Exception as e:
+                    item['categorization'] = None
+                    item['error'] = str(e)
+                self.result_queue.put(item)
+        finally:
+            self.result_queue.put(_WORKER_DONE)
+
+    def run(self, items: Iterable) -> int:
+        """Run the pipeline to completion on the calling thread. Returns items reported."""
+        reader = threading.Thread(target=self._reader, args=(items,), daemon=True)
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.concurrency)]
+        reader.start()
+        for worker in workers:
+            worker.start()
+
+        reported = 0
+        pending = {}
+        next_index = 0
+        workers_done = 0
+        try:
+            while workers_done < self.concurrency:
+                item = self.result_queue.get()
+                if item is _WORKER_DONE:
+                    workers_done += 1
+                    continue
+
+                if not self.ordered:
+                    self.report(item)
+                    reported += 1
+                    continue
+
+                pending[item['index']] = item
+                while next_index in pending:
+                    self.report(pending.pop(next_index))
+                    next_index += 1
+                    reported += 1
+
+            # Items after a gap left by a stopped pipeline
+            for index in sorted(pending):
+                self.report(pending[index])
+                reported += 1
+        except BaseException:
+            self.stop_event.set()
+            raise
+
+        if self.error:
+            raise self.error
+        return reported
+
+    def stop(self) -> None:
+        """Ask all stages to stop"""
+        self.stop_event.set()
@@ -0,0 +1,159 @@
+"""
+Local secret pre-filter
+Detects obvious secrets with compiled patterns and entropy scoring before any AI call
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+
+# (name, pattern, weight) - weight >= STRONG_SIGNAL flags a file on its own; lighter patterns (however
+# many hits) only make a file 'uncertain', since keys like TOKEN_URL or password_hash_algorithm match too
+SECRET_PATTERNS = [
+    ('private_key', r'-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----', 10),
+    ('aws_access_key', r'\b(?:AKIA|ASIA)[0-9A-Z]{16}\b', 10),
+    ('aws_secret_key', r'(?i:aws_secret_access_key)\s*[=:]\s*[\'"]?[A-Za-z0-9/+=]{40}', 10),
+    ('jwt', r'\beyJ[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}', 8),
+    ('connection_string', r'\b(?:postgres(?:ql)?|mysql|mongodb(?:\+srv)?|redis|amqps?|mssql|sqlserver)://[^\s:/@]+:[^\s@/]+@[^\s/]+', 8),
+    ('env_assignment', r'(?m:^[ \t]*(?:export[ \t]+)?[A-Za-z0-9_]*(?i:secret|passw(?:or)?d|token|api_?key|access_?key|private_?key|credentials?)[A-Za-z0-9_]*[ \t]*[=:][ \t]*[\'"]?(?P<env_value>[^\s\'"#]{6,}))', 4),
+]
+
+# Candidate tokens for entropy scoring (matched last so specific patterns win). Entropy alone is
+# never enough to flag a file - hashes and integrity digests look random too - so token weight only
+# ever makes a file 'uncertain' and sends it to the AI
+TOKEN_PATTERN = ('high_entropy_token', r'(?P<token>[A-Za-z0-9+_\-]{20,}={0,2})', 3)
+
+PLACEHOLDER_VALUES = {
+    'changeme', 'password', 'secret', 'example', 'none', 'null', 'true', 'false',
+    'your_token', 'your_api_key', 'redacted', 'placeholder', 'undefined',
+}
+
+STRONG_SIGNAL = 8
+
+
+def shannon_entropy(token: str) -> float:
+    """Return the Shannon entropy of a string in bits per character"""
+    if not token:
+        return 0.0
+    length = len(token)
+    return -sum((count / length) * math.log2(count / length) for count in Counter(token).values())
+
+
+class SecretPrefilter:
+    """Score file content locally so only ambiguous files reach the AI classifier"""
+
+    def __init__(self, entropy_threshold: float = 4.2, sample_rate: float = 0.02,
+                 strong_signal: int = STRONG_SIGNAL):
+        """
+        Initialize the pre-filter
+
+        Args:
+            entropy_threshold: Minimum bits/char for a token to count as a likely secret
+            sample_rate: Fraction (0-1) of no-signal files still sent to AI for spot checks
+            strong_signal: Pattern weight at which one match flags a file without a model call
+        """
+        self.entropy_threshold = entropy_threshold
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.strong_signal = strong_signal
+
+        # One alternation so every file is scanned in a single pass
+        alternatives = [f'(?P<{name}>{pattern})' for name, pattern, _ in SECRET_PATTERNS]
+        alternatives.append(TOKEN_PATTERN[1])
+        self._regex = re.compile('|'.join(alternatives))
+        self._weights = {name: weight for name, _, weight in SECRET_PATTERNS}
+        self._weights['token'] = TOKEN_PATTERN[2]
+        # Values of KEY=value assignments are checked again for high-confidence formats (AKIA..., eyJ...)
+        self._strong_regex = re.compile('|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern, weight in SECRET_PATTERNS
+            if weight >= strong_signal and name != 'env_assignment'))
+
+    def _is_placeholder(self, value: str) -> bool:
+        """Check whether an assigned value is an obvious placeholder"""
+        value_lower = value.lower().strip('\'"')
+        if value_lower in PLACEHOLDER_VALUES:
+            return True
+        if value_lower.startswith(('$', '<', '{', '%')) or value_lower.endswith('>'):
+            return True
+        return len(set(value_lower)) <= 2  # xxxxxx, ******, 000000
+
+    def _is_random_token(self, token: str) -> bool:
+        """Check whether a token looks like a random secret rather than an identifier"""
+        if not any(c.isdigit() for c in token) or not any(c.isalpha() for c in token):
+            return False
+        return shannon_entropy(token) >= self.entropy_threshold
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Scan text once and return a verdict
+
+        Returns:
+            Dict with 'verdict' ('sensitive', 'clean' or 'uncertain'), 'score' and 'findings'
+        """
+        findings: List[Dict[str, Any]] = []
+        score = 0
+        weak_score = 0
+
+        for match in self._regex.finditer(text):
+            kind = match.lastgroup
+
+            if kind == 'token':
+                token = match.group('token')
+                if not self._is_random_token(token):
+                    continue
+                kind = TOKEN_PATTERN[0]
+                weight = self._weights['token']
+            elif kind == 'env_assignment':
+                value = match.group('env_value')
+                if self._is_placeholder(value):
+                    continue
+                strong = self._strong_regex.search(value)
+                if strong:
+                    kind = strong.lastgroup
+                weight = self._weights[kind]
+            else:
+                weight = self._weights.get(kind, 0)
+
+            if weight >= self.strong_signal:
+                score += weight
+            else:
+                weak_score += weight
+            if len(findings) < 20:
+                line = text.count('\n', 0, match.start()) + 1
+                findings.append({'type': kind, 'line': line})
+
+        # Only high-confidence patterns reach a local 'sensitive' verdict; the rest goes to the AI
+        if score:
+            verdict = 'sensitive'
+        elif weak_score == 0:
+            verdict = 'clean'
+        else:
+            verdict = 'uncertain'
+
+        score += min(weak_score, self.strong_signal - 1)
+        return {'verdict': verdict, 'score': score, 'findings': findings}
+
+    def should_sample(self, key: str) -> bool:
+        """Deterministically pick a fraction of clean files for AI spot checks"""
+        if self.sample_rate <= 0:
+            return False
+        bucket = zlib.crc32(key.encode('utf-8', errors='ignore')) % 10000
+        return bucket < self.sample_rate * 10000
+
+    @staticmethod
+    def to_categorization(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build a scanner categorization dict from a 'sensitive' verdict"""
+        if result.get('verdict') != 'sensitive':
+            return None
+
+        kinds = sorted({f['type'] for f in result.get('findings', [])})
+        lines = sorted({f['line'] for f in result.get('findings', [])})[:5]
+        return {
+            "is_sensitive": True,
+            "reason": f"Local pre-filter matched {', '.join(kinds)} (lines {', '.join(map(str, lines))})",
+            "sensitivity_level": "high",
+            "recommended_protection": "Rotate the exposed credentials, remove them from the file and use a secrets manager",
+            "source": "prefilter"
+        }
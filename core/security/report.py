@@ -0,0 +1,186 @@
+"""
+Streaming scan report sinks
+Write JSON Lines, SARIF or CSV results as files are classified, in constant memory
+"""
+
+import csv
+import json
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, IO
+
+
+REPORT_FORMATS = ('jsonl', 'sarif', 'csv')
+
+CSV_FIELDS = [
+    'type', 'path', 'status', 'is_sensitive', 'sensitivity_level', 'source',
+    'size', 'reason', 'recommended_protection', 'timestamp'
+]
+
+SARIF_LEVELS = {'high': 'error', 'medium': 'warning', 'low': 'note'}
+
+
+def build_result_record(path: str, status: str, metadata: Optional[Dict[str, Any]],
+                        categorization: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Flatten one scanned file into a report record"""
+    categorization = categorization or {}
+    return {
+        'type': 'result',
+        'path': path,
+        'status': status,
+        'is_sensitive': bool(categorization.get('is_sensitive', False)),
+        'sensitivity_level': categorization.get('sensitivity_level', 'none' if status != 'error' else 'unknown'),
+        'source': categorization.get('source', 'ai' if categorization else 'none'),
+        'size': (metadata or {}).get('size'),
+        'reason': categorization.get('reason', ''),
+        'recommended_protection': categorization.get('recommended_protection', ''),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+class ReportSink(ABC):
+    """Base class for streaming report sinks"""
+
+    def __init__(self, path: str = '-'):
+        """
+        Initialize sink
+
+        Args:
+            path: Output file path, or '-' for stdout
+        """
+        self.path = path
+        self.stream: Optional[IO[str]] = None
+        self._owns_stream = False
+
+    @property
+    def to_stdout(self) -> bool:
+        """True when the report is written to stdout"""
+        return self.path == '-'
+
+    def open(self, scan_info: Dict[str, Any]) -> None:
+        """Open the output and write any header"""
+        if self.to_stdout:
+            self.stream = sys.stdout
+        else:
+            self.stream = open(self.path, 'w', encoding='utf-8', newline='')
+            self._owns_stream = True
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]) -> None:
+        """Write one result record"""
+        pass
+
+    def close(self, summary: Dict[str, Any]) -> None:
+        """Write the summary record and close the output"""
+        if self.stream:
+            self.stream.flush()
+            if self._owns_stream:
+                self.stream.close()
+            self.stream = None
+
+
+class JSONLSink(ReportSink):
+    """One JSON object per line, followed by a summary object"""
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def close(self, summary: Dict[str, Any]) -> None:
+        if self.stream:
+            self.stream.write(json.dumps(summary) + "\n")
+        super().close(summary)
+
+
+class CSVSink(ReportSink):
+    """CSV rows with a trailing summary row"""
+
+    def open(self, scan_info: Dict[str, Any]) -> None:
+        super().open(scan_info)
+        self._writer = csv.DictWriter(self.stream, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._writer.writerow(record)
+        self.stream.flush()
+
+    def close(self, summary: Dict[str, Any]) -> None:
+        if self.stream:
+            self._writer.writerow({
+                'type': 'summary',
+                'path': summary.get('folder', ''),
+                'status': summary.get('status', ''),
+                'reason': (f"{summary.get('files_analyzed', 0)} files analyzed, "
+                           f"{summary.get('sensitive_files', 0)} sensitive"),
+                'timestamp': summary.get('finished_at', ''),
+            })
+        super().close(summary)
+
+
+class SARIFSink(ReportSink):
+    """SARIF 2.1.0 log streamed result-by-result (only sensitive files become results)"""
+
+    def open(self, scan_info: Dict[str, Any]) -> None:
+        super().open(scan_info)
+        self._count = 0
+        header = {
+            "version": "2.1.0",
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        }
+        tool = {
+            "driver": {
+                "name": "Jarvis Security Scanner",
+                "informationUri": "https://github.com/dronaprod/jarvis",
+                "rules": [{
+                    "id": "sensitive-file",
+                    "shortDescription": {"text": "File contains sensitive information"}
+                }]
+            }
+        }
+        # Stream the document: header, open results array, results as they arrive
+        self.stream.write(json.dumps(header)[:-1] + ', "runs": [{"tool": ' + json.dumps(tool) + ', "results": [\n')
+        self.stream.flush()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if not record.get('is_sensitive'):
+            return
+        path = record['path']
+        if '!/' in path:
+            # Archive member - point at the member inside the archive
+            archive, member = path.split('!/', 1)
+            location = {"physicalLocation": {"artifactLocation": {"uri": archive}},
+                        "logicalLocations": [{"fullyQualifiedName": member, "kind": "member"}]}
+        else:
+            location = {"physicalLocation": {"artifactLocation": {"uri": path}}}
+        result = {
+            "ruleId": "sensitive-file",
+            "level": SARIF_LEVELS.get(str(record.get('sensitivity_level', '')).lower(), 'warning'),
+            "message": {"text": record.get('reason') or 'Sensitive content detected'},
+            "locations": [location],
+            "properties": {
+                "sensitivityLevel": record.get('sensitivity_level'),
+                "source": record.get('source'),
+                "recommendedProtection": record.get('recommended_protection'),
+            }
+        }
+        self.stream.write((",\n" if self._count else "") + json.dumps(result))
+        self.stream.flush()
+        self._count += 1
+
+    def close(self, summary: Dict[str, Any]) -> None:
+        if self.stream:
+            invocation = {
+                "executionSuccessful": summary.get('status') == 'complete',
+                "properties": summary
+            }
+            self.stream.write('\n], "invocations": [' + json.dumps(invocation) + ']}]}\n')
+        super().close(summary)
+
+
+def create_sink(report_format: str, path: str = '-') -> ReportSink:
+    """Create a report sink for a format name"""
+    sinks = {'jsonl': JSONLSink, 'sarif': SARIFSink, 'csv': CSVSink}
+    if report_format not in sinks:
+        raise ValueError(f"Unknown report format: {report_format} (choose from {', '.join(REPORT_FORMATS)})")
+    return sinks[report_format](path)
@@ -4,59 +4,99 @@ Scans folders for sensitive files and categorizes them using AI
 """
 
 import os
+import sys
 import json
 import re
+import time
+import contextlib
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+from core.security.archive import ArchiveWalker, archive_kind
+from core.security.checkpoint import ScanJournal
+from core.security.extractor import FileExtractor
+from core.security.pipeline import ScanPipeline
+from core.security.prefilter import SecretPrefilter
+from core.security.report import ReportSink, build_result_record, create_sink
+from core.security.scope import ScanScope
+from utils.config import load_config
+from utils.tracing import span, traced
+
 
 class SecurityScanner:
     """Scan folders for sensitive files and categorize them"""
     
-    def __init__(self, ai_provider=None):
+    def __init__(self, ai_provider=None, prefilter: Optional[SecretPrefilter] = None,
+                 concurrency: Optional[int] = None, rate_limit: Optional[float] = None,
+                 ordered: Optional[bool] = None, report_sinks: Optional[List[ReportSink]] = None):
         """
         Initialize security scanner
         
         Args:
             ai_provider: AI provider instance (must be Drona for scanning)
+            prefilter: Local secret pre-filter (built from config when omitted)
+            concurrency: Parallel AI classification workers (config: scan_concurrency)
+            rate_limit: Max AI calls per minute, 0 for unlimited (config: scan_rate_limit)
+            ordered: Print progress in file order (config: scan_ordered_output)
+            report_sinks: Streaming machine-readable reports (config: scan_reports)
         """
+        config = load_config()
         self.ai_provider = ai_provider
+        self.prefilter = prefilter if prefilter is not None else self._build_prefilter(config)
+        self.concurrency = int(concurrency or config.get('scan_concurrency', 4))
+        rate_limit = rate_limit if rate_limit is not None else config.get('scan_rate_limit', 60)
+        self.rate_limit = float(rate_limit) if rate_limit else None
+        self.max_retries = int(config.get('scan_max_retries', 3))
+        self.ordered = ordered if ordered is not None else bool(config.get('scan_ordered_output', True))
+        self.checkpoint = bool(config.get('scan_checkpoint', True))
+        self.checkpoint_every = int(config.get('scan_checkpoint_every', 50))
+        self.extractor = FileExtractor(
+            max_bytes=int(config.get('scan_max_bytes', 10000)),
+            sample_windows=bool(config.get('scan_sample_windows', True))
+        )
+        self.scope = ScanScope.from_config(config)
+        if report_sinks is None:
+            report_sinks = [create_sink(r.get('format', 'jsonl'), r.get('path', '-'))
+                            for r in config.get('scan_reports', [])]
+        self.report_sinks = report_sinks
+        self.archive_walker = None
+        if config.get('scan_archives', True):
+            self.archive_walker = ArchiveWalker(
+                max_depth=int(config.get('scan_archive_max_depth', 3)),
+                max_members=int(config.get('scan_archive_max_members', 1000)),
+                max_total_bytes=int(config.get('scan_archive_max_bytes', 256 * 1024 * 1024)),
+                max_ratio=int(config.get('scan_archive_max_ratio', 100)),
+                member_bytes=self.extractor.max_bytes
+            )
     
-    def extract_file_content(self, file_path: Path, max_chars: int = 10000) -> Optional[str]:
-        """Extract file content with proper markdown structure, limited to max_chars"""
-        try:
-            if not file_path.exists() or not file_path.is_file():
-                return None
-            
-            # Get file metadata
-            file_size = file_path.stat().st_size
-            file_ext = file_path.suffix.lower()
-            
-            # Read file content
-            try:
-                # Try to read as text
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-            except:
-                # If text reading fails, try binary and decode
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                    try:
-                        content = content.decode('utf-8', errors='ignore')
-                    except:
-                        return None  # Binary file that can't be decoded
-            
-            # Truncate to max_chars if needed
-            if len(content) > max_chars:
-                content = content[:max_chars] + "\n\n[... content truncated ...]"
-            
-            # Create markdown structure
-            markdown_content = f"""# File: {file_path.name}
+    @staticmethod
+    def _build_prefilter(config: Dict[str, Any]) -> Optional[SecretPrefilter]:
+        """Create the local pre-filter from config (scan_prefilter, scan_prefilter_*)"""
+        if not config.get('scan_prefilter', True):
+            return None
+        return SecretPrefilter(
+            entropy_threshold=float(config.get('scan_prefilter_entropy', 4.2)),
+            sample_rate=float(config.get('scan_prefilter_sample_rate', 0.02))
+        )
+    
+    def read_file_text(self, file_path: Path, max_chars: Optional[int] = None) -> Optional[str]:
+        """Read file content as text within the byte budget (None for binary/unreadable files)"""
+        if not file_path.exists() or not file_path.is_file():
+            return None
+        
+        extractor = self.extractor
+        if max_chars is not None and max_chars != extractor.max_bytes:
+            extractor = FileExtractor(max_bytes=max_chars, sample_windows=extractor.sample_windows)
+        return extractor.extract(file_path)['text']
+    
+    def format_file_markdown(self, file_path: Path, content: str, file_size: int) -> str:
+        """Wrap file content in the markdown structure sent to the classifier"""
+        return f"""# File: {file_path.name}
 
 ## Metadata
 - **Path**: `{file_path}`
 - **Size**: {file_size} bytes
-- **Extension**: `{file_ext}`
+- **Extension**: `{file_path.suffix.lower()}`
 - **Content Length**: {len(content)} characters
 
 ## Content
@@ -64,7 +104,14 @@ class SecurityScanner:
 {content}
 ```
 """
-            return markdown_content
+    
+    def extract_file_content(self, file_path: Path, max_chars: Optional[int] = None) -> Optional[str]:
+        """Extract file content with proper markdown structure, limited to max_chars"""
+        try:
+            content = self.read_file_text(file_path, max_chars=max_chars)
+            if content is None:
+                return None
+            return self.format_file_markdown(file_path, content, file_path.stat().st_size)
         except Exception:
             return None
     
@@ -134,8 +181,123 @@ class SecurityScanner:
             print(f"⚠️  Error categorizing file {file_path}: {e}")
             return None
     
-    def scan_folder(self, folder_path: str, model: str = 'drona') -> None:
-        """Scan folder for sensitive files and categorize them"""
+    @staticmethod
+    def _file_metadata(path: str, name: str, size: int) -> Dict[str, Any]:
+        """Build the metadata dict sent to the classifier"""
+        extension = Path(name).suffix.lower()
+        return {
+            "path": path,
+            "name": name,
+            "size": size,
+            "extension": extension,
+            "type": "text" if extension in [
+                '.txt', '.md', '.py', '.js', '.json', '.yaml', '.yml', 
+                '.xml', '.html', '.css', '.sh', '.bash', '.zsh', 
+                '.env', '.config', '.conf', '.ini', '.log'
+            ] else "binary"
+        }
+    
+    def _screen_text(self, item: Dict[str, Any], file_text: str) -> Dict[str, Any]:
+        """Run the local pre-filter on extracted text and mark the item for AI if needed"""
+        # Local pre-filter: flag obvious secrets and skip files with no signal
+        if self.prefilter:
+            prefilter_result = self.prefilter.analyze(file_text)
+            verdict = prefilter_result['verdict']
+            if verdict == 'sensitive':
+                item.update(status='flagged', categorization=SecretPrefilter.to_categorization(prefilter_result))
+                return item
+            if verdict == 'clean' and not self.prefilter.should_sample(item['metadata']['path']):
+                item['status'] = 'skipped'
+                return item
+        
+        item['needs_ai'] = True
+        item['markdown'] = self.format_file_markdown(item['file_path'], file_text, item['metadata']["size"])
+        return item
+    
+    def prepare_archive(self, file_path: Path, metadata: Dict[str, Any],
+                        skip: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Stream archive members through the same pre-filter as regular files (members in skip were done before)"""
+        members = []
+        archive_error = None
+        for member in self.archive_walker.walk(file_path):
+            virtual_path = member['virtual_path']
+            if member.get('error') and virtual_path == str(file_path):
+                # The archive itself is unreadable or over a limit - report it on the container
+                archive_error = member['error']
+                continue
+            if skip and virtual_path in skip:
+                continue
+            item = {
+                'file_path': Path(virtual_path),
+                'status': 'pending',
+                'needs_ai': False,
+                'archive': str(file_path),
+                'metadata': self._file_metadata(virtual_path, Path(virtual_path).name, member['size'])
+            }
+            if member.get('error'):
+                item.update(status='error', message=member['error'])
+            elif member.get('binary_kind'):
+                item.update(status='error', message=f"Skipped binary member ({member['binary_kind']})")
+            else:
+                self._screen_text(item, member['text'])
+            members.append(item)
+        
+        container = {
+            'file_path': file_path,
+            'status': 'archive',
+            'needs_ai': False,
+            'metadata': metadata,
+            'message': f"Archive with {len(members)} scanned member(s)"
+        }
+        if archive_error:
+            container.update(status='error', message=f"{archive_error} (after {len(members)} scanned member(s))")
+        # The archive counts as done for --resume once all of these items are reported, in any order
+        for item in [container] + members:
+            item['archive_items'] = len(members) + 1
+        container['archive'] = str(file_path)
+        return [container] + members
+    
+    @traced('scan.prepare')
+    def prepare_file(self, file_path: Path, skip: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Read a file and run the local pre-filter (reader stage of the scan pipeline; skip holds done archive members)"""
+        item = {'file_path': file_path, 'status': 'pending', 'needs_ai': False}
+        
+        # Get file metadata
+        try:
+            file_stat = file_path.stat()
+            item['metadata'] = self._file_metadata(str(file_path), file_path.name, file_stat.st_size)
+        except Exception as e:
+            item.update(status='error', message=f"Could not get metadata: {e}")
+            return [item]
+        
+        if self.archive_walker and archive_kind(file_path.name):
+            return self.prepare_archive(file_path, item['metadata'], skip)
+        
+        # Read a bounded amount of content, skipping binaries by sniffing the first block
+        extracted = self.extractor.extract(file_path)
+        file_text = extracted['text']
+        if file_text is None:
+            if extracted['binary_kind']:
+                message = f"Skipped binary file ({extracted['binary_kind']})"
+            else:
+                message = "Could not extract content (unreadable)"
+            item.update(status='error', message=message)
+            return [item]
+        
+        return [self._screen_text(item, file_text)]
+    
+    @traced('scan.classify')
+    def classify_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Classify a prepared item with AI (classifier stage of the scan pipeline)"""
+        return self.categorize_file_sensitivity(item['file_path'], item['markdown'], item['metadata'])
+    
+    @traced('scan.collect')
+    def collect_files(self, folder_path: str) -> List[Path]:
+        """Walk the folder and return the files in scope (excluded subtrees are never entered)"""
+        return list(self.scope.walk(folder_path))
+    
+    def scan_folder(self, folder_path: str, model: str = 'drona', resume: bool = False) -> None:
+        """Scan folder for sensitive files and categorize them (resume continues a checkpoint)"""
         if model != 'drona':
             print("❌ Scan feature is only available with -m drona")
             return
@@ -149,6 +311,26 @@ class SecurityScanner:
             print(f"❌ Path is not a directory: {folder_path}")
             return
         
+        # Reports on stdout get it to themselves - progress moves to stderr
+        summary = {'type': 'summary', 'folder': folder_path, 'status': 'interrupted'}
+        for sink in self.report_sinks:
+            sink.open({'folder': folder_path, 'model': model})
+        progress = sys.stderr if any(sink.to_stdout for sink in self.report_sinks) else sys.stdout
+        try:
+            with contextlib.redirect_stdout(progress), span('scan.folder', folder=folder_path):
+                self._scan(folder_path, model, resume, summary)
+        finally:
+            summary['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+            for sink in self.report_sinks:
+                sink.close(summary)
+    
+    def _emit(self, record: Dict[str, Any]) -> None:
+        """Stream a result record to every report sink"""
+        for sink in self.report_sinks:
+            sink.write(record)
+    
+    def _scan(self, folder_path: str, model: str, resume: bool, summary: Dict[str, Any]) -> None:
+        """Walk, classify and report a folder (summary is filled in for report sinks)"""
         print("\n" + "=" * 60)
         print("🔍 Starting Folder Scan for Sensitive Files")
         print("=" * 60)
@@ -157,23 +339,25 @@ class SecurityScanner:
         print("=" * 60)
         print()
         
-        # Collect all files
-        all_files = []
-        try:
-            for root, dirs, files in os.walk(folder_path):
-                # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                
-                for file in files:
-                    # Skip hidden files
-                    if file.startswith('.'):
-                        continue
-                    
-                    file_path = Path(root) / file
-                    all_files.append(file_path)
-        except Exception as e:
-            print(f"❌ Error scanning folder: {e}")
-            return
+        # Resume from a checkpoint, or walk the folder and start a new one
+        journal = ScanJournal(folder_path, flush_every=self.checkpoint_every) if self.checkpoint else None
+        done: Dict[str, Dict[str, Any]] = {}
+        if resume and journal and journal.exists():
+            all_files, done = journal.load()
+            done_files = sum(1 for path in done if '!/' not in path)
+            print(f"♻️  Resuming scan: {done_files} of {len(all_files)} files already processed")
+        else:
+            if resume:
+                print("ℹ️  No checkpoint found for this folder, starting a new scan")
+            try:
+                all_files = self.collect_files(folder_path)
+            except Exception as e:
+                print(f"❌ Error scanning folder: {e}")
+                return
+            if self.scope.excluded:
+                print(f"🚫 Excluded {self.scope.excluded} paths by ignore files and scan policy")
+            if journal:
+                journal.start(all_files)
         
         total_files = len(all_files)
         print(f"📊 Found {total_files} files to analyze")
@@ -181,65 +365,168 @@ class SecurityScanner:
         
         if total_files == 0:
             print("✅ No files found to scan")
+            summary.update(status='complete', files_analyzed=0, sensitive_files=0)
+            if journal:
+                journal.discard()
             return
         
-        # Analyze each file
+        # Analyze files: reader -> classifier workers -> reporter.
+        # With report sinks attached, results are streamed instead of kept in memory.
+        keep_results = not self.report_sinks
         sensitive_files = []
-        analyzed_count = 0
+        stats = {'analyzed': 0, 'members': 0, 'sensitive': 0, 'ai_calls': 0, 'flagged': 0, 'skipped': 0}
+        for record in done.values():
+            if '!/' in record['path']:
+                stats['members'] += 1
+            else:
+                stats['analyzed'] += 1
+            if record.get('status') != 'archive':
+                self._emit(build_result_record(record['path'], record.get('status'),
+                                               record.get('metadata'), record.get('categorization')))
+            categorization = record.get('categorization')
+            if not (categorization and categorization.get("is_sensitive", False)):
+                continue
+            stats['sensitive'] += 1
+            if keep_results:
+                sensitive_files.append({
+                    "file_path": record['path'],
+                    "file_name": Path(record['path']).name,
+                    "metadata": record.get('metadata'),
+                    "categorization": categorization
+                })
+        remaining_files = [f for f in all_files if str(f) not in done] if done else all_files
+        # Archive path -> [items reported, all members journaled, container journal record]
+        archive_progress: Dict[str, list] = {}
         
-        for file_path in all_files:
-            analyzed_count += 1
-            print(f"🔍 Analyzing [{analyzed_count}/{total_files}]: {file_path.name}")
+        @traced('scan.report')
+        def report(item: Dict[str, Any]) -> None:
+            file_path = item['file_path']
+            status = item['status']
+            # Counted the same way as journal records on resume
+            is_member = '!/' in str(file_path)
+            is_container = bool(item.get('archive_items')) and not is_member
+            if is_member:
+                stats['members'] += 1
+                member_name = str(file_path)[len(item['archive']) + 2:] or file_path.name
+                print(f"   📦 {member_name}")
+            else:
+                stats['analyzed'] += 1
+                print(f"🔍 Analyzed [{stats['analyzed']}/{total_files}]: {file_path.name}")
             
-            # Get file metadata
-            try:
-                file_stat = file_path.stat()
-                file_metadata = {
+            # Checkpoint everything except failed AI calls, which are retried on resume
+            journaled = not (status == 'pending' and item.get('categorization') is None)
+            if journal and not is_container and journaled:
+                journal.record({
                     "path": str(file_path),
-                    "name": file_path.name,
-                    "size": file_stat.st_size,
-                    "extension": file_path.suffix.lower(),
-                    "type": "text" if file_path.suffix.lower() in [
-                        '.txt', '.md', '.py', '.js', '.json', '.yaml', '.yml', 
-                        '.xml', '.html', '.css', '.sh', '.bash', '.zsh', 
-                        '.env', '.config', '.conf', '.ini', '.log'
-                    ] else "binary"
-                }
-            except Exception as e:
-                print(f"  ⚠️  Could not get metadata: {e}")
-                continue
-            
-            # Extract file content
-            file_content = self.extract_file_content(file_path, max_chars=10000)
-            if not file_content:
-                print(f"  ⚠️  Could not extract content (may be binary or unreadable)")
-                continue
-            
-            # Categorize using AI
-            categorization = self.categorize_file_sensitivity(file_path, file_content, file_metadata)
+                    "status": status,
+                    "metadata": item.get('metadata'),
+                    "categorization": item.get('categorization')
+                })
+            if journal and item.get('archive_items'):
+                # Done members are skipped on resume; the archive itself only once every member is journaled
+                progress = archive_progress.setdefault(item['archive'], [0, True, None])
+                progress[0] += 1
+                progress[1] = progress[1] and journaled
+                if is_container:
+                    # An unreadable archive keeps its error status and size in the journal
+                    progress[2] = {"path": item['archive'], "status": status, "metadata": item.get('metadata')}
+                if progress[0] == item['archive_items']:
+                    del archive_progress[item['archive']]
+                    if progress[1]:
+                        journal.record(progress[2])
+            if status != 'archive':
+                self._emit(build_result_record(str(file_path), status, item.get('metadata'),
+                                               item.get('categorization')))
+            if status == 'archive':
+                print(f"  📦 {item['message']}")
+                return
+            if status == 'error':
+                print(f"  ⚠️  {item['message']}")
+                return
+            if status == 'skipped':
+                stats['skipped'] += 1
+                print(f"  ✅ Not sensitive (no secret signal)")
+                return
+            if status == 'flagged':
+                stats['flagged'] += 1
+            else:
+                stats['ai_calls'] += 1
             
+            categorization = item.get('categorization')
             if categorization and categorization.get("is_sensitive", False):
-                sensitive_files.append({
-                    "file_path": str(file_path),
-                    "file_name": file_path.name,
-                    "metadata": file_metadata,
-                    "categorization": categorization
-                })
+                stats['sensitive'] += 1
+                if keep_results:
+                    sensitive_files.append({
+                        "file_path": str(file_path),
+                        "file_name": file_path.name,
+                        "metadata": item['metadata'],
+                        "categorization": categorization
+                    })
                 print(f"  🔴 SENSITIVE: {categorization.get('reason', 'No reason provided')}")
             else:
                 print(f"  ✅ Not sensitive")
         
+        pipeline = ScanPipeline(
+            prepare=lambda index, file_path: self.prepare_file(file_path, done),
+            classify=self.classify_item,
+            report=report,
+            concurrency=self.concurrency,
+            rate_limit=self.rate_limit,
+            max_retries=self.max_retries,
+            ordered=self.ordered,
+            retry_status=lambda: getattr(self.ai_provider, 'last_status_code', None)
+        )
+        if self.concurrency > 1:
+            rate_info = f", rate limit {self.rate_limit:g}/min" if self.rate_limit else ""
+            print(f"⚙️  Classifier workers: {self.concurrency}{rate_info}")
+            print()
+        
+        completed = False
+        try:
+            pipeline.run(remaining_files)
+            completed = not pipeline.stop_event.is_set()
+        except KeyboardInterrupt:
+            pipeline.stop()
+            print("\n🛑 Scan interrupted by user")
+        finally:
+            if journal:
+                if completed:
+                    journal.discard()
+                else:
+                    journal.close()
+                    print(f"💾 Progress saved. Continue with: jarvis -scan -f {folder_path} --resume")
+        
+        analyzed_count = stats['analyzed']
+        summary.update(
+            status='complete' if completed else 'interrupted',
+            files_total=total_files,
+            files_analyzed=analyzed_count,
+            archive_members=stats['members'],
+            sensitive_files=stats['sensitive'],
+            ai_calls=stats['ai_calls'],
+            prefilter_flagged=stats['flagged'],
+            prefilter_skipped=stats['skipped']
+        )
         print()
         print("=" * 60)
         print("📊 Scan Complete")
         print("=" * 60)
         print(f"Total files analyzed: {analyzed_count}")
-        print(f"Sensitive files found: {len(sensitive_files)}")
+        if stats['members']:
+            print(f"Archive members analyzed: {stats['members']}")
+        print(f"Sensitive files found: {stats['sensitive']}")
+        if self.prefilter:
+            print(f"AI classifications: {stats['ai_calls']} "
+                  f"(pre-filter flagged {stats['flagged']}, skipped {stats['skipped']})")
         print("=" * 60)
         print()
         
         # Report sensitive files
-        if sensitive_files:
+        if not keep_results:
+            for sink in self.report_sinks:
+                print(f"📄 Report written to: {'stdout' if sink.to_stdout else sink.path}")
+            print()
+        elif sensitive_files:
             self.report_sensitive_files(sensitive_files)
         else:
             print("✅ No sensitive files detected!")
@@ -0,0 +1,232 @@
+"""
+Scan scoping
+Gitignore-style ignore files plus global include/exclude and size policies, applied during the walk
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+
+IGNORE_FILES = ('.gitignore', '.jarvisignore')
+
+# Build outputs, dependency trees and caches that never need AI review
+DEFAULT_EXCLUDES = [
+    '.git/', '.hg/', '.svn/',
+    'node_modules/', 'bower_components/',
+    '.venv/', 'venv/', '.tox/', '.nox/',
+    '__pycache__/', '.mypy_cache/', '.pytest_cache/', '.ruff_cache/',
+    '*.egg-info/', 'build/', 'dist/', 'target/', '.gradle/', '.next/',
+    '*.pyc', '*.pyo', '*.class', '*.o', '*.so', '*.dylib', '*.dll',
+]
+
+
+def glob_to_regex(pattern: str) -> Tuple[str, bool]:
+    """
+    Translate a gitignore-style glob into a regex over '/'-separated relative paths
+
+    Returns:
+        (regex source, anchored) - unanchored patterns match at any depth
+    """
+    anchored = '/' in pattern.rstrip('/')
+    pattern = pattern.lstrip('/')
+
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+
+    body = ''.join(out)
+    if not anchored:
+        body = '(?:.*/)?' + body
+    return body, anchored
+
+
+class IgnoreRules:
+    """Compiled rules from one ignore file (or the global policy), relative to a base directory"""
+
+    def __init__(self, patterns: List[str]):
+        """
+        Compile patterns
+
+        Args:
+            patterns: Lines in gitignore syntax (comments and blanks are ignored)
+        """
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in patterns:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            source, _ = glob_to_regex(line.rstrip('/'))
+            self.rules.append((re.compile(source + r'\Z'), negate, dir_only))
+
+        # Without negations the last-match-wins scan collapses into two alternations
+        self.has_negation = any(negate for _, negate, _ in self.rules)
+        self._any = self._combine([r for r, _, dir_only in self.rules if not dir_only])
+        self._dirs = self._combine([r for r, _, dir_only in self.rules if dir_only])
+
+    @staticmethod
+    def _combine(regexes: List[re.Pattern]) -> Optional[re.Pattern]:
+        """Merge compiled rules into one alternation"""
+        if not regexes:
+            return None
+        return re.compile('|'.join(f'(?:{r.pattern})' for r in regexes))
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True if ignored, False if explicitly re-included, None if no rule matched"""
+        if not self.has_negation:
+            if self._any and self._any.match(rel_path):
+                return True
+            if is_dir and self._dirs and self._dirs.match(rel_path):
+                return True
+            return None
+
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional['IgnoreRules']:
+        """Load rules from an ignore file"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                rules = cls(f.readlines())
+            return rules if rules.rules else None
+        except OSError:
+            return None
+
+
+class ScanScope:
+    """Decide which files a scan visits, pruning excluded directories during the walk"""
+
+    def __init__(self, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 max_file_size: Optional[int] = None, use_ignore_files: bool = True,
+                 skip_hidden: bool = True):
+        """
+        Initialize scope
+
+        Args:
+            include: Glob patterns a file must match to be scanned (empty = all files)
+            exclude: Global gitignore-style exclude patterns (default: build/cache/vendor dirs)
+            max_file_size: Skip files larger than this many bytes (None = no limit)
+            use_ignore_files: Honour .gitignore and .jarvisignore files found in the tree
+            skip_hidden: Skip dot-prefixed files and directories
+        """
+        self.global_rules = IgnoreRules(DEFAULT_EXCLUDES if exclude is None else exclude)
+        self.include = IgnoreRules(include) if include else None
+        self.max_file_size = max_file_size or None
+        self.use_ignore_files = use_ignore_files
+        self.skip_hidden = skip_hidden
+        self.excluded = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ScanScope':
+        """Build a scope from scan_include, scan_exclude, scan_max_file_size, ... config keys"""
+        exclude = config.get('scan_exclude')
+        extra = config.get('scan_exclude_extra', [])
+        if extra:
+            exclude = (DEFAULT_EXCLUDES if exclude is None else exclude) + list(extra)
+        return cls(
+            include=config.get('scan_include') or None,
+            exclude=exclude,
+            max_file_size=config.get('scan_max_file_size'),
+            use_ignore_files=bool(config.get('scan_use_ignore_files', True)),
+            skip_hidden=bool(config.get('scan_skip_hidden', True))
+        )
+
+    def _is_ignored(self, rel_path: str, is_dir: bool,
+                    stack: List[Tuple[str, IgnoreRules]]) -> bool:
+        """Evaluate the global policy, then ignore files from the root down (deepest wins)"""
+        ignored = bool(self.global_rules.match(rel_path, is_dir))
+        for base, rules in stack:
+            sub_path = rel_path[len(base) + 1:] if base else rel_path
+            verdict = rules.match(sub_path, is_dir)
+            if verdict is not None:
+                ignored = verdict
+        return ignored
+
+    def walk(self, root: str) -> Iterator[Path]:
+        """Yield files under root that are in scope"""
+        # Ignore rules active for each directory, keyed by path relative to root
+        rules_by_dir: Dict[str, List[Tuple[str, IgnoreRules]]] = {}
+
+        for dirpath, dirs, files in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir
+
+            stack = list(rules_by_dir.pop(rel_dir, [])) if rel_dir else []
+            if self.use_ignore_files:
+                for name in IGNORE_FILES:
+                    if name in files:
+                        rules = IgnoreRules.from_file(Path(dirpath) / name)
+                        if rules:
+                            stack.append((rel_dir, rules))
+
+            kept_dirs = []
+            for d in dirs:
+                rel = f"{rel_dir}/{d}" if rel_dir else d
+                if (self.skip_hidden and d.startswith('.')) or self._is_ignored(rel, True, stack):
+                    self.excluded += 1
+                    continue
+                kept_dirs.append(d)
+                rules_by_dir[rel] = stack
+            dirs[:] = kept_dirs
+
+            for name in files:
+                rel = f"{rel_dir}/{name}" if rel_dir else name
+                if self.skip_hidden and name.startswith('.'):
+                    continue
+                if self._is_ignored(rel, False, stack):
+                    self.excluded += 1
+                    continue
+                if self.include and not self.include.match(rel, False):
+                    self.excluded += 1
+                    continue
+                file_path = Path(dirpath) / name
+                if self.max_file_size:
+                    try:
+                        if file_path.stat().st_size > self.max_file_size:
+                            self.excluded += 1
+                            continue
+                    except OSError:
+                        continue
+                yield file_path
@@ -0,0 +1,307 @@
+"""
+Resident query server
+Keeps Jarvis instances (set-up AI providers, command cache, sandbox) warm behind a Unix socket so
+one-shot `jarvis "question"` calls skip interpreter start-up, imports and provider setup. The CLI
+forwards each query and streams back everything the query prints.
+
+Protocol: newline-delimited JSON. The client sends one request object per connection:
+    {"op": "query", "query": ..., "model": ..., "bot_id": ..., "image_path": ..., "cwd": ..., "env": {...}, "session": ...}
+    {"op": "status"} / {"op": "stop"}
+and reads messages until "done" or "error":
+    {"type": "stdout"|"stderr", "data": ...}, {"type": "done", ...}, {"type": "error", "message": ...}
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+# Add project root to path for imports (the server is started as a script)
+_project_root = Path(__file__).parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from core.ai.session import ConversationSession
+from utils.config import load_config, get_config_path
+
+
+def default_socket_path(config: Optional[Dict[str, Any]] = None) -> str:
+    """Socket path from the server_socket config key (default ~/.jarvis/jarvis.sock)"""
+    config = config if config is not None else load_config()
+    return os.path.expanduser(config.get('server_socket') or str(get_config_path().parent / 'jarvis.sock'))
+
+
+class _StreamWriter(io.TextIOBase):
+    """Text stream that forwards every write to the client as a message"""
+
+    def __init__(self, send, kind: str):
+        self._send = send
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self._send({'type': self.kind, 'data': text})
+        return len(text)
+
+    def isatty(self) -> bool:
+        return False
+
+
+class JarvisServer:
+    """Warm Jarvis instances and conversation sessions served over a Unix socket"""
+
+    def __init__(self, socket_path: str, idle_timeout: float = 1800.0, session_idle: float = 900.0):
+        """
+        Initialize server
+
+        Args:
+            socket_path: Unix socket to listen on (created with owner-only permissions)
+            idle_timeout: Seconds without requests before the server exits (0 keeps it running)
+            session_idle: Seconds after which an unused conversation session starts over
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.session_idle = session_idle
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+        self.queries = 0
+        # (model, bot_id) -> Jarvis
+        self.instances: Dict[Tuple[str, Optional[str]], Any] = {}
+        # (model, bot_id, session key) -> [ConversationSession, last used]
+        self.sessions: Dict[Tuple[str, Optional[str], str], list] = {}
+        self._config_mtime = self._read_config_mtime()
+        # System information snapshots shared by every session, per working directory
+        # (the text includes the current directory): cwd -> (text, collected at)
+        self._system_info: Dict[str, Tuple[str, float]] = {}
+        # Queries change the working directory and sys.stdout, so they run one at a time
+        self._query_lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], socket_path: Optional[str] = None) -> 'JarvisServer':
+        """Build a server from server_socket, server_idle_timeout and server_session_idle config keys"""
+        return cls(
+            socket_path or default_socket_path(config),
+            idle_timeout=float(config.get('server_idle_timeout', 1800)),
+            session_idle=float(config.get('server_session_idle', 900))
+        )
+
+    @staticmethod
+    def _read_config_mtime() -> float:
+        try:
+            return get_config_path().stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _jarvis(self, model: str, bot_id: Optional[str]):
+        """Warm instance for a model, rebuilt after the config file changes"""
+        mtime = self._read_config_mtime()
+        if mtime != self._config_mtime:
+            self.instances.clear()
+            self.sessions.clear()
+            self._system_info.clear()
+            self._config_mtime = mtime
+        key = (model, bot_id)
+        jarvis = self.instances.get(key)
+        if jarvis is None:
+            from core.jarvis import Jarvis
+            jarvis = self.instances[key] = Jarvis(model=model, bot_id=bot_id)
+            collect = jarvis.get_system_info
+            jarvis.get_system_info = lambda: self._shared_system_info(collect, jarvis.session.system_info_ttl)
+        return jarvis
+
+    def _shared_system_info(self, collect, ttl: float) -> str:
+        """System information for the query's directory, reused across sessions and models for the session TTL"""
+        now = time.monotonic()
+        cwd = os.getcwd()
+        # Drop expired snapshots so directories visited once don't accumulate
+        for stale in [path for path, (_, at) in self._system_info.items() if now - at > ttl]:
+            del self._system_info[stale]
+        entry = self._system_info.get(cwd)
+        if entry is None:
+            entry = self._system_info[cwd] = (collect(), now)
+        return entry[0]
+
+    def _session(self, model: str, bot_id: Optional[str], session_key: str) -> ConversationSession:
+        key = (model, bot_id, session_key)
+        now = time.monotonic()
+        entry = self.sessions.get(key)
+        if entry is None or (self.session_idle > 0 and now - entry[1] > self.session_idle):
+            entry = self.sessions[key] = [ConversationSession.from_config(load_config()), now]
+        entry[1] = now
+        return entry[0]
+
+    def handle_query(self, request: Dict[str, Any], send) -> Dict[str, Any]:
+        """
+        Answer one query, streaming its output
+
+        Args:
+            request: Query request (query, model, bot_id, image_path, cwd, env, session, new_session)
+            send: Callable that delivers one message to the client
+
+        Returns:
+            Final "done" message
+        """
+        started = time.perf_counter()
+        model = request.get('model') or 'gemini'
+        bot_id = request.get('bot_id')
+        with self._query_lock:
+            previous_cwd = os.getcwd()
+            stdout, stderr = _StreamWriter(send, 'stdout'), _StreamWriter(send, 'stderr')
+            try:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    os.chdir(request.get('cwd') or previous_cwd)
+                    try:
+                        jarvis = self._jarvis(model, bot_id)
+                    except SystemExit:
+                        # Provider setup failed; it already explained why
+                        return {'type': 'done', 'ok': False, 'elapsed': time.perf_counter() - started}
+                    session = self._session(model, bot_id, str(request.get('session') or 'default'))
+                    if request.get('new_session'):
+                        session.reset()
+                    jarvis.session = session
+                    jarvis.image_data = jarvis.image_mime_type = None
+                    # Commands see the client terminal's PATH, virtualenv, AWS_PROFILE, KUBECONFIG, LANG, ...
+                    jarvis.command_env = request.get('env')
+                    if request.get('image_path'):
+                        jarvis.load_image(request['image_path'])
+                    try:
+                        jarvis.process_query(request.get('query', ''))
+                    finally:
+                        jarvis.image_data = jarvis.image_mime_type = None
+                        jarvis.command_env = None
+            except Exception as e:
+                return {'type': 'error', 'message': str(e)}
+            finally:
+                os.chdir(previous_cwd)
+                self.queries += 1
+        return {'type': 'done', 'ok': True, 'elapsed': time.perf_counter() - started}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'type': 'done',
+            'ok': True,
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started_at,
+            'queries': self.queries,
+            'models': sorted(f"{model}:{bot_id}" if bot_id else model for model, bot_id in self.instances),
+            'sessions': len(self.sessions),
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.last_activity = time.monotonic()
+                lock = threading.Lock()
+                connected = [True]
+
+                def send(message: Dict[str, Any]) -> None:
+                    # Keep answering if the client went away (e.g. Ctrl+C); the query still finishes
+                    if not connected[0]:
+                        return
+                    data = (json.dumps(message) + '\n').encode('utf-8')
+                    with lock:
+                        try:
+                            self.wfile.write(data)
+                            self.wfile.flush()
+                        except OSError:
+                            connected[0] = False
+
+                try:
+                    line = self.rfile.readline()
+                    request = json.loads(line.decode('utf-8')) if line else {}
+                except ValueError:
+                    send({'type': 'error', 'message': 'Malformed request'})
+                    return
+                op = request.get('op')
+                if op == 'query':
+                    send(server.handle_query(request, send))
+                elif op == 'status':
+                    send(server.status())
+                elif op == 'stop':
+                    send({'type': 'done', 'ok': True})
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                else:
+                    send({'type': 'error', 'message': f"Unknown op: {op}"})
+                server.last_activity = time.monotonic()
+
+        return Handler
+
+    def _watch_idle(self) -> None:
+        while self._server is not None:
+            time.sleep(min(5.0, self.idle_timeout))
+            busy = self._query_lock.locked()
+            if not busy and time.monotonic() - self.last_activity > self.idle_timeout:
+                print(f"💤 Idle for {self.idle_timeout:g}s, shutting down")
+                self.shutdown()
+                return
+
+    def serve(self) -> None:
+        """Listen on the socket until stopped, idle for too long, or sent SIGTERM"""
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        old_umask = os.umask(0o077)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, self._handler_class())
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.shutdown, daemon=True).start())
+        if self.idle_timeout > 0:
+            threading.Thread(target=self._watch_idle, name='jarvis-server-idle', daemon=True).start()
+        print(f"🛰️  Jarvis server {os.getpid()} listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._server = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+            print("🛑 Jarvis server stopped")
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def main() -> None:
+    """Run the server in the foreground (the CLI starts it in the background on first use)"""
+    import argparse
+    import fcntl
+
+    parser = argparse.ArgumentParser(description='Jarvis resident query server')
+    parser.add_argument('--socket', help='Unix socket path (default: server_socket config or ~/.jarvis/jarvis.sock)')
+    parser.add_argument('--idle-timeout', type=float, help='Exit after this many idle seconds (0 = never)')
+    args = parser.parse_args()
+
+    config = load_config()
+    server = JarvisServer.from_config(config, args.socket)
+    if args.idle_timeout is not None:
+        server.idle_timeout = args.idle_timeout
+
+    # One server per socket: a second auto-spawned copy exits quietly
+    lock_file = open(server.socket_path + '.lock', 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print("ℹ️  Another Jarvis server is already running on this socket")
+        return
+    sys.stdout.reconfigure(line_buffering=True)
+    server.serve()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Notification throughput benchmark
+Compares the persistent D-Bus backend against forking notify-send for each alert (Linux only)
+
+Usage:
+    python3 scripts/bench_notify.py [--count 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dbus_notify import DBusNotifier
+
+
+def bench_subprocess(count: int) -> dict:
+    """Fork notify-send once per notification"""
+    if not shutil.which('notify-send'):
+        return {'backend': 'notify-send', 'skipped': 'notify-send not found'}
+    start = time.perf_counter()
+    failures = 0
+    for i in range(count):
+        result = subprocess.run(['notify-send', 'Jarvis benchmark', f'subprocess #{i}'],
+                                capture_output=True, timeout=2)
+        failures += result.returncode != 0
+    return _result('notify-send', count, failures, time.perf_counter() - start)
+
+
+def bench_dbus(count: int) -> dict:
+    """Send over one session-bus connection, updating a single popup in place"""
+    notifier = DBusNotifier()
+    if not notifier.connect():
+        return {'backend': 'dbus', 'skipped': 'D-Bus session bus unavailable (pip install jeepney)'}
+    start = time.perf_counter()
+    failures = 0
+    for i in range(count):
+        failures += not notifier.notify('Jarvis benchmark', f'dbus #{i}', key='benchmark')
+    elapsed = time.perf_counter() - start
+    backend = notifier.backend
+    notifier.close()
+    return _result(f'dbus ({backend})', count, failures, elapsed)
+
+
+def _result(backend: str, count: int, failures: int, elapsed: float) -> dict:
+    return {
+        'backend': backend,
+        'count': count,
+        'failures': failures,
+        'seconds': round(elapsed, 4),
+        'per_second': round(count / elapsed, 1) if elapsed else None,
+        'ms_per_notification': round(elapsed * 1000 / count, 3) if count else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark notification backends')
+    parser.add_argument('--count', type=int, default=200, help='Notifications per backend (default: 200)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [bench_dbus(args.count), bench_subprocess(args.count)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"📊 Notification throughput ({args.count} notifications per backend)")
+    for r in results:
+        if 'skipped' in r:
+            print(f"   • {r['backend']:<22} skipped: {r['skipped']}")
+        else:
+            print(f"   • {r['backend']:<22} {r['per_second']:>8}/s  {r['ms_per_notification']:>8} ms each"
+                  f"  ({r['failures']} failed)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
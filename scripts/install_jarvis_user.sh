@@ -42,7 +42,7 @@ if [ -f "$PROJECT_ROOT/requirements.txt" ]; then
     pip3 install --break-system-packages -r "$PROJECT_ROOT/requirements.txt"
 else
     # Fallback to individual packages if requirements.txt doesn't exist
-    pip3 install --break-system-packages google-generativeai==0.3.2 psutil==5.9.6 requests==2.31.0
+    pip3 install --break-system-packages google-generativeai==0.8.3 psutil==5.9.6 requests==2.31.0
 fi
 
 # Create the jarvis command in user's home directory
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Local LLM stand-in server
+Serves the SLM /generate and Drona chat endpoints with synthetic, replayed or proxied-and-recorded answers
+
+Usage:
+    python3 scripts/mock_llm.py [--port 8765] [--latency lognormal:0.8,0.4] [--error-rate 0.05]
+    python3 scripts/mock_llm.py --record fixtures.jsonl --upstream http://slm-server:5000
+    python3 scripts/mock_llm.py --replay fixtures.jsonl [--replay-latency] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ai.mock_server import MockLLMServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the SLM and Drona AI servers')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind (default: 8765)')
+    parser.add_argument('--latency', default='fixed:0',
+                        help='fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA or exponential:MEAN')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with an error')
+    parser.add_argument('--error-codes', default='429,500,503', help='Comma-separated statuses for injected errors')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Share of requests that stall past client timeouts')
+    parser.add_argument('--hang-seconds', type=float, default=35.0, help='How long a stalled request hangs')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Share of connections closed without a response')
+    parser.add_argument('--token-delay', type=float, default=0.02, help='Delay between streamed chunks')
+    parser.add_argument('--responses', help='JSON file mapping prompt substrings to canned responses')
+    parser.add_argument('--replay', help='Answer from a recorded fixture file')
+    parser.add_argument('--replay-latency', action='store_true', help='Reproduce recorded latencies when replaying')
+    parser.add_argument('--record', help='Fixture file to record upstream traffic into (requires --upstream)')
+    parser.add_argument('--upstream', help='Real SLM/Drona server base URL to proxy to')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible latency and errors')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    parser.add_argument('--json', action='store_true', help='Print request statistics as JSON on exit')
+    args = parser.parse_args()
+
+    if args.record and not args.upstream:
+        parser.error('--record needs --upstream')
+    if args.record and args.replay:
+        parser.error('--record and --replay are mutually exclusive')
+
+    responses = []
+    if args.responses:
+        with open(args.responses, encoding='utf-8') as f:
+            responses = list(json.load(f).items())
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(',') if code.strip()],
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        drop_rate=args.drop_rate,
+        token_delay=args.token_delay,
+        responses=responses,
+        fixtures=args.record or args.replay,
+        replay_latency=args.replay_latency,
+        upstream=args.upstream if args.record else None,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+
+    print(f"🧪 Mock LLM server ({server.mode}) listening on {server.url}")
+    print(f"💡 SLM:   jarvis configure -m slm --url {server.url}")
+    print(f"💡 Drona: jarvis configure -m drona --url {server.url}/drona/v1/jarvis/chat")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+    if args.json:
+        print(json.dumps(server.stats, indent=2))
+    else:
+        print("\n📊 " + ", ".join(f"{key}: {value}" for key, value in server.stats.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -63,6 +63,9 @@ setup(
             "SpeechRecognition>=3.10.0",
             "pyaudio>=0.2.11",
         ],
+        "dbus": [
+            "jeepney>=0.7",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: make the project packages importable from any test directory
+"""
+
+import sys
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
@@ -0,0 +1,187 @@
+"""
+ResilientProvider retries and CircuitBreaker states against a scripted stub provider and a fake clock
+"""
+
+import pytest
+
+from core.ai import resilience
+from core.ai.base import AIProvider
+from core.ai.resilience import CircuitBreaker, ResilientProvider
+
+
+class _Clock:
+    """Stands in for the time module: sleep() advances monotonic() instantly"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _StubProvider(AIProvider):
+    """Plays back a script: a string is a response, an int a failed call with that status, an exception is raised"""
+
+    def __init__(self, *script, on_call=None):
+        self.script = list(script)
+        self.calls = 0
+        self.last_status_code = None
+        self.on_call = on_call
+
+    def setup(self):
+        return True
+
+    def is_available(self):
+        return True
+
+    def query(self, prompt, **kwargs):
+        self.calls += 1
+        if self.on_call:
+            self.on_call()
+        outcome = self.script.pop(0) if self.script else 'ok'
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, int):
+            self.last_status_code = outcome
+            return None
+        self.last_status_code = None
+        return outcome
+
+
+class TooManyRequests(Exception):
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(resilience, 'time', fake)
+    # Backoff always takes its full jitter range so delays are predictable
+    monkeypatch.setattr(resilience.random, 'uniform', lambda a, b: b)
+    return fake
+
+
+def _breaker(threshold=3):
+    return CircuitBreaker('test', failure_threshold=threshold, reset_timeout=30.0, verbose=False)
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retryable_status_is_retried_until_max_retries(clock, status):
+    stub = _StubProvider(*[status] * 10)
+    provider = ResilientProvider(stub, max_retries=3, base_delay=0.5, max_delay=8.0)
+    assert provider.query('p') is None
+    assert stub.calls == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+    assert provider.last_status_code == status
+
+
+def test_retry_succeeds_after_transient_failure(clock):
+    stub = _StubProvider(503, TooManyRequests('slow down'), 'answer')
+    provider = ResilientProvider(stub, max_retries=3)
+    assert provider.query('p') == 'answer'
+    assert stub.calls == 3
+    assert provider.last_status_code is None
+
+
+@pytest.mark.parametrize('failure', [400, 401, ValueError('bad response')])
+def test_non_retryable_failure_is_not_retried(clock, failure):
+    stub = _StubProvider(failure, 'answer')
+    provider = ResilientProvider(stub, max_retries=3)
+    assert provider.query('p') is None
+    assert stub.calls == 1
+    assert clock.sleeps == []
+
+
+def test_no_retry_starts_past_the_deadline(clock):
+    stub = _StubProvider(*[503] * 10)
+    provider = ResilientProvider(stub, max_retries=5, base_delay=1.0, deadline=2.5)
+    assert provider.query('p') is None
+    # Backoffs of 1s then 2s: the second would end past the 2.5s deadline
+    assert stub.calls == 2
+    assert clock.sleeps == [1.0]
+
+
+def test_breaker_opens_after_threshold_and_blocks_calls(clock):
+    stub = _StubProvider(*[500] * 3)
+    provider = ResilientProvider(stub, max_retries=0, breaker=_breaker(threshold=3))
+    for _ in range(3):
+        assert provider.query('p') is None
+    assert provider.breaker.state == CircuitBreaker.OPEN
+
+    assert provider.query('p') is None
+    assert stub.calls == 3
+    assert provider.last_status_code == 503
+    assert not provider.is_available()
+
+
+def test_open_breaker_stops_retries(clock):
+    stub = _StubProvider(*[503] * 10)
+    provider = ResilientProvider(stub, max_retries=5, breaker=_breaker(threshold=2))
+    assert provider.query('p') is None
+    assert stub.calls == 2
+
+
+def test_half_open_breaker_allows_exactly_one_probe(clock):
+    breaker = _breaker(threshold=1)
+    blocked = []
+
+    def concurrent_query():
+        # A second query issued while the probe is in flight must not reach the provider
+        if stub.calls == 2:
+            blocked.append(provider.query('other'))
+
+    stub = _StubProvider(500, 'recovered', on_call=concurrent_query)
+    provider = ResilientProvider(stub, max_retries=0, breaker=breaker)
+    assert provider.query('p') is None
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert provider.query('p') == 'recovered'
+    assert blocked == [None]
+    assert stub.calls == 2
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = _breaker(threshold=2)
+    stub = _StubProvider(500, 500, 500, 'recovered')
+    provider = ResilientProvider(stub, max_retries=0, breaker=breaker)
+    provider.query('p')
+    provider.query('p')
+    assert breaker.opens == 1
+
+    clock.now += 30.0
+    assert provider.query('p') is None
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opens == 2
+    assert provider.query('p') is None
+    assert stub.calls == 3
+
+    clock.now += 30.0
+    assert provider.query('p') == 'recovered'
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_single_attempt_shares_the_breaker(clock):
+    stub = _StubProvider(*[503] * 10)
+    provider = ResilientProvider(stub, max_retries=3, breaker=_breaker(threshold=2))
+    single = provider.single_attempt()
+    assert single.breaker is provider.breaker
+    assert single.max_retries == 0
+
+    assert single.query('p') is None
+    assert stub.calls == 1
+    assert single.query('p') is None
+    assert stub.calls == 2
+    assert provider.breaker.state == CircuitBreaker.OPEN
+
+    # Failures through the single-attempt view open the circuit for the retrying provider too
+    assert provider.query('p') is None
+    assert stub.calls == 2
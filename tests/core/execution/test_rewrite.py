@@ -0,0 +1,88 @@
+"""
+CommandRewriter tests against the default rules
+"""
+
+import json
+
+import pytest
+
+from core.execution.rewrite import CommandRewriter, _compile
+
+
+def _rewriter(system='Linux', user_rules=None):
+    return CommandRewriter(_compile(system, json.dumps(user_rules or [], sort_keys=True)))
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('top', 'top -b -n 1'),
+    ('top -l 1 -o cpu', 'top -b -n 1 -o %CPU'),
+    ('top -l1 -omem', 'top -b -n1 -o%MEM'),
+    ('htop', 'top -b -n 1'),
+    ('top -b -n 3', 'top -b -n 3'),
+])
+def test_top_on_linux(command, expected):
+    assert _rewriter('Linux').rewrite(command) == expected
+
+
+def test_top_on_macos():
+    assert _rewriter('Darwin').rewrite('top -o cpu') == 'top -l 1 -o cpu'
+    assert _rewriter('Darwin').rewrite('top -l 2') == 'top -l 2'
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('tail -f app.log', 'tail app.log'),
+    ('tail -fn 20 app.log', 'tail -n 20 app.log'),
+    ('tail -F --retry app.log', 'tail app.log'),
+    ('tail -n 5 app.log', 'tail -n 5 app.log'),
+])
+def test_tail_follow_is_removed(command, expected):
+    assert _rewriter().rewrite(command) == expected
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('watch ls', 'ls'),
+    ('watch -n 2 uptime', 'uptime'),
+    ('watch --interval 5 -d df -h', 'df -h'),
+    ('watch -q 3 date', 'date'),
+    ('watch -g ls', 'ls'),
+    ('watch --chgexit df -h', 'df -h'),
+    ('watch -x ls "a b"', "ls 'a b'"),
+    ('watch -n 1 top', 'top -b -n 1'),
+    ('sudo watch -n1 ls', 'sudo ls'),
+    ('echo hi && watch ls | cat', 'echo hi && ls | cat'),
+])
+def test_watch_runs_command_once(command, expected):
+    assert _rewriter().rewrite(command) == expected
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('ping example.com', 'ping -c 4 example.com'),
+    ('ping -c 2 example.com', 'ping -c 2 example.com'),
+    ('ping -qc2 example.com', 'ping -qc2 example.com'),
+])
+def test_ping_gets_a_count_unless_given(command, expected):
+    assert _rewriter().rewrite(command) == expected
+
+
+def test_unless_args_keep_existing_flags():
+    rewriter = _rewriter()
+    assert rewriter.rewrite('git --no-pager log') == 'git --no-pager log'
+    assert rewriter.rewrite('git log') == 'git --no-pager log'
+    assert rewriter.rewrite('journalctl --no-pager -f') == 'journalctl --no-pager'
+    assert rewriter.rewrite('man -P less ls') == 'man -P less ls'
+
+
+def test_unmatched_commands_keep_exact_text():
+    command = "ls  -la   'my dir' | grep  x"
+    assert _rewriter().rewrite(command) == command
+
+
+def test_user_rules_run_first_and_can_disable_defaults():
+    rewriter = _rewriter(user_rules=[{'program': 'git', 'disable': True},
+                                     {'program': 'vim', 'replace_program': 'cat', 'drop_options': True}])
+    assert rewriter.rewrite('git log') == 'git log'
+    assert rewriter.rewrite('vim -R notes.txt') == 'cat notes.txt'
+
+
+def test_disabled_rewriter_returns_command():
+    assert CommandRewriter(_compile('Linux', '[]'), enabled=False).rewrite('top') == 'top'
@@ -0,0 +1,52 @@
+"""
+Binary sniffing and bounded extraction
+"""
+
+import bz2
+import struct
+
+import pytest
+
+from core.security.extractor import FileExtractor, sniff_binary
+
+
+def _pe_header():
+    stub = bytearray(b'MZ' + b'\x90\x00' * 30)
+    stub[0x3C:0x40] = struct.pack('<I', 0x80)
+    return bytes(stub) + b'\x00' * (0x80 - len(stub)) + b'PE\x00\x00' + b'\x4c\x01'
+
+
+@pytest.mark.parametrize('text', [
+    b'MZ_API_KEY=sk_live_abc123\n',
+    b'MZ' + b'x' * 100 + b'\n',
+    b'ID3_TAG_SECRET=hunter2\n',
+    b'ID3 tags are parsed here\n',
+    b'BZh, see https://example.com\n',
+    b'BZh9 notes: token=abc\n',
+])
+def test_text_with_magic_prefix_is_text(text):
+    assert sniff_binary(text) is None
+
+
+@pytest.mark.parametrize('head, kind', [
+    (_pe_header(), 'pe'),
+    (b'ID3\x04\x00\x00\x00\x00\x00\x00', 'mp3'),
+    (bz2.compress(b'hello world'), 'bzip2'),
+    (bz2.compress(b''), 'bzip2'),
+    (b'\x7fELF\x02\x01\x01', 'elf'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+])
+def test_binary_formats_are_recognised(head, kind):
+    assert sniff_binary(head) == kind
+
+
+def test_unconfirmed_magic_with_nul_bytes_is_still_binary():
+    assert sniff_binary(b'MZ\x00\x00\x00\x00') == 'binary'
+
+
+def test_extract_reads_text_file_with_magic_prefix(tmp_path):
+    path = tmp_path / '.env'
+    path.write_bytes(b'MZ_API_KEY=sk_live_abc123\n')
+    result = FileExtractor().extract(path)
+    assert result['binary_kind'] is None
+    assert 'sk_live_abc123' in result['text']
@@ -0,0 +1,94 @@
+"""
+NotificationDispatcher coalescing, rate limiting and stats with a fake sender
+"""
+
+import threading
+
+from utils.dispatcher import NotificationDispatcher
+
+
+class _FakeManager:
+    """Records every delivery instead of showing it"""
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, title, message, severity='INFO', group=None):
+        with self._lock:
+            self.sent.append((title, message, severity, group))
+        return True
+
+
+def _dispatcher(**kwargs):
+    manager = _FakeManager()
+    return NotificationDispatcher(manager=manager, **kwargs), manager
+
+
+def test_repeats_are_coalesced_per_title_and_group():
+    dispatcher, manager = _dispatcher(coalesce_window=60)
+    for i in range(3):
+        dispatcher.send(f"High CPU #{i}", f"python at 9{i}%", 'HIGH', group='pid:1')
+    for i in range(2):
+        dispatcher.send("High CPU", f"node at 8{i}%", 'HIGH', group='pid:2')
+    dispatcher.send("New connection", "10.0.0.5:443", 'HIGH', group='pid:1')
+    dispatcher.close()
+
+    assert sorted(manager.sent) == sorted([
+        ("High CPU #0", "python at 90%", 'HIGH', 'pid:1'),
+        ("High CPU", "node at 80%", 'HIGH', 'pid:2'),
+        ("New connection", "10.0.0.5:443", 'HIGH', 'pid:1'),
+        # Summaries sent when the windows are flushed on close
+        ("High CPU #2", "python at 92% (+1 more alerts)", 'HIGH', 'pid:1'),
+        ("High CPU", "node at 81%", 'HIGH', 'pid:2'),
+    ])
+    assert dispatcher.stats == {'queued': 6, 'delivered': 5, 'coalesced': 3, 'dropped': 0, 'failed': 0}
+
+
+def test_rate_limit_applies_per_severity():
+    dispatcher, manager = _dispatcher(coalesce_window=0, rate_limits={'low': 2})
+    for i in range(5):
+        dispatcher.send(f"Low alert {i}", "m", 'LOW')
+        dispatcher.send(f"Critical alert {i}", "m", 'CRITICAL')
+    dispatcher.close()
+
+    sent = [title for title, _, _, _ in manager.sent]
+    assert [t for t in sent if t.startswith('Low')] == ["Low alert 0", "Low alert 1"]
+    assert len([t for t in sent if t.startswith('Critical')]) == 5
+    assert dispatcher.stats['dropped'] == 3
+
+
+def test_summary_without_tokens_is_dropped_on_close():
+    dispatcher, manager = _dispatcher(coalesce_window=60, rate_limits={'MEDIUM': 1})
+    for _ in range(3):
+        dispatcher.send("Disk almost full", "/var at 95%", 'MEDIUM')
+    dispatcher.close()
+
+    assert len(manager.sent) == 1
+    assert dispatcher.stats == {'queued': 3, 'delivered': 1, 'coalesced': 2, 'dropped': 2, 'failed': 0}
+
+
+def test_stats_add_up_across_sending_threads():
+    dispatcher, manager = _dispatcher(coalesce_window=60, max_queue=50)
+
+    def burst(thread):
+        for i in range(200):
+            dispatcher.send(f"Alert {thread}-{i}", "m", 'CRITICAL')
+
+    threads = [threading.Thread(target=burst, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dispatcher.close()
+
+    stats = dispatcher.stats
+    assert stats['queued'] + stats['dropped'] == 800
+    assert stats['delivered'] == len(manager.sent) == stats['queued']
+
+
+def test_send_after_close_is_refused():
+    dispatcher, manager = _dispatcher()
+    dispatcher.close()
+    assert dispatcher.send("late", "m") is False
+    assert manager.sent == []
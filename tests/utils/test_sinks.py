@@ -0,0 +1,147 @@
+"""
+WebhookSink tests against a local http.server stand-in
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+from utils import sinks
+from utils.sinks import AlertSink, WebhookSink, build_alert
+
+
+class _Endpoint:
+    """Local webhook receiver that answers with scripted status codes (then 200)"""
+
+    def __init__(self):
+        self.batches = []
+        self.statuses = []
+        self.requests = 0
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                endpoint.requests += 1
+                status = endpoint.statuses.pop(0) if endpoint.statuses else 200
+                if status < 300:
+                    endpoint.batches.append(json.loads(body)['alerts'])
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/alerts"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def delivered(self):
+        return [alert['title'] for batch in self.batches for alert in batch]
+
+
+@pytest.fixture
+def endpoint():
+    server = _Endpoint()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    # Retries sleep for backoff * uniform(0.5, 1.0); keep the tests fast
+    monkeypatch.setattr(sinks.random, 'uniform', lambda a, b: 0.0)
+
+
+def _alerts(count):
+    return [build_alert('test', 'HIGH', f"alert {i}", f"message {i}") for i in range(count)]
+
+
+def _sink(endpoint, tmp_path, **kwargs):
+    kwargs.setdefault('batch_interval', 3600)
+    return WebhookSink(endpoint.url, spool_path=str(tmp_path / 'spool.jsonl'), timeout=5, **kwargs)
+
+
+def test_alerts_are_sent_in_batches(endpoint, tmp_path):
+    sink = _sink(endpoint, tmp_path, batch_size=3)
+    for alert in _alerts(7):
+        sink.emit(alert)
+    assert [len(batch) for batch in endpoint.batches] == [3, 3]
+    sink.close()
+    assert [len(batch) for batch in endpoint.batches] == [3, 3, 1]
+    assert endpoint.delivered == [f"alert {i}" for i in range(7)]
+    assert sink.stats['sent'] == 7
+
+
+def test_flush_waits_for_batch_interval(endpoint, tmp_path):
+    sink = _sink(endpoint, tmp_path, batch_size=10)
+    sink.emit(_alerts(1)[0])
+    sink.flush()
+    assert endpoint.requests == 0
+    sink.batch_interval = 0
+    sink.flush()
+    assert endpoint.delivered == ['alert 0']
+    sink.close()
+
+
+def test_5xx_is_retried(endpoint, tmp_path):
+    endpoint.statuses = [503, 502]
+    sink = _sink(endpoint, tmp_path, batch_size=2, max_retries=3)
+    for alert in _alerts(2):
+        sink.emit(alert)
+    assert endpoint.requests == 3
+    assert endpoint.delivered == ['alert 0', 'alert 1']
+    assert sink.stats == {'sent': 2, 'spooled': 0, 'failed_batches': 0}
+    sink.close()
+
+
+def test_rejected_batch_is_not_retried_or_spooled(endpoint, tmp_path):
+    endpoint.statuses = [400]
+    sink = _sink(endpoint, tmp_path, batch_size=1)
+    sink.emit(_alerts(1)[0])
+    assert endpoint.requests == 1
+    assert sink.stats['failed_batches'] == 1
+    assert not (tmp_path / 'spool.jsonl').exists()
+    sink.close()
+
+
+def test_unreachable_batches_are_spooled_and_drained(endpoint, tmp_path):
+    endpoint.statuses = [503] * 2
+    sink = _sink(endpoint, tmp_path, batch_size=2, max_retries=1)
+    for alert in _alerts(2):
+        sink.emit(alert)
+    assert sink.stats['spooled'] == 2
+    assert len((tmp_path / 'spool.jsonl').read_text().splitlines()) == 2
+
+    # The next successful batch resends the spooled backlog
+    for alert in _alerts(4)[2:]:
+        sink.emit(alert)
+    sink.close()
+    assert sorted(endpoint.delivered) == [f"alert {i}" for i in range(4)]
+    assert not (tmp_path / 'spool.jsonl').exists()
+
+
+def test_close_flushes_partial_batch(endpoint, tmp_path):
+    sink = _sink(endpoint, tmp_path, batch_size=50)
+    for alert in _alerts(3):
+        sink.emit(alert)
+    assert endpoint.requests == 0
+    sink.close()
+    assert len(endpoint.batches) == 1
+    assert endpoint.delivered == ['alert 0', 'alert 1', 'alert 2']
+
+
+def test_alert_sink_requires_emit():
+    with pytest.raises(TypeError):
+        AlertSink()
@@ -1,8 +1,25 @@
 """Utility modules for Jarvis"""
 
-from utils.config import get_config_path, load_config, save_config
-from utils.notifications import NotificationManager
-from utils.system_info import SystemInfo
+import importlib
 
-__all__ = ['get_config_path', 'load_config', 'save_config', 'NotificationManager', 'SystemInfo']
+# Exports resolve on first use so light callers (the thin CLI client) only load utils.config
+_EXPORTS = {
+    'get_config_path': 'utils.config',
+    'load_config': 'utils.config',
+    'save_config': 'utils.config',
+    'NotificationManager': 'utils.notifications',
+    'NotificationDispatcher': 'utils.dispatcher',
+    'AlertRouter': 'utils.sinks',
+    'WebhookSink': 'utils.sinks',
+    'SyslogSink': 'utils.sinks',
+    'FileSink': 'utils.sinks',
+    'SystemInfo': 'utils.system_info',
+}
 
+__all__ = ['get_config_path', 'load_config', 'save_config', 'NotificationManager', 'NotificationDispatcher', 'AlertRouter', 'WebhookSink', 'SyslogSink', 'FileSink', 'SystemInfo']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'utils' has no attribute {name!r}")
@@ -0,0 +1,141 @@
+"""
+Native D-Bus notification backend for Linux
+Keeps one session-bus connection to org.freedesktop.Notifications instead of forking notify-send
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    JEEPNEY_AVAILABLE = True
+except ImportError:
+    JEEPNEY_AVAILABLE = False
+
+try:
+    import dbus
+    DBUS_PYTHON_AVAILABLE = True
+except ImportError:
+    DBUS_PYTHON_AVAILABLE = False
+
+
+BUS_NAME = 'org.freedesktop.Notifications'
+OBJECT_PATH = '/org/freedesktop/Notifications'
+INTERFACE = 'org.freedesktop.Notifications'
+
+# Freedesktop urgency levels: 0 low, 1 normal, 2 critical
+URGENCY = {'LOW': 0, 'INFO': 1, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 2}
+
+
+class DBusNotifier:
+    """Send notifications over a persistent D-Bus session connection (jeepney or dbus-python)"""
+
+    def __init__(self, app_name: str = 'Jarvis', timeout: float = 2.0, max_tracked: int = 256):
+        """
+        Initialize notifier
+
+        Args:
+            app_name: Application name shown by the notification server
+            timeout: Seconds to wait for the server's reply
+            max_tracked: Number of notification IDs remembered for in-place updates
+        """
+        self.app_name = app_name
+        self.timeout = timeout
+        self.max_tracked = max_tracked
+        self.backend: Optional[str] = None
+        self._conn = None
+        self._iface = None
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def connect(self) -> bool:
+        """Open the session-bus connection, returning False if D-Bus is unavailable"""
+        with self._lock:
+            return self._connect()
+
+    def _connect(self) -> bool:
+        if self._conn is not None or self._iface is not None:
+            return True
+        if JEEPNEY_AVAILABLE:
+            try:
+                self._conn = open_dbus_connection(bus='SESSION')
+                self._address = DBusAddress(OBJECT_PATH, bus_name=BUS_NAME, interface=INTERFACE)
+                self.backend = 'jeepney'
+                return True
+            except Exception:
+                self._conn = None
+        if DBUS_PYTHON_AVAILABLE:
+            try:
+                bus = dbus.SessionBus()
+                self._iface = dbus.Interface(bus.get_object(BUS_NAME, OBJECT_PATH), INTERFACE)
+                self.backend = 'dbus-python'
+                return True
+            except Exception:
+                self._iface = None
+        return False
+
+    def close(self) -> None:
+        """Close the session-bus connection"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+            self._conn = None
+            self._iface = None
+            self.backend = None
+
+    def notify(self, title: str, message: str, key: Optional[str] = None,
+               severity: str = 'INFO') -> bool:
+        """
+        Show a notification, replacing the previous one sent with the same key
+
+        Args:
+            title: Notification summary
+            message: Notification body
+            key: Identity of the alert - repeats update the existing popup in place
+            severity: Alert severity, mapped to the freedesktop urgency hint
+
+        Returns:
+            True if the server accepted the notification
+        """
+        with self._lock:
+            if not self._connect():
+                return False
+            replaces_id = self._ids.get(key, 0) if key else 0
+            urgency = URGENCY.get(str(severity).upper(), 1)
+            try:
+                notification_id = self._call(replaces_id, title, message, urgency)
+            except Exception:
+                # Stale connection (e.g. session bus restarted) - reconnect once
+                self._conn = None
+                self._iface = None
+                if not self._connect():
+                    return False
+                try:
+                    notification_id = self._call(replaces_id, title, message, urgency)
+                except Exception:
+                    return False
+
+            if key:
+                self._ids[key] = notification_id
+                self._ids.move_to_end(key)
+                while len(self._ids) > self.max_tracked:
+                    self._ids.popitem(last=False)
+            return True
+
+    def _call(self, replaces_id: int, title: str, message: str, urgency: int) -> int:
+        """Invoke org.freedesktop.Notifications.Notify and return the notification ID"""
+        if self._conn is not None:
+            msg = new_method_call(self._address, 'Notify', 'susssasa{sv}i', (
+                self.app_name, replaces_id, '', title, message, [], {'urgency': ('y', urgency)}, -1
+            ))
+            reply = self._conn.send_and_get_reply(msg, timeout=self.timeout)
+            return int(reply.body[0])
+        return int(self._iface.Notify(
+            self.app_name, dbus.UInt32(replaces_id), '', title, message, dbus.Array([], signature='s'),
+            {'urgency': dbus.Byte(urgency)}, -1, timeout=self.timeout
+        ))
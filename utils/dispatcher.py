@@ -0,0 +1,214 @@
+"""
+Asynchronous notification dispatcher
+Delivers desktop notifications from a background worker with coalescing and per-severity rate limits
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from utils.notifications import NotificationManager, coalesce_key
+from utils.metrics import QUEUE_DEPTH, QUEUE_DROPPED
+
+
+# Notifications per minute for each severity (None = unlimited)
+DEFAULT_RATE_LIMITS = {
+    'CRITICAL': None,
+    'HIGH': 30,
+    'MEDIUM': 12,
+    'LOW': 6,
+    'INFO': 12,
+}
+
+class NotificationDispatcher:
+    """Queue notifications and deliver them on a worker thread, never blocking the caller"""
+
+    def __init__(self, manager: Optional[NotificationManager] = None, max_queue: int = 100,
+                 coalesce_window: float = 10.0, rate_limits: Optional[Dict[str, Optional[float]]] = None,
+                 debug: bool = False):
+        """
+        Initialize dispatcher
+
+        Args:
+            manager: Notification manager used for delivery
+            max_queue: Maximum queued notifications (extra ones are dropped)
+            coalesce_window: Seconds during which repeats of a title are folded into one summary
+            rate_limits: Notifications per minute by severity (None = unlimited)
+            debug: Print dispatcher diagnostics
+        """
+        self.manager = manager or NotificationManager(debug=debug)
+        self.coalesce_window = max(0.0, coalesce_window)
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update({k.upper(): v for k, v in rate_limits.items()})
+        self.debug = debug
+
+        # Updated from caller threads (send) and the worker thread
+        self.stats = {'queued': 0, 'delivered': 0, 'coalesced': 0, 'dropped': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._windows: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, Dict[str, float]] = {}
+        self._closed = False
+        QUEUE_DEPTH.set_function(self._queue.qsize, queue='notifications')
+        self._worker = threading.Thread(target=self._run, name="jarvis-notify", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], debug: bool = False) -> 'NotificationDispatcher':
+        """Build a dispatcher from notify_backend, notify_queue_size, notify_coalesce_window and notify_rate_limits"""
+        return cls(
+            manager=NotificationManager(debug=debug, backend=config.get('notify_backend', 'auto')),
+            max_queue=int(config.get('notify_queue_size', 100)),
+            coalesce_window=float(config.get('notify_coalesce_window', 10.0)),
+            rate_limits=config.get('notify_rate_limits'),
+            debug=debug
+        )
+
+    def send(self, title: str, message: str, severity: str = 'INFO', group: Optional[str] = None) -> bool:
+        """
+        Queue a notification for delivery
+
+        Args:
+            title: Notification title
+            message: Notification message
+            severity: CRITICAL, HIGH, MEDIUM, LOW or INFO
+            group: Subject of the alert (process, remote address); only repeats within a group are coalesced
+
+        Returns:
+            True if queued, False if the queue was full or the dispatcher is closed
+        """
+        if self._closed:
+            return False
+        item = {'title': title, 'message': message, 'severity': str(severity or 'INFO').upper(), 'group': group}
+        try:
+            self._queue.put_nowait(item)
+            self._count('queued')
+            return True
+        except queue.Full:
+            self._count('dropped')
+            QUEUE_DROPPED.inc(queue='notifications')
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Deliver queued notifications and pending summaries, then stop the worker"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._worker.join(timeout)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _run(self) -> None:
+        """Worker loop: deliver, coalesce and flush expired windows"""
+        while True:
+            timeout = self._next_expiry()
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            if item is None:
+                # Shutdown - drain what's left, then send every pending summary
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item:
+                        self._handle(item)
+                self._flush(force=True)
+                return
+            if item:
+                self._handle(item)
+            self._flush()
+
+    def _next_expiry(self) -> Optional[float]:
+        """Seconds until the earliest coalescing window closes (None = wait indefinitely)"""
+        if not self._windows:
+            return None
+        soonest = min(window['expires'] for window in self._windows.values())
+        return max(0.0, soonest - time.monotonic())
+
+    def _allow(self, severity: str) -> bool:
+        """Take a token from the severity's bucket"""
+        rate = self.rate_limits.get(severity, self.rate_limits.get('INFO'))
+        if not rate:
+            return True
+        now = time.monotonic()
+        bucket = self._tokens.setdefault(severity, {'tokens': float(rate), 'updated': now})
+        bucket['tokens'] = min(float(rate), bucket['tokens'] + (now - bucket['updated']) * rate / 60.0)
+        bucket['updated'] = now
+        if bucket['tokens'] >= 1.0:
+            bucket['tokens'] -= 1.0
+            return True
+        return False
+
+    def _handle(self, item: Dict[str, Any]) -> None:
+        """Deliver a notification, or fold it into its title's open window"""
+        key = coalesce_key(item['title'], item.get('group'))
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window and now < window['expires']:
+            window['pending'] += 1
+            window['last'] = item
+            self._count('coalesced')
+            return
+
+        if self._allow(item['severity']):
+            self._deliver(item)
+            pending = 0
+        elif self.coalesce_window:
+            pending = 1
+            self._count('coalesced')
+        else:
+            self._count('dropped')
+            return
+        if self.coalesce_window:
+            self._windows[key] = {'expires': now + self.coalesce_window, 'pending': pending, 'last': item}
+
+    def _flush(self, force: bool = False) -> None:
+        """Send one summary per expired window that absorbed repeats (summaries take rate-limit tokens too)"""
+        now = time.monotonic()
+        for key, window in list(self._windows.items()):
+            if not force and now < window['expires']:
+                continue
+            del self._windows[key]
+            pending = window['pending']
+            if not pending:
+                continue
+            last = window['last']
+            if not self._allow(last['severity']):
+                if force:
+                    self._count('dropped', pending)
+                else:
+                    # Out of tokens - hold the summary and keep folding repeats into it
+                    self._windows[key] = {'expires': now + self.coalesce_window, 'pending': pending, 'last': last}
+                continue
+            if pending == 1:
+                self._deliver(last)
+            else:
+                self._deliver(last, f"{last['message']} (+{pending - 1} more alerts)")
+            if not force:
+                # Keep coalescing while the burst continues
+                self._windows[key] = {'expires': now + self.coalesce_window, 'pending': 0, 'last': last}
+
+    def _deliver(self, item: Dict[str, Any], message: Optional[str] = None) -> None:
+        """Hand a notification to the platform backend (severity picks the D-Bus urgency)"""
+        try:
+            if self.manager.send(item['title'], message or item['message'], severity=item['severity'],
+                                 group=item.get('group')):
+                self._count('delivered')
+            else:
+                self._count('failed')
+        except Exception as e:
+            self._count('failed')
+            if self.debug:
+                print(f"⚠️  Notification error: {e}")
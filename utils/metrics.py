@@ -0,0 +1,284 @@
+"""
+Metrics registry and /metrics endpoint
+Counters, gauges and histograms rendered in the Prometheus text exposition format, so long-running
+monitors can be scraped (or checked with curl) instead of watched through their status lines
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable
+
+
+# Seconds; spans fast local work up to slow AI calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    text = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f'{{{text}}}' if text else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        """
+        Initialize metric
+
+        Args:
+            name: Metric name (jarvis_ prefix, _total suffix for counters)
+            help_text: One-line description shown in the exposition
+            labelnames: Label names every sample carries
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[Dict[str, Any], float]]]] = []
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def set_function(self, func: Callable[[], float], **labels: Any) -> None:
+        """Read this sample from a callable at scrape time (e.g. a queue size or an existing stats counter)"""
+        with self._lock:
+            self._functions[self._key(labels)] = func
+
+    def add_collector(self, func: Callable[[], Iterable[Tuple[Dict[str, Any], float]]]) -> None:
+        """Read a variable set of (labels, value) samples from a callable at scrape time"""
+        with self._lock:
+            self._collectors.append(func)
+
+    def _scalar_samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+            collectors = list(self._collectors)
+        for key, func in functions.items():
+            try:
+                values[key] = float(func())
+            except Exception:
+                continue
+        for collector in collectors:
+            try:
+                for labels, value in collector():
+                    values[self._key(labels)] = float(value)
+            except Exception:
+                continue
+        return [('', tuple(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """(name suffix, label pairs, value) for every sample"""
+        return self._scalar_samples()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            states = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        samples = []
+        for key, (counts, total, count) in sorted(states.items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', labels + (('le', _format_value(bound)),), cumulative))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics; asking for an existing name returns the same metric"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames: Tuple[str, ...], **options) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered as a different {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared by several modules
+START_TIME = REGISTRY.gauge('jarvis_start_time_seconds', 'Unix time the Jarvis process started')
+START_TIME.set(time.time())
+CACHE_REQUESTS = REGISTRY.counter('jarvis_cache_requests_total', 'Cache lookups by cache and result (hit/miss)',
+                                  ('cache', 'result'))
+QUEUE_DEPTH = REGISTRY.gauge('jarvis_queue_depth', 'Items waiting in internal queues', ('queue',))
+QUEUE_DROPPED = REGISTRY.counter('jarvis_queue_dropped_total', 'Items dropped because a queue was full', ('queue',))
+MONITOR_CYCLE_SECONDS = REGISTRY.histogram('jarvis_monitor_cycle_seconds', 'Duration of one monitor polling cycle',
+                                           ('monitor',))
+MONITOR_ALERTS = REGISTRY.counter('jarvis_monitor_alerts_total', 'Alerts raised by monitor, activity type and severity',
+                                  ('monitor', 'type', 'severity'))
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving the registry at /metrics"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = '127.0.0.1', port: int = 9464):
+        """
+        Initialize metrics server
+
+        Args:
+            registry: Metrics to expose
+            host: Interface to bind (keep it local unless the port is firewalled)
+            port: Port to bind (0 picks a free one)
+        """
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], port: Optional[int] = None) -> Optional['MetricsServer']:
+        """Build a server from metrics_port and metrics_host config keys (None when metrics are off)"""
+        port = port if port is not None else config.get('metrics_port')
+        if port is None or port is False:
+            return None
+        return cls(REGISTRY, host=config.get('metrics_host', '127.0.0.1'), port=int(port))
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the metrics URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='jarvis-metrics', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -4,24 +4,54 @@ Supports macOS, Linux, and Windows
 """
 
 import platform
+import re
 import subprocess
 from typing import Optional
 
+from utils.dbus_notify import DBusNotifier
+
+
+# Alert counters ("Alert #12") would otherwise make every title unique
+_COUNTER_PATTERN = re.compile(r'\s*#\d+')
+
+
+def coalesce_key(title: str, group: Optional[str] = None) -> str:
+    """Normalize a notification title so repeated alerts share a key (group keeps unrelated subjects apart)"""
+    key = _COUNTER_PATTERN.sub('', str(title)).strip().lower()
+    return f"{key}|{group}" if group else key
+
 
 class NotificationManager:
     """Manages desktop notifications across different platforms"""
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, backend: str = 'auto'):
+        """
+        Initialize notification manager
+        
+        Args:
+            debug: Print delivery diagnostics
+            backend: Linux backend - 'auto' (D-Bus, falling back to notify-send), 'dbus' or 'notify-send'
+        """
         self.debug = debug
         self.system = platform.system()
+        self.backend = backend
+        self.dbus: Optional[DBusNotifier] = None
+        if self.system == "Linux" and backend in ('auto', 'dbus'):
+            notifier = DBusNotifier()
+            if notifier.connect():
+                self.dbus = notifier
+            elif debug and backend == 'dbus':
+                print("⚠️  D-Bus session bus unavailable (pip install jeepney), using notify-send")
     
-    def send(self, title: str, message: str) -> bool:
+    def send(self, title: str, message: str, severity: str = 'INFO', group: Optional[str] = None) -> bool:
         """
-        Send a desktop notification
+        Send a desktop notification (blocks until the platform command returns)
         
         Args:
             title: Notification title
             message: Notification message
+            severity: Alert severity (D-Bus urgency; NotificationDispatcher also rate-limits by it)
+            group: Subject of the alert (process, remote address); only repeats within a group replace each other
             
         Returns:
             True if notification was sent successfully, False otherwise
@@ -34,6 +64,10 @@ class NotificationManager:
             if self.system == "Darwin":  # macOS
                 return self._send_macos(title, message)
             elif self.system == "Linux":
+                if self.dbus and self.dbus.notify(title, message, key=coalesce_key(title, group), severity=severity):
+                    if self.debug:
+                        print(f"✅ Notification sent: {title}")
+                    return True
                 return self._send_linux(title, message)
             elif self.system == "Windows":
                 return self._send_windows(title, message)
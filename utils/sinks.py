@@ -0,0 +1,435 @@
+"""
+Alert sinks for headless monitoring
+Fan monitor alerts out to webhooks, syslog (RFC 5424) and rotating JSONL files without blocking detection
+"""
+
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+from utils.config import get_config_path
+from utils.metrics import QUEUE_DEPTH, QUEUE_DROPPED
+
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# RFC 5424 severities (crit, err, warning, notice, info)
+SYSLOG_SEVERITY = {'CRITICAL': 2, 'HIGH': 3, 'MEDIUM': 4, 'LOW': 5, 'INFO': 6, 'UNKNOWN': 5}
+SYSLOG_FACILITY = {
+    'kern': 0, 'user': 1, 'daemon': 3, 'auth': 4, 'syslog': 5, 'authpriv': 10,
+    'local0': 16, 'local1': 17, 'local2': 18, 'local3': 19,
+    'local4': 20, 'local5': 21, 'local6': 22, 'local7': 23,
+}
+# Private enterprise number used in structured data IDs (RFC 5424 example PEN)
+SD_ID = 'jarvis@32473'
+
+
+def build_alert(source: str, severity: str, title: str, message: str,
+                details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build an alert record shared by all sinks"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'host': socket.gethostname(),
+        'source': source,
+        'severity': str(severity or 'INFO').upper(),
+        'title': title,
+        'message': message,
+        'details': details or {},
+    }
+
+
+class AlertSink(ABC):
+    """Base class for alert sinks (called from the sink's own worker thread)"""
+
+    name = 'sink'
+
+    @abstractmethod
+    def emit(self, alert: Dict[str, Any]) -> None:
+        """Deliver or buffer one alert"""
+        pass
+
+    def flush(self) -> None:
+        """Deliver buffered alerts (called periodically and on shutdown)"""
+
+    def close(self) -> None:
+        """Flush and release resources"""
+        self.flush()
+
+
+class WebhookSink(AlertSink):
+    """POST alerts in JSON batches over a pooled session, spooling to disk when the endpoint is down"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, batch_size: int = 50, batch_interval: float = 5.0,
+                 max_retries: int = 3, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None,
+                 spool_path: Optional[str] = None, spool_max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize webhook sink
+
+        Args:
+            url: Endpoint receiving {"alerts": [...]} POSTs
+            batch_size: Send once this many alerts are buffered
+            batch_interval: Send buffered alerts at least this often (seconds)
+            max_retries: Retries per batch for connection errors and 408/429/5xx
+            timeout: Request timeout (seconds)
+            headers: Extra request headers (e.g. Authorization)
+            spool_path: File holding undelivered alerts (default: ~/.jarvis/spool/webhook.jsonl)
+            spool_max_bytes: Stop spooling beyond this size (oldest alerts are kept)
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ValueError("requests module not found. Please install it: pip3 install requests")
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.spool_path = Path(spool_path) if spool_path else get_config_path().parent / "spool" / "webhook.jsonl"
+        self.spool_max_bytes = spool_max_bytes
+
+        # One keep-alive connection pool for every batch
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.headers.update({'Content-Type': 'application/json', 'User-Agent': 'jarvis-monitor'})
+        if headers:
+            self.session.headers.update(headers)
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_send = time.monotonic()
+        self.stats = {'sent': 0, 'spooled': 0, 'failed_batches': 0}
+
+    def emit(self, alert: Dict[str, Any]) -> None:
+        self._buffer.append(alert)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the buffer (and any spooled backlog) if a batch is due"""
+        due = self._buffer and (len(self._buffer) >= self.batch_size or
+                                time.monotonic() - self._last_send >= self.batch_interval)
+        if due:
+            self._send_buffer()
+        elif not self._buffer and self.spool_path.exists() and \
+                time.monotonic() - self._last_send >= self.batch_interval:
+            self._last_send = time.monotonic()
+            self._drain_spool()
+
+    def close(self) -> None:
+        if self._buffer:
+            self._send_buffer()
+        self.session.close()
+
+    def _send_buffer(self) -> None:
+        batch, self._buffer = self._buffer, []
+        self._last_send = time.monotonic()
+        if self._post(batch):
+            self._drain_spool()
+        else:
+            self._spool(batch)
+
+    def _post(self, batch: List[Dict[str, Any]]) -> bool:
+        """POST one batch with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=json.dumps({'alerts': batch}), timeout=self.timeout)
+                if response.status_code < 300:
+                    self.stats['sent'] += len(batch)
+                    return True
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # Rejected payloads won't succeed later either - don't spool them
+                    print(f"⚠️  Webhook rejected {len(batch)} alerts (HTTP {response.status_code})")
+                    self.stats['failed_batches'] += 1
+                    return True
+            except requests.exceptions.RequestException:
+                pass
+            if attempt < self.max_retries:
+                time.sleep(min(30.0, 0.5 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+        self.stats['failed_batches'] += 1
+        return False
+
+    def _spool(self, batch: List[Dict[str, Any]]) -> None:
+        """Append an undelivered batch to the on-disk spool"""
+        try:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.spool_path.exists() and self.spool_path.stat().st_size >= self.spool_max_bytes:
+                return
+            with open(self.spool_path, 'a', encoding='utf-8') as f:
+                for alert in batch:
+                    f.write(json.dumps(alert, default=str) + "\n")
+            self.stats['spooled'] += len(batch)
+        except OSError as e:
+            print(f"⚠️  Could not spool webhook alerts: {e}")
+
+    def _drain_spool(self) -> None:
+        """Resend spooled alerts after the endpoint recovers"""
+        if not self.spool_path.exists():
+            return
+        draining = self.spool_path.with_suffix('.draining')
+        try:
+            os.replace(self.spool_path, draining)
+            with open(draining, 'r', encoding='utf-8') as f:
+                alerts = []
+                for line in f:
+                    try:
+                        alerts.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except OSError:
+            return
+
+        for i in range(0, len(alerts), self.batch_size):
+            batch = alerts[i:i + self.batch_size]
+            if not self._post(batch):
+                # Still down - put the rest back for next time
+                self._spool(alerts[i:])
+                break
+        try:
+            draining.unlink()
+        except OSError:
+            pass
+
+
+class SyslogSink(AlertSink):
+    """RFC 5424 syslog over UDP, TCP (octet-counted framing) or a local Unix socket"""
+
+    name = 'syslog'
+
+    def __init__(self, address: str = '/dev/log', protocol: str = 'udp', facility: str = 'user',
+                 app_name: str = 'jarvis'):
+        """
+        Initialize syslog sink
+
+        Args:
+            address: 'host:port' for udp/tcp, or a socket path for protocol 'unix'
+            protocol: 'udp', 'tcp' or 'unix'
+            facility: Syslog facility name (user, daemon, auth, local0-7, ...)
+            app_name: APP-NAME field
+        """
+        self.protocol = protocol if not address.startswith('/') else 'unix'
+        self.address = address
+        self.facility = SYSLOG_FACILITY.get(facility, 1)
+        self.app_name = app_name
+        self.hostname = socket.gethostname() or '-'
+        self.procid = str(os.getpid())
+        self._sock: Optional[socket.socket] = None
+
+    def _connect(self) -> socket.socket:
+        if self._sock is not None:
+            return self._sock
+        if self.protocol == 'unix':
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.connect(self.address)
+        else:
+            host, _, port = self.address.rpartition(':')
+            kind = socket.SOCK_STREAM if self.protocol == 'tcp' else socket.SOCK_DGRAM
+            sock = socket.socket(socket.AF_INET, kind)
+            sock.settimeout(5.0)
+            sock.connect((host or 'localhost', int(port or 514)))
+        self._sock = sock
+        return sock
+
+    @staticmethod
+    def _sd_escape(value: Any) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(']', '\\]')
+
+    def format(self, alert: Dict[str, Any]) -> bytes:
+        """Render an alert as an RFC 5424 message"""
+        pri = self.facility * 8 + SYSLOG_SEVERITY.get(alert.get('severity', 'INFO'), 6)
+        msgid = str(alert.get('source', '-'))[:32] or '-'
+        params = {'severity': alert.get('severity'), 'title': alert.get('title')}
+        for key, value in (alert.get('details') or {}).items():
+            if isinstance(value, (str, int, float)) and value != '':
+                params[key] = value
+        sd = '[' + SD_ID + ''.join(
+            f' {key[:32]}="{self._sd_escape(value)}"' for key, value in params.items()
+            if key.isidentifier()
+        ) + ']'
+        header = f"<{pri}>1 {alert.get('timestamp', '-')} {self.hostname} {self.app_name} {self.procid} {msgid} {sd} "
+        return header.encode('utf-8') + b'\xef\xbb\xbf' + str(alert.get('message', '')).encode('utf-8')
+
+    def emit(self, alert: Dict[str, Any]) -> None:
+        data = self.format(alert)
+        if self.protocol == 'tcp':
+            data = f"{len(data)} ".encode('ascii') + data
+        for attempt in range(2):
+            try:
+                sock = self._connect()
+                if self.protocol == 'tcp':
+                    sock.sendall(data)
+                else:
+                    sock.send(data)
+                return
+            except OSError as e:
+                self.close()
+                if attempt:
+                    print(f"⚠️  Syslog delivery failed: {e}")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+class FileSink(AlertSink):
+    """Append alerts to a JSONL file, rotating it by size"""
+
+    name = 'file'
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        """
+        Initialize file sink
+
+        Args:
+            path: JSONL file (default: ~/.jarvis/alerts.jsonl)
+            max_bytes: Rotate when the file would exceed this size
+            backups: Number of rotated files kept (alerts.jsonl.1 ... .N)
+        """
+        self.path = Path(path).expanduser() if path else get_config_path().parent / "alerts.jsonl"
+        self.max_bytes = max_bytes
+        self.backups = max(0, backups)
+        self._handle = None
+
+    def _open(self):
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        return self._handle
+
+    def _rotate(self) -> None:
+        self.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def emit(self, alert: Dict[str, Any]) -> None:
+        line = json.dumps(alert, default=str) + "\n"
+        handle = self._open()
+        if self.max_bytes and handle.tell() and handle.tell() + len(line) > self.max_bytes:
+            self._rotate()
+            handle = self._open()
+        handle.write(line)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def create_alert_sink(spec: Dict[str, Any]) -> AlertSink:
+    """Create a sink from a config entry such as {"type": "webhook", "url": "..."}"""
+    options = dict(spec)
+    kind = options.pop('type', None)
+    sinks = {'webhook': WebhookSink, 'syslog': SyslogSink, 'file': FileSink}
+    if kind not in sinks:
+        raise ValueError(f"Unknown alert sink type: {kind} (choose from {', '.join(sinks)})")
+    return sinks[kind](**options)
+
+
+class AlertRouter:
+    """Fan alerts out to sinks, each on its own worker thread with a bounded queue"""
+
+    def __init__(self, sinks: List[AlertSink], max_queue: int = 1000, flush_interval: float = 1.0):
+        """
+        Initialize router
+
+        Args:
+            sinks: Sinks receiving every alert
+            max_queue: Alerts buffered per sink before new ones are dropped
+            flush_interval: How often idle workers flush their sink (seconds)
+        """
+        self.sinks = sinks
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._closed = False
+        self._queues: List["queue.Queue[Optional[Dict[str, Any]]]"] = []
+        self._workers: List[threading.Thread] = []
+        for sink in sinks:
+            q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max(1, max_queue))
+            worker = threading.Thread(target=self._run, args=(sink, q), name=f"jarvis-alerts-{sink.name}",
+                                      daemon=True)
+            self._queues.append(q)
+            self._workers.append(worker)
+            QUEUE_DEPTH.set_function(q.qsize, queue=f"alerts_{sink.name}")
+            worker.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['AlertRouter']:
+        """Build a router from the alert_sinks config list (None when no sinks are configured)"""
+        sinks = []
+        for spec in config.get('alert_sinks', []):
+            try:
+                sinks.append(create_alert_sink(spec))
+            except (TypeError, ValueError) as e:
+                print(f"⚠️  Ignoring alert sink {spec.get('type')}: {e}")
+        if not sinks:
+            return None
+        return cls(sinks, max_queue=int(config.get('alert_queue_size', 1000)))
+
+    def emit(self, alert: Dict[str, Any]) -> None:
+        """Queue an alert for every sink without blocking"""
+        if self._closed:
+            return
+        for sink, q in zip(self.sinks, self._queues):
+            try:
+                q.put_nowait(alert)
+            except queue.Full:
+                self.dropped += 1
+                QUEUE_DROPPED.inc(queue=f"alerts_{sink.name}")
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Deliver queued alerts, flush every sink and stop the workers"""
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        for q in self._queues:
+            try:
+                q.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+    def _run(self, sink: AlertSink, q: "queue.Queue[Optional[Dict[str, Any]]]") -> None:
+        while True:
+            try:
+                alert = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                alert = False
+            try:
+                if alert is None:
+                    sink.close()
+                    return
+                if alert:
+                    sink.emit(alert)
+                sink.flush()
+            except Exception as e:
+                print(f"⚠️  Alert sink {sink.name} error: {e}")
@@ -7,6 +7,8 @@ import platform
 import socket
 from typing import Dict, Any, Optional
 
+from utils.tracing import traced
+
 try:
     import psutil
     PSUTIL_AVAILABLE = True
@@ -34,6 +36,7 @@ class SystemInfo:
             return '127.0.0.1'
     
     @staticmethod
+    @traced('system_info.machine_details')
     def get_machine_details() -> Dict[str, Any]:
         """Get comprehensive machine details"""
         if not PSUTIL_AVAILABLE:
@@ -105,6 +108,7 @@ class SystemInfo:
         }
     
     @staticmethod
+    @traced('system_info.collect')
     def get_system_info_string() -> str:
         """Get system information as formatted string"""
         try:
@@ -0,0 +1,223 @@
+"""
+Span-based timing instrumentation
+Hot paths wrap their stages in span(); while tracing is off a span is a shared no-op object,
+so instrumented code pays one global lookup. When on, spans are aggregated per stage for the
+--timings report and can be exported as Chrome trace-event JSON (chrome://tracing, Perfetto).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, List
+
+
+class _NullSpan:
+    """Span used while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# The active tracer; None means tracing is off
+_tracer: Optional['Tracer'] = None
+
+
+class Span:
+    """One timed stage; nested spans on the same thread are subtracted from their parent's self time"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'start', 'child_ns')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0
+        self.child_ns = 0
+
+    def __enter__(self) -> 'Span':
+        self.tracer._stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if stack:
+            stack[-1].child_ns += end - self.start
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._finish(self, end)
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes (shown in trace exports)"""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Collects finished spans: running totals per stage plus a bounded event list for trace export"""
+
+    def __init__(self, max_events: int = 100000):
+        """
+        Initialize tracer
+
+        Args:
+            max_events: Spans kept for trace export (totals keep counting past this, e.g. in long monitors)
+        """
+        self.max_events = max_events
+        self.started_ns = time.perf_counter_ns()
+        self.started_at = time.time()
+        self.events: List[tuple] = []
+        self.dropped = 0
+        self.totals: Dict[str, List[float]] = {}
+        self.threads: Dict[int, str] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span: Span, end: int) -> None:
+        duration = end - span.start
+        thread = threading.current_thread()
+        with self._lock:
+            # calls, total ns, self ns, max ns
+            total = self.totals.get(span.name)
+            if total is None:
+                total = self.totals[span.name] = [0, 0, 0, 0]
+            total[0] += 1
+            total[1] += duration
+            total[2] += duration - span.child_ns
+            total[3] = max(total[3], duration)
+            if len(self.events) < self.max_events:
+                self.events.append((span.name, span.start, duration, thread.ident, span.attrs))
+                self.threads.setdefault(thread.ident, thread.name)
+            else:
+                self.dropped += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage calls, total/self/mean/max milliseconds, busiest stage first"""
+        with self._lock:
+            totals = {name: list(values) for name, values in self.totals.items()}
+        stages = {}
+        for name, (calls, total, own, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            stages[name] = {
+                'calls': calls,
+                'total_ms': round(total / 1e6, 3),
+                'self_ms': round(own / 1e6, 3),
+                'mean_ms': round(total / calls / 1e6, 3),
+                'max_ms': round(longest / 1e6, 3),
+            }
+        return stages
+
+    def report(self) -> None:
+        """Print the per-stage timing breakdown"""
+        wall = (time.perf_counter_ns() - self.started_ns) / 1e9
+        stages = self.summary()
+        print(f"\n⏱️  Timings (wall {wall:.3f}s)")
+        if not stages:
+            print("   No instrumented stages ran")
+            return
+        print(f"   {'stage':<28}{'calls':>7}{'total':>12}{'self':>12}{'mean':>12}{'max':>12}{'% wall':>8}")
+        for name, s in stages.items():
+            share = s['total_ms'] / 10 / wall if wall else 0.0
+            print(f"   {name:<28}{s['calls']:>7}{s['total_ms']:>10.1f}ms{s['self_ms']:>10.1f}ms"
+                  f"{s['mean_ms']:>10.1f}ms{s['max_ms']:>10.1f}ms{share:>7.1f}%")
+        if self.dropped:
+            print(f"   ({self.dropped} spans beyond the trace limit were counted but not kept)")
+
+    def export_chrome(self, path: str) -> int:
+        """
+        Write kept spans as Chrome trace-event JSON
+
+        Args:
+            path: Output file
+
+        Returns:
+            Number of events written
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        for name, start, duration, tid, attrs in events:
+            trace.append({
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (start - self.started_ns) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)[:200]
+                         for key, value in attrs.items()},
+            })
+        with open(os.path.expanduser(path), 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms',
+                       'otherData': {'started_at': self.started_at, 'dropped_spans': self.dropped}}, f)
+        return len(events)
+
+
+def span(name: str, **attrs: Any):
+    """
+    Time a stage: `with span('ai.query', provider='gemini'):`
+
+    Args:
+        name: Stage name; the part before the first dot is the trace category
+        attrs: Attributes recorded with the span
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, attrs)
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable_tracing(max_events: int = 100000) -> 'Tracer':
+    """Start collecting spans (replaces any active tracer)"""
+    global _tracer
+    _tracer = Tracer(max_events)
+    return _tracer
+
+
+def disable_tracing() -> Optional['Tracer']:
+    """Stop collecting spans; returns the tracer that was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional['Tracer']:
+    """The active tracer (None while tracing is off)"""
+    return _tracer